@@ -9,6 +9,11 @@ from airport.models import (
     Flight,
     Ticket,
     Order,
+    SeatHold,
+    IdempotencyKey,
+    OrderRequest,
+    RouteWeeklyLoad,
+    TableVersion,
 )
 
 
@@ -18,6 +23,11 @@ admin.site.register(Airport)
 admin.site.register(Route)
 admin.site.register(Crew)
 admin.site.register(Flight)
+admin.site.register(SeatHold)
+admin.site.register(IdempotencyKey)
+admin.site.register(OrderRequest)
+admin.site.register(RouteWeeklyLoad)
+admin.site.register(TableVersion)
 
 
 class TicketInline(admin.TabularInline):
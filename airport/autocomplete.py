@@ -0,0 +1,151 @@
+import threading
+from typing import NamedTuple
+
+from airport.models import Airport
+from airport.search import normalize
+
+
+AUTOCOMPLETE_LIMIT = 10
+# deeper nodes keep every airport under them instead of the top ones only
+MAX_PREFIX_LENGTH = 12
+
+
+class AirportSuggestion(NamedTuple):
+    airport_id: int
+    name: str
+    closest_big_city: str
+    routes_count: int
+
+    def as_dict(self) -> dict:
+        """Response item, keyed as ``AirportAutocompleteSerializer``"""
+
+        return {
+            "id": self.airport_id,
+            "name": self.name,
+            "closest_big_city": self.closest_big_city,
+            "routes_count": self.routes_count,
+        }
+
+
+class TrieNode:
+    __slots__ = ("children", "airports")
+
+    def __init__(self):
+        self.children = {}
+        self.airports = []
+
+
+class AirportTrie:
+    """Prefix trie over words of airport names and cities.
+
+    Every word start of ``name`` and ``closest_big_city`` is inserted up to
+    ``MAX_PREFIX_LENGTH`` characters, so "bor" and "kyiv bor" both find
+    "Kyiv Boryspil". Airports are inserted from the best ranked, so every
+    node keeps its best ``AUTOCOMPLETE_LIMIT`` airports in order and a
+    lookup only walks the query characters.
+    """
+
+    def __init__(self, suggestions: list[AirportSuggestion]):
+        self.root = TrieNode()
+        self.texts = {}
+
+        for suggestion in suggestions:
+            texts = [
+                normalize(suggestion.name),
+                normalize(suggestion.closest_big_city),
+            ]
+            self.texts[suggestion.airport_id] = texts
+            for text in texts:
+                for start in range(len(text)):
+                    if start == 0 or text[start - 1] == " ":
+                        self._insert(text[start:], suggestion)
+
+    @classmethod
+    def build(cls) -> "AirportTrie":
+        return cls([
+            AirportSuggestion(*airport)
+            for airport in Airport.objects.order_by(
+                "-routes_from_count", "name", "id"
+            ).values_list(
+                "id", "name", "closest_big_city", "routes_from_count"
+            )
+        ])
+
+    def _insert(self, key: str, suggestion: AirportSuggestion) -> None:
+        node = self.root
+        for depth, char in enumerate(key[:MAX_PREFIX_LENGTH], start=1):
+            node = node.children.setdefault(char, TrieNode())
+            if node.airports and node.airports[-1] is suggestion:
+                continue
+
+            if (
+                    depth == MAX_PREFIX_LENGTH
+                    or len(node.airports) < AUTOCOMPLETE_LIMIT
+            ):
+                node.airports.append(suggestion)
+
+    def search(
+            self,
+            query: str,
+            limit: int = AUTOCOMPLETE_LIMIT
+    ) -> list[AirportSuggestion]:
+        query = normalize(query)
+        if not query:
+            return []
+
+        node = self.root
+        for char in query[:MAX_PREFIX_LENGTH]:
+            node = node.children.get(char)
+            if node is None:
+                return []
+
+        if len(query) <= MAX_PREFIX_LENGTH:
+            return node.airports[:limit]
+
+        found = []
+        for suggestion in node.airports:
+            if any(
+                    text.startswith(query) or f" {query}" in text
+                    for text in self.texts[suggestion.airport_id]
+            ):
+                found.append(suggestion)
+                if len(found) == limit:
+                    break
+
+        return found
+
+
+_trie = None
+_trie_version = 0
+_trie_lock = threading.Lock()
+
+
+def get_trie() -> AirportTrie:
+    """Process wide trie, built on first use after every invalidation"""
+
+    global _trie
+
+    trie = _trie
+    if trie is None:
+        with _trie_lock:
+            trie = _trie
+            if trie is None:
+                version = _trie_version
+                trie = AirportTrie.build()
+                # airports changed while building, keep the trie out
+                if version == _trie_version:
+                    _trie = trie
+
+    return trie
+
+
+def invalidate_trie() -> None:
+    """Drop the trie, a build running meanwhile sees the new version.
+
+    The build lock is not taken, so invalidation never waits for a build.
+    """
+
+    global _trie, _trie_version
+
+    _trie_version += 1
+    _trie = None
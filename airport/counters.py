@@ -0,0 +1,184 @@
+from typing import Iterable, NamedTuple
+
+from django.db import models, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from airport.models import Airplane, Airport, Crew, Flight, Route
+
+
+class CountedRelation(NamedTuple):
+    """``model.counter`` is the number of ``counted`` rows pointing at it"""
+
+    model: type[models.Model]
+    counter: str
+    counted: type[models.Model]
+    foreign_key: str
+
+    def __str__(self) -> str:
+        return f"{self.model._meta.label}.{self.counter}"
+
+    def actual_counts(self) -> Coalesce:
+        return Coalesce(
+            Subquery(
+                self.counted.objects.filter(
+                    **{self.foreign_key: OuterRef("pk")}
+                )
+                .order_by()
+                .values(self.foreign_key)
+                .annotate(count=Count("*"))
+                .values("count")
+            ),
+            Value(0)
+        )
+
+
+COUNTED_RELATIONS = (
+    CountedRelation(Airplane, "flights_count", Flight, "airplane_id"),
+    CountedRelation(Route, "flights_count", Flight, "route_id"),
+    CountedRelation(Crew, "flights_count", Flight.crew.through, "crew_id"),
+    CountedRelation(Airport, "routes_from_count", Route, "source_id"),
+    CountedRelation(Airport, "routes_to_count", Route, "destination_id"),
+)
+
+
+def relations_counting(
+        counted: type[models.Model]
+) -> list[CountedRelation]:
+    return [
+        relation for relation in COUNTED_RELATIONS
+        if relation.counted is counted
+    ]
+
+
+def add_counts(relation: CountedRelation, deltas: dict) -> None:
+    """Add ``deltas`` (row pk: change) to the counter of ``relation``"""
+
+    pks_per_delta = {}
+    for pk, delta in deltas.items():
+        if pk is not None and delta:
+            pks_per_delta.setdefault(delta, []).append(pk)
+
+    for delta, pks in pks_per_delta.items():
+        relation.model.objects.filter(pk__in=pks).update(
+            **{relation.counter: F(relation.counter) + delta}
+        )
+
+
+def remember_counted_keys(
+        instance: models.Model,
+        update_fields: Iterable[str] = None
+) -> None:
+    """Keep counted foreign keys of a row before its save"""
+
+    relations = relations_counting(type(instance))
+    instance.previous_counted_keys = None
+    if instance._state.adding or not relations:
+        return
+
+    keys = [relation.foreign_key for relation in relations]
+    if update_fields is not None and not any(
+            instance._meta.get_field(name).attname in keys
+            for name in update_fields
+    ):
+        return
+
+    instance.previous_counted_keys = type(instance).objects.filter(
+        pk=instance.pk
+    ).values(*keys).first()
+
+
+def count_saved(instance: models.Model, created: bool) -> None:
+    previous = getattr(instance, "previous_counted_keys", None)
+    for relation in relations_counting(type(instance)):
+        current = getattr(instance, relation.foreign_key)
+        if created:
+            add_counts(relation, {current: 1})
+        elif previous and previous[relation.foreign_key] != current:
+            add_counts(
+                relation,
+                {previous[relation.foreign_key]: -1, current: 1}
+            )
+
+
+def count_deleted(instance: models.Model) -> None:
+    for relation in relations_counting(type(instance)):
+        add_counts(relation, {getattr(instance, relation.foreign_key): -1})
+
+
+def _through_key(
+        through: type[models.Model],
+        model: type[models.Model]
+) -> str:
+    return next(
+        field.attname for field in through._meta.fields
+        if field.is_relation and field.related_model is model
+    )
+
+
+def through_counted_keys(
+        through: type[models.Model],
+        instance: models.Model,
+        pk_set: Iterable = None
+) -> dict[CountedRelation, list]:
+    """Counter rows of many to many rows of ``instance``.
+
+    Through rows are written without signals, so their counters are
+    recounted after a change from the rows it touches, ``pk_set`` of
+    ``add()`` and ``remove()``, or all of them before ``clear()`` and
+    deletes.
+    """
+
+    keys = {}
+    for relation in relations_counting(through):
+        if isinstance(instance, relation.model):
+            keys[relation] = [instance.pk]
+        elif pk_set is not None:
+            keys[relation] = list(pk_set)
+        else:
+            keys[relation] = list(
+                through.objects.filter(
+                    **{_through_key(through, type(instance)): instance.pk}
+                ).values_list(relation.foreign_key, flat=True)
+            )
+
+    return keys
+
+
+def recount(keys: dict[CountedRelation, list]) -> None:
+    for relation, pks in keys.items():
+        if pks:
+            relation.model.objects.filter(pk__in=pks).update(
+                **{relation.counter: relation.actual_counts()}
+            )
+
+
+def verify_counters(
+        repair: bool = False
+) -> list[tuple[CountedRelation, int, int, int]]:
+    """Rows whose counters differ from the counted rows.
+
+    Counters miss changes which do not send signals (``bulk_create``,
+    ``QuerySet.update`` and raw SQL), this finds them and with ``repair``
+    recounts them. Returns ``(relation, pk, stored,
+    actual)`` of every wrong counter.
+    """
+
+    wrong = []
+    with transaction.atomic():
+        for relation in COUNTED_RELATIONS:
+            rows = relation.model.objects.annotate(
+                actual_count=relation.actual_counts()
+            ).filter(
+                ~Q(**{relation.counter: F("actual_count")})
+            ).order_by("pk").values_list(
+                "pk", relation.counter, "actual_count"
+            )
+            rows = [(relation, *row) for row in rows]
+
+            if repair:
+                recount({relation: [row[1] for row in rows]})
+
+            wrong += rows
+
+    return wrong
@@ -0,0 +1,189 @@
+import os
+import threading
+
+import numpy as np
+from django.conf import settings
+
+from airport.models import Airport, Route
+from airport.versions import table_versions
+
+
+UNREACHABLE = np.iinfo(np.uint32).max
+
+
+def shortest_distances(
+        airport_ids: np.ndarray,
+        routes: np.ndarray
+) -> np.ndarray:
+    """All-pairs shortest distances with vectorized Floyd–Warshall.
+
+    ``routes`` is an array of (source id, destination id, distance) rows,
+    the result is a float matrix ordered like ``airport_ids`` with ``inf``
+    for airports which cannot be reached.
+    """
+
+    size = len(airport_ids)
+    distances = np.full((size, size), np.inf)
+    np.fill_diagonal(distances, 0)
+
+    if len(routes):
+        sources = np.searchsorted(airport_ids, routes[:, 0])
+        destinations = np.searchsorted(airport_ids, routes[:, 1])
+        np.minimum.at(distances, (sources, destinations), routes[:, 2])
+
+    for via in range(size):
+        np.minimum(
+            distances,
+            distances[:, via, np.newaxis] + distances[np.newaxis, via, :],
+            out=distances
+        )
+
+    return distances
+
+
+def current_data_version() -> np.ndarray:
+    return np.array(table_versions(Airport, Route), dtype=np.int64)
+
+
+class DistanceMatrix:
+    """Shortest distances between airports loaded from a ``.npz`` file.
+
+    Distances are kept as ``uint32`` with ``UNREACHABLE`` for missing paths,
+    a pair is looked up with one dict access and one array access.
+    ``data_version`` holds the airport and route table versions the matrix
+    was built from.
+    """
+
+    def __init__(
+            self,
+            airport_ids: np.ndarray,
+            distances: np.ndarray,
+            data_version: np.ndarray = None
+    ):
+        self.airport_ids = airport_ids
+        self.distances = distances
+        self.data_version = (
+            np.array([], dtype=np.int64)
+            if data_version is None
+            else data_version
+        )
+        self.positions = {
+            airport_id: position
+            for position, airport_id in enumerate(airport_ids.tolist())
+        }
+
+    @classmethod
+    def build(cls) -> "DistanceMatrix":
+        # read first, changes made while building cause another rebuild
+        data_version = current_data_version()
+        airport_ids = np.array(
+            list(Airport.objects.order_by("id").values_list("id", flat=True)),
+            dtype=np.int64
+        )
+        routes = np.array(
+            list(
+                Route.objects.values_list("source", "destination", "distance")
+            ),
+            dtype=np.int64
+        ).reshape(-1, 3)
+
+        distances = shortest_distances(airport_ids, routes)
+        distances[np.isinf(distances)] = UNREACHABLE
+        return cls(airport_ids, distances.astype(np.uint32), data_version)
+
+    @classmethod
+    def load(cls, path: os.PathLike) -> "DistanceMatrix":
+        with np.load(path) as data:
+            return cls(
+                data["airport_ids"],
+                data["distances"],
+                data["data_version"] if "data_version" in data.files else None
+            )
+
+    @staticmethod
+    def load_data_version(path: os.PathLike) -> np.ndarray | None:
+        if not os.path.exists(path):
+            return None
+
+        with np.load(path) as data:
+            if "data_version" in data.files:
+                return data["data_version"]
+
+        return None
+
+    def save(self, path: os.PathLike) -> None:
+        """Write the matrix next to the old one and swap them atomically"""
+
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "wb") as file:
+            np.savez_compressed(
+                file,
+                airport_ids=self.airport_ids,
+                distances=self.distances,
+                data_version=self.data_version
+            )
+        os.replace(temporary_path, path)
+
+    def distance(self, source_id: int, destination_id: int) -> int | None:
+        if source_id == destination_id:
+            return 0
+
+        source = self.positions.get(source_id)
+        destination = self.positions.get(destination_id)
+        if source is None or destination is None:
+            return None
+
+        distance = self.distances[source, destination]
+        return None if distance == UNREACHABLE else int(distance)
+
+
+_matrix = None
+_matrix_version = None
+_matrix_lock = threading.Lock()
+
+
+def rebuild_distance_matrix() -> DistanceMatrix:
+    matrix = DistanceMatrix.build()
+    matrix.save(settings.DISTANCE_MATRIX_PATH)
+    return matrix
+
+
+def get_distance_matrix() -> DistanceMatrix:
+    """Matrix from ``DISTANCE_MATRIX_PATH``, reloaded when the file changes.
+
+    A missing file is built from the database on first use.
+    """
+
+    global _matrix, _matrix_version
+
+    path = settings.DISTANCE_MATRIX_PATH
+    with _matrix_lock:
+        if not os.path.exists(path):
+            rebuild_distance_matrix()
+
+        version = (path, os.stat(path).st_mtime_ns)
+        if _matrix is None or version != _matrix_version:
+            _matrix = DistanceMatrix.load(path)
+            _matrix_version = version
+
+        return _matrix
+
+
+def rebuild_if_outdated() -> DistanceMatrix | None:
+    """Rebuild the matrix when airports or routes changed since its build.
+
+    Floyd–Warshall is cubic in the number of airports, so route changes
+    only bump table versions and the matrix is rebuilt out of requests by
+    ``rebuild_distance_matrix --watch``, requests read the last one.
+    """
+
+    data_version = DistanceMatrix.load_data_version(
+        settings.DISTANCE_MATRIX_PATH
+    )
+    if data_version is not None and np.array_equal(
+            data_version,
+            current_data_version()
+    ):
+        return None
+
+    return rebuild_distance_matrix()
@@ -0,0 +1,187 @@
+import csv
+import json
+import re
+from typing import Callable, Iterable, Iterator
+
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence
+from rest_framework.negotiation import BaseContentNegotiation
+from rest_framework.request import Request
+from rest_framework.utils.encoders import JSONEncoder
+
+from airport.flight_list import (
+    FLIGHT_LIST_COLUMNS,
+    FLIGHT_LIST_FIELDS,
+    flight_list_item,
+    flight_list_values,
+)
+from airport.models import Flight, Order
+
+
+EXPORT_CHUNK_SIZE = 2000
+# lines are sent, and compressed, in blocks of about this many characters
+EXPORT_BLOCK_SIZE = 64 * 1024
+
+EXPORT_CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+FLIGHT_CSV_COLUMNS = list(FLIGHT_LIST_FIELDS)
+ORDER_CSV_COLUMNS = ["order", "user", "created_at", "flight", "row", "seat"]
+
+accepts_gzip = re.compile(r"\bgzip\b").search
+
+
+class ExportContentNegotiation(BaseContentNegotiation):
+    """Exports choose their format by ``file_format``, ignore ``Accept``.
+
+    Errors are still rendered by the first renderer of the view.
+    """
+
+    def select_parser(self, request: Request, parsers: list):
+        return parsers[0]
+
+    def select_renderer(
+            self,
+            request: Request,
+            renderers: list,
+            format_suffix: str = None
+    ) -> tuple:
+        return renderers[0], renderers[0].media_type
+
+
+class _Echo:
+    def write(self, value: str) -> str:
+        return value
+
+
+def _ndjson_lines(items: Iterable[dict]) -> Iterator[str]:
+    for item in items:
+        yield json.dumps(
+            item,
+            cls=JSONEncoder,
+            ensure_ascii=False,
+            separators=(",", ":")
+        ) + "\n"
+
+
+def _csv_lines(
+        items: Iterable[dict],
+        columns: list[str],
+        csv_rows: Callable[[dict], Iterable[list]]
+) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for item in items:
+        for row in csv_rows(item):
+            yield writer.writerow(row)
+
+
+def _blocks(lines: Iterable[str]) -> Iterator[bytes]:
+    block = []
+    size = 0
+    for line in lines:
+        block.append(line)
+        size += len(line)
+        if size >= EXPORT_BLOCK_SIZE:
+            yield "".join(block).encode()
+            block = []
+            size = 0
+
+    if block:
+        yield "".join(block).encode()
+
+
+def stream_export(
+        request: Request,
+        name: str,
+        file_format: str,
+        items: Iterable[dict],
+        csv_columns: list[str],
+        csv_rows: Callable[[dict], Iterable[list]]
+) -> StreamingHttpResponse:
+    """NDJSON or CSV of ``items``, gzipped when the client accepts it.
+
+    ``items`` is consumed while the response is sent, so it has to be
+    lazy for the memory to stay flat.
+    """
+
+    if file_format == "csv":
+        lines = _csv_lines(items, csv_columns, csv_rows)
+    else:
+        lines = _ndjson_lines(items)
+
+    content = _blocks(lines)
+    gzipped = bool(accepts_gzip(request.headers.get("Accept-Encoding", "")))
+    if gzipped:
+        content = compress_sequence(content)
+
+    response = StreamingHttpResponse(
+        content,
+        content_type=EXPORT_CONTENT_TYPES[file_format]
+    )
+    response["Content-Disposition"] = (
+        f'attachment; filename="{name}.{file_format}"'
+    )
+    patch_vary_headers(response, ("Accept-Encoding",))
+    if gzipped:
+        response["Content-Encoding"] = "gzip"
+
+    return response
+
+
+def flight_export_items(queryset: QuerySet[Flight]) -> Iterator[dict]:
+    rows = flight_list_values(queryset).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    for row in rows:
+        yield flight_list_item(row)
+
+
+def flight_csv_rows(flight: dict) -> list[list]:
+    return [
+        [flight[column] for column in FLIGHT_LIST_COLUMNS]
+        + ["; ".join(flight["crew"])]
+    ]
+
+
+def order_export_items(queryset: QuerySet[Order]) -> Iterator[dict]:
+    orders = queryset.select_related("user").prefetch_related(
+        "tickets"
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+    for order in orders:
+        yield {
+            "id": order.id,
+            "user": order.user.email,
+            "created_at": timezone.localtime(order.created_at).isoformat(),
+            "tickets": [
+                {
+                    "flight": ticket.flight_id,
+                    "row": ticket.row,
+                    "seat": ticket.seat,
+                }
+                for ticket in sorted(
+                    order.tickets.all(),
+                    key=lambda ticket: ticket.id
+                )
+            ],
+        }
+
+
+def order_csv_rows(order: dict) -> list[list]:
+    """One line per ticket"""
+
+    return [
+        [
+            order["id"],
+            order["user"],
+            order["created_at"],
+            ticket["flight"],
+            ticket["row"],
+            ticket["seat"],
+        ]
+        for ticket in order["tickets"]
+    ]
@@ -0,0 +1,101 @@
+import datetime
+import uuid
+from typing import Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Min, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from airport.models import Flight
+
+
+def _month_start(month: datetime.date) -> datetime.datetime:
+    return timezone.make_aware(
+        datetime.datetime(month.year, month.month, 1)
+    )
+
+
+def _next_month(month: datetime.date) -> datetime.date:
+    return (month.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+
+
+def build_fare_calendar(route_id: int, month: datetime.date) -> list[dict]:
+    """Flights count and available seats per departure day of a month.
+
+    One grouped query over the route flights, seats come from the flight
+    seat counters kept up to date by ticket writes.
+    """
+
+    days = (
+        Flight.objects.filter(
+            route_id=route_id,
+            departure_time__gte=_month_start(month),
+            departure_time__lt=_month_start(_next_month(month)),
+        )
+        .annotate(
+            day=TruncDate(
+                "departure_time",
+                tzinfo=timezone.get_current_timezone()
+            )
+        )
+        .values("day")
+        .annotate(
+            flights=Count("id"),
+            min_seats_available=Min("seats_available"),
+            seats_available=Sum("seats_available"),
+        )
+        .order_by("day")
+    )
+
+    return [dict(day, day=day["day"].isoformat()) for day in days]
+
+
+def _version_key(route_id: int) -> str:
+    return f"fare_calendar:{route_id}:version"
+
+
+def _calendar_version(route_id: int) -> str:
+    key = _version_key(route_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+
+    return version
+
+
+def get_fare_calendar(route_id: int, month: datetime.date) -> list[dict]:
+    """Fare calendar of a route month, cached until the route changes.
+
+    Cached months of a route are keyed by its version, which is replaced
+    on invalidation, so a calendar built from stale rows is never read.
+    """
+
+    key = (
+        f"fare_calendar:{route_id}:{_calendar_version(route_id)}:"
+        f"{month:%Y-%m}"
+    )
+    days = cache.get(key)
+    if days is None:
+        days = build_fare_calendar(route_id, month)
+        cache.set(
+            key,
+            days,
+            settings.FARE_CALENDAR_CACHE_TIMEOUT.total_seconds()
+        )
+
+    return days
+
+
+def invalidate_fare_calendars(route_ids: Iterable[int]) -> None:
+    """Drop cached calendars of routes once the transaction commits"""
+
+    keys = {
+        _version_key(route_id): uuid.uuid4().hex
+        for route_id in set(route_ids)
+    }
+    if keys:
+        transaction.on_commit(lambda: cache.set_many(keys, None))
@@ -1,8 +1,16 @@
+import datetime
+from functools import reduce
+from operator import or_
+
 from django.db.models import QuerySet
+from django.utils import timezone
 from rest_framework import filters
+from rest_framework.exceptions import ValidationError
 from rest_framework.request import Request
 from rest_framework.views import APIView
 
+from airport.search import airport_search_q, document_search_q
+
 
 def _perform_filtering(
         filter_value: str,
@@ -15,6 +23,40 @@ def _perform_filtering(
     return queryset
 
 
+def _perform_day_filtering(
+        filter_value: str,
+        filter_field: str,
+        queryset: QuerySet
+) -> QuerySet:
+    """Filter a datetime field by a day in the current timezone.
+
+    The day is a half-open range of datetimes, unlike ``__date`` it leaves
+    the column bare, so an index on it can be used.
+    """
+
+    if filter_value:
+        try:
+            day = datetime.date.fromisoformat(filter_value)
+        except ValueError:
+            raise ValidationError(
+                f"{filter_value} is not a day in YYYY-MM-DD format"
+            )
+
+        queryset = queryset.filter(**{
+            f"{filter_field}__gte": timezone.make_aware(
+                datetime.datetime.combine(day, datetime.time.min)
+            ),
+            f"{filter_field}__lt": timezone.make_aware(
+                datetime.datetime.combine(
+                    day + datetime.timedelta(days=1),
+                    datetime.time.min
+                )
+            ),
+        })
+
+    return queryset
+
+
 class FlightDateFilterBackend(filters.BaseFilterBackend):
     def filter_queryset(
             self, request: Request,
@@ -28,15 +70,15 @@ class FlightDateFilterBackend(filters.BaseFilterBackend):
         departure_end = request.query_params.get("departure_end")
         arriving_end = request.query_params.get("arriving_end")
 
-        queryset = _perform_filtering(
+        queryset = _perform_day_filtering(
             filter_value=departure_day,
-            filter_field="departure_time__date",
+            filter_field="departure_time",
             queryset=queryset
         )
 
-        queryset = _perform_filtering(
+        queryset = _perform_day_filtering(
             filter_value=arrival_day,
-            filter_field="arrival_time__date",
+            filter_field="arrival_time",
             queryset=queryset
         )
 
@@ -64,42 +106,105 @@ class FlightDateFilterBackend(filters.BaseFilterBackend):
             queryset=queryset
         )
 
-        return queryset.order_by("departure_time")
+        # explicit ordering was applied by the view already
+        if "ordering" not in request.query_params:
+            queryset = queryset.order_by("departure_time")
+
+        return queryset
 
 
 class RouteFilterBackend(filters.BaseFilterBackend):
+    search_params = {
+        "s_city": ("source__", "closest_big_city"),
+        "d_city": ("destination__", "closest_big_city"),
+        "s_airport": ("source__", "name"),
+        "d_airport": ("destination__", "name"),
+    }
+
     def filter_queryset(
             self, request: Request,
             queryset: QuerySet,
             view: APIView
     ) -> QuerySet:
-        source_city = request.query_params.get("s_city")
-        destination_city = request.query_params.get("d_city")
-        source_airport = request.query_params.get("s_airport")
-        destination_airport = request.query_params.get("d_airport")
+        for param, (prefix, field) in self.search_params.items():
+            term = request.query_params.get(param)
+            if term:
+                queryset = queryset.filter(
+                    airport_search_q(field, term, prefix, using=queryset.db)
+                )
 
-        queryset = _perform_filtering(
-            filter_value=source_city,
-            filter_field="source__closest_big_city__icontains",
-            queryset=queryset
-        )
+        return queryset
 
-        queryset = _perform_filtering(
-            filter_value=destination_city,
-            filter_field="destination__closest_big_city__icontains",
-            queryset=queryset
-        )
 
-        queryset = _perform_filtering(
-            filter_value=source_airport,
-            filter_field="source__name__icontains",
-            queryset=queryset
-        )
+class AirportSearchFilter(filters.SearchFilter):
+    """SearchFilter over indexed airport fields.
 
-        queryset = _perform_filtering(
-            filter_value=destination_airport,
-            filter_field="destination__name__icontains",
-            queryset=queryset
-        )
+    ``search_fields`` are airport fields or lookups to them, like
+    ``source__name``. Every search term has to match at least one of them,
+    same as in DRF SearchFilter.
+    """
+
+    def filter_queryset(
+            self, request: Request,
+            queryset: QuerySet,
+            view: APIView
+    ) -> QuerySet:
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+
+        if not search_fields or not search_terms:
+            return queryset
+
+        for term in search_terms:
+            queryset = queryset.filter(
+                reduce(
+                    or_,
+                    (
+                        airport_search_q(
+                            field,
+                            term,
+                            prefix + separator,
+                            using=queryset.db
+                        )
+                        for prefix, separator, field in (
+                            search_field.rpartition("__")
+                            for search_field in search_fields
+                        )
+                    )
+                )
+            )
+
+        return queryset
+
+
+class DocumentSearchFilter(filters.SearchFilter):
+    """SearchFilter over precomputed search document columns.
+
+    ``search_fields`` are columns built by
+    ``airport.search.build_search_document``, so a search does not join the
+    rows the documents are built from.
+    """
+
+    def filter_queryset(
+            self, request: Request,
+            queryset: QuerySet,
+            view: APIView
+    ) -> QuerySet:
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+
+        if not search_fields or not search_terms:
+            return queryset
+
+        for term in search_terms:
+            queryset = queryset.filter(
+                reduce(
+                    or_,
+                    (
+                        document_search_q(field, term, using=queryset.db)
+                        for field in search_fields
+                    )
+                )
+            )
 
         return queryset
@@ -0,0 +1,145 @@
+from typing import Iterable
+
+from django.db.models import (
+    Aggregate,
+    CharField,
+    OuterRef,
+    QuerySet,
+    Subquery,
+    TextField,
+    Value,
+)
+from django.db.models.functions import Cast, Concat
+from django.utils import timezone
+
+from airport.models import Flight
+
+
+FLIGHT_TIME_FORMAT = "%d %B %y %H:%M"
+
+# output key of FlightListSerializer and the column it is read from
+FLIGHT_LIST_COLUMNS = {
+    "id": "id",
+    "out_of": "route__source__name",
+    "to": "route__destination__name",
+    "airplane_name": "airplane__name",
+    "airplane_type": "airplane__airplane_type__name",
+    "departure_time": "departure_time",
+    "arrival_time": "arrival_time",
+    "tickets_available": "seats_available",
+}
+FLIGHT_LIST_FIELDS = (*FLIGHT_LIST_COLUMNS, "crew")
+
+# ASCII record and unit separators, which never appear in names
+CREW_SEPARATOR = "\x1e"
+CREW_ID_SEPARATOR = "\x1f"
+
+
+class GroupConcat(Aggregate):
+    """Values of a group joined by ``separator``, in no particular order"""
+
+    function = "GROUP_CONCAT"
+    output_field = TextField()
+
+    def __init__(self, expression, separator: str = ",", **extra):
+        super().__init__(expression, Value(separator), **extra)
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler,
+            connection,
+            function="STRING_AGG",
+            **extra_context
+        )
+
+
+def _crew_names() -> Subquery:
+    crew = (
+        Flight.crew.through.objects.filter(flight=OuterRef("pk"))
+        .order_by()
+        .values("flight")
+        .annotate(
+            names=GroupConcat(
+                Concat(
+                    Cast("crew_id", CharField()),
+                    Value(CREW_ID_SEPARATOR),
+                    "crew__first_name",
+                    Value(" "),
+                    "crew__last_name",
+                    output_field=TextField(),
+                ),
+                separator=CREW_SEPARATOR
+            )
+        )
+        .values("names")
+    )
+    return Subquery(crew, output_field=TextField())
+
+
+def flight_list_values(
+        queryset: QuerySet[Flight],
+        fields: Iterable[str] = FLIGHT_LIST_FIELDS
+) -> QuerySet:
+    """Columns of FlightListSerializer ``fields`` for ``queryset``, as dicts.
+
+    Columns of the ordering are read too, for keyset cursors. Crew names
+    come from a correlated subquery, so there is no GROUP BY over the
+    flights and only the rows of a page run it.
+    """
+
+    columns = [
+        FLIGHT_LIST_COLUMNS[field]
+        for field in fields
+        if field in FLIGHT_LIST_COLUMNS
+    ]
+    columns += [
+        field.lstrip("-")
+        for field in queryset.query.order_by
+        if isinstance(field, str)
+    ]
+    queryset = queryset.prefetch_related(None).values(
+        *dict.fromkeys(columns)
+    )
+    if "crew" in fields:
+        queryset = queryset.annotate(crew_names=_crew_names())
+
+    return queryset
+
+
+def _format_time(value) -> str:
+    return timezone.localtime(value).strftime(FLIGHT_TIME_FORMAT)
+
+
+def _crew(names: str | None) -> list[str]:
+    # aggregated in no particular order, flight views list crew by id
+    members = [
+        member.split(CREW_ID_SEPARATOR)
+        for member in (names or "").split(CREW_SEPARATOR)
+        if member
+    ]
+    return [name for _, name in sorted(members, key=lambda m: int(m[0]))]
+
+
+def flight_list_item(
+        row: dict,
+        fields: Iterable[str] = FLIGHT_LIST_FIELDS
+) -> dict:
+    """JSON of FlightListSerializer from a row of ``flight_list_values``"""
+
+    flight = {}
+    for field in fields:
+        if field == "crew":
+            flight["crew"] = _crew(row["crew_names"])
+        elif field in ("departure_time", "arrival_time"):
+            flight[field] = _format_time(row[field])
+        else:
+            flight[field] = row[FLIGHT_LIST_COLUMNS[field]]
+
+    return flight
+
+
+def flight_list_data(
+        rows: Iterable[dict],
+        fields: Iterable[str] = FLIGHT_LIST_FIELDS
+) -> list[dict]:
+    return [flight_list_item(row, fields) for row in rows]
@@ -0,0 +1,128 @@
+import datetime
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import ValidationError
+
+from airport.models import Flight, SeatHold
+from airport.seat_map import SeatMap
+from airport.seats import lock_flights
+from airport.validators import SEAT_TAKEN_MESSAGE
+
+
+SEAT_HELD_MESSAGE = _("Seat is held by another customer")
+
+
+def hold_seats(
+        user: settings.AUTH_USER_MODEL,
+        flight: Flight,
+        seats: list[tuple[int, int]]
+) -> datetime.datetime:
+    """Reserve free seats of a flight for the user until returned time"""
+
+    expires_at = timezone.now() + settings.SEAT_HOLD_TTL
+
+    with transaction.atomic():
+        flight = lock_flights([flight.pk])[flight.pk]
+        seat_map = SeatMap.for_flight(flight)
+        held_by_others = seats_held_by_others(user, flight)
+
+        errors = []
+        for seat in seats:
+            if seat in held_by_others:
+                errors.append({"non_field_errors": [SEAT_HELD_MESSAGE]})
+            elif seat_map.is_taken(*seat):
+                errors.append({"non_field_errors": [SEAT_TAKEN_MESSAGE]})
+            else:
+                errors.append({})
+
+        if any(errors):
+            raise ValidationError({"seats": errors})
+
+        # what is left on these seats is expired or already held by the user
+        SeatHold.objects.filter(flight=flight).filter(
+            reduce(or_, (Q(row=row, seat=seat) for row, seat in seats))
+        ).delete()
+        SeatHold.objects.bulk_create(
+            SeatHold(
+                flight=flight,
+                user=user,
+                row=row,
+                seat=seat,
+                expires_at=expires_at
+            )
+            for row, seat in seats
+        )
+
+    return expires_at
+
+
+def seats_held_by_others(
+        user: settings.AUTH_USER_MODEL,
+        flight: Flight
+) -> set[tuple[int, int]]:
+    return set(
+        SeatHold.objects.filter(flight=flight, expires_at__gt=timezone.now())
+        .exclude(user=user)
+        .values_list("row", "seat")
+    )
+
+
+def claim_held_seats(
+        user: settings.AUTH_USER_MODEL,
+        tickets_data: list[dict]
+) -> None:
+    """Check ordered seats against active holds and drop the user holds.
+
+    Holds of all flights in the order are loaded with a single query using
+    the (flight, row, seat) index.
+    """
+
+    holds = {
+        (flight_id, row, seat): (hold_id, user_id)
+        for hold_id, flight_id, row, seat, user_id in (
+            SeatHold.objects.filter(
+                flight__in={ticket["flight"] for ticket in tickets_data},
+                expires_at__gt=timezone.now(),
+            ).values_list("id", "flight", "row", "seat", "user")
+        )
+    }
+
+    errors = []
+    claimed = []
+    for ticket in tickets_data:
+        hold_id, user_id = holds.get(
+            (ticket["flight"].pk, ticket["row"], ticket["seat"]),
+            (None, None)
+        )
+        if user_id not in (None, user.pk):
+            errors.append({"non_field_errors": [SEAT_HELD_MESSAGE]})
+            continue
+
+        errors.append({})
+        if hold_id:
+            claimed.append(hold_id)
+
+    if any(errors):
+        raise ValidationError({"tickets": errors})
+
+    if claimed:
+        SeatHold.objects.filter(pk__in=claimed).delete()
+
+
+def release_expired_holds(batch_size: int = 1000) -> int:
+    """Delete expired holds in batches, returns number of deleted holds"""
+
+    released = 0
+    now = timezone.now()
+    expired = SeatHold.objects.filter(expires_at__lte=now).order_by()
+
+    while batch := list(expired.values_list("pk", flat=True)[:batch_size]):
+        released += SeatHold.objects.filter(pk__in=batch).delete()[0]
+
+    return released
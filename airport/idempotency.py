@@ -0,0 +1,184 @@
+import hashlib
+import json
+from functools import wraps
+from typing import Callable
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from airport.models import IdempotencyKey
+
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+# response headers stored with the body and sent again on replays
+REPLAYED_HEADERS = ("Location", "Content-Location", "Retry-After")
+
+
+class IdempotencyKeyInProgress(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = _(
+        "A request with this Idempotency-Key is still being processed"
+    )
+    default_code = "idempotency_key_in_progress"
+
+
+class IdempotencyKeyReused(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = _(
+        "This Idempotency-Key was already used with another request"
+    )
+    default_code = "idempotency_key_reused"
+
+
+def request_hash(request: Request) -> str:
+    payload = json.dumps(
+        [request.method, request.path, request.data],
+        sort_keys=True,
+        cls=DjangoJSONEncoder,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def claim_key(request: Request, key: str) -> IdempotencyKey | Response:
+    """Start processing of the key or return the stored response.
+
+    A new key is committed right away as pending, so a concurrent duplicate
+    sees it and gets 409 instead of running the request a second time.
+    A key pending for longer than ``IDEMPOTENCY_KEY_LOCK_TIMEOUT`` was left
+    by a worker which died and is claimed again.
+    """
+
+    now = timezone.now()
+    digest = request_hash(request)
+    defaults = {
+        "request_hash": digest,
+        "status_code": None,
+        "response_body": None,
+        "response_headers": None,
+        "locked_at": now,
+        "expires_at": now + settings.IDEMPOTENCY_KEY_TTL,
+    }
+    lock_expired_at = now - settings.IDEMPOTENCY_KEY_LOCK_TIMEOUT
+
+    keys = IdempotencyKey.objects.filter(user=request.user, key=key)
+    idempotency_key = keys.first()
+    if idempotency_key is None:
+        try:
+            with transaction.atomic():
+                return IdempotencyKey.objects.create(
+                    user=request.user,
+                    key=key,
+                    **defaults
+                )
+        except IntegrityError:
+            idempotency_key = keys.get()
+
+    abandoned = idempotency_key.status_code is None and (
+        idempotency_key.locked_at is None
+        or idempotency_key.locked_at <= lock_expired_at
+    )
+    if idempotency_key.expires_at <= now or abandoned:
+        # expired keys not purged yet and abandoned ones start from scratch
+        updated = IdempotencyKey.objects.filter(
+            Q(expires_at__lte=now)
+            | Q(status_code__isnull=True, locked_at__isnull=True)
+            | Q(status_code__isnull=True, locked_at__lte=lock_expired_at),
+            pk=idempotency_key.pk,
+        ).update(**defaults)
+        if updated:
+            return IdempotencyKey(pk=idempotency_key.pk, **defaults)
+
+        raise IdempotencyKeyInProgress()
+
+    if idempotency_key.status_code is None:
+        raise IdempotencyKeyInProgress()
+
+    if idempotency_key.request_hash != digest:
+        raise IdempotencyKeyReused()
+
+    return Response(
+        idempotency_key.response_body,
+        status=idempotency_key.status_code,
+        headers={
+            **(idempotency_key.response_headers or {}),
+            "Idempotent-Replayed": "true",
+        }
+    )
+
+
+def idempotent(func: Callable) -> Callable:
+    """Replay the first successful response of a view for repeated keys.
+
+    Requests without the ``Idempotency-Key`` header are handled as usual.
+    Only successful responses are stored, after an error the key is
+    released so the client can retry with it.
+    """
+
+    @wraps(func)
+    def inner(view, request: Request, *args, **kwargs) -> Response:
+        key = request.headers.get(IDEMPOTENCY_KEY_HEADER)
+        if not key:
+            return func(view, request, *args, **kwargs)
+
+        if len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            raise ValidationError({
+                IDEMPOTENCY_KEY_HEADER: [
+                    _("Ensure this value has at most %(max_length)s "
+                      "characters.")
+                    % {"max_length": IDEMPOTENCY_KEY_MAX_LENGTH}
+                ]
+            })
+
+        claimed = claim_key(request, key)
+        if isinstance(claimed, Response):
+            return claimed
+
+        # a key taken over after the lock timeout belongs to the new claim
+        owned = IdempotencyKey.objects.filter(
+            pk=claimed.pk,
+            locked_at=claimed.locked_at
+        )
+        try:
+            response = func(view, request, *args, **kwargs)
+        except Exception:
+            owned.delete()
+            raise
+
+        if status.is_success(response.status_code):
+            owned.update(
+                status_code=response.status_code,
+                response_body=response.data,
+                response_headers={
+                    name: response[name]
+                    for name in REPLAYED_HEADERS
+                    if response.has_header(name)
+                },
+            )
+        else:
+            owned.delete()
+
+        return response
+
+    return inner
+
+
+def purge_expired_keys(batch_size: int = 1000) -> int:
+    """Delete expired keys in batches, returns number of deleted keys"""
+
+    purged = 0
+    now = timezone.now()
+    expired = IdempotencyKey.objects.filter(expires_at__lte=now).order_by()
+
+    while batch := list(expired.values_list("pk", flat=True)[:batch_size]):
+        purged += IdempotencyKey.objects.filter(pk__in=batch).delete()[0]
+
+    return purged
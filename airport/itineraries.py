@@ -0,0 +1,362 @@
+import datetime
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import defaultdict
+from heapq import heappop, heappush
+from itertools import count, islice
+from typing import Iterator, NamedTuple
+
+from django.conf import settings
+from django.utils import timezone
+
+from airport.models import Flight, Route
+
+
+class FlightTimes(NamedTuple):
+    departure_time: datetime.datetime
+    arrival_time: datetime.datetime
+    flight_id: int
+
+
+class Itinerary(NamedTuple):
+    flights: tuple[FlightTimes, ...]
+
+    @property
+    def departure_time(self) -> datetime.datetime:
+        return self.flights[0].departure_time
+
+    @property
+    def arrival_time(self) -> datetime.datetime:
+        return self.flights[-1].arrival_time
+
+    @property
+    def duration(self) -> datetime.timedelta:
+        return self.arrival_time - self.departure_time
+
+    @property
+    def stops(self) -> int:
+        return len(self.flights) - 1
+
+    @property
+    def flight_ids(self) -> list[int]:
+        return [flight.flight_id for flight in self.flights]
+
+
+class ItineraryIndex:
+    """Route graph with departure-sorted flights of every route.
+
+    ``routes_from`` maps an airport to its outgoing routes and their
+    destinations, ``routes_to`` to incoming ones and their sources,
+    ``flights`` keeps a list of FlightTimes per route sorted by
+    departure, so flights leaving in a time window are found with bisect.
+    Only flights which did not depart yet are kept, departed ones are
+    dropped from a route when a flight is added to it and by rebuilds.
+    """
+
+    def __init__(self):
+        self.routes_from = defaultdict(dict)
+        self.routes_to = defaultdict(dict)
+        self.route_ends = {}
+        self.flights = defaultdict(list)
+        self.flight_routes = {}
+        self.lock = threading.RLock()
+        self.built_at = time.monotonic()
+
+    @classmethod
+    def build(cls) -> "ItineraryIndex":
+        index = cls()
+        for route_id, source_id, destination_id in Route.objects.values_list(
+                "id", "source", "destination"
+        ):
+            index.add_route(route_id, source_id, destination_id)
+
+        flights = Flight.objects.filter(departure_time__gte=timezone.now())
+        for flight in flights.values_list(
+                "route", "departure_time", "arrival_time", "id"
+        ).order_by():
+            index.flights[flight[0]].append(FlightTimes(*flight[1:]))
+            index.flight_routes[flight[3]] = flight[0]
+
+        for route_flights in index.flights.values():
+            route_flights.sort()
+
+        return index
+
+    def add_route(
+            self,
+            route_id: int,
+            source_id: int,
+            destination_id: int
+    ) -> None:
+        with self.lock:
+            self.remove_route(route_id, keep_flights=True)
+            self.routes_from[source_id][route_id] = destination_id
+            self.routes_to[destination_id][route_id] = source_id
+            self.route_ends[route_id] = (source_id, destination_id)
+
+    def remove_route(self, route_id: int, keep_flights: bool = False) -> None:
+        with self.lock:
+            if route_id in self.route_ends:
+                source_id, destination_id = self.route_ends.pop(route_id)
+                self.routes_from[source_id].pop(route_id, None)
+                self.routes_to[destination_id].pop(route_id, None)
+
+            if not keep_flights:
+                for flight in self.flights.pop(route_id, []):
+                    self.flight_routes.pop(flight.flight_id, None)
+
+    def add_flight(
+            self,
+            flight_id: int,
+            route_id: int,
+            departure_time: datetime.datetime,
+            arrival_time: datetime.datetime
+    ) -> None:
+        with self.lock:
+            self.remove_flight(flight_id)
+            self.drop_departed(route_id)
+            if departure_time < timezone.now():
+                return
+
+            insort(
+                self.flights[route_id],
+                FlightTimes(departure_time, arrival_time, flight_id)
+            )
+            self.flight_routes[flight_id] = route_id
+
+    def remove_flight(self, flight_id: int) -> None:
+        with self.lock:
+            route_id = self.flight_routes.pop(flight_id, None)
+            if route_id is not None:
+                self.flights[route_id] = [
+                    flight
+                    for flight in self.flights[route_id]
+                    if flight.flight_id != flight_id
+                ]
+
+    def drop_departed(self, route_id: int) -> None:
+        with self.lock:
+            route_flights = self.flights.get(route_id)
+            if not route_flights:
+                return
+
+            departed = bisect_left(route_flights, (timezone.now(),))
+            for flight in route_flights[:departed]:
+                self.flight_routes.pop(flight.flight_id, None)
+            del route_flights[:departed]
+
+    def departures(
+            self,
+            route_id: int,
+            start: datetime.datetime,
+            end: datetime.datetime
+    ) -> list[FlightTimes]:
+        """Flights of the route departing in [start, end)"""
+
+        route_flights = self.flights.get(route_id, [])
+        return route_flights[
+            bisect_left(route_flights, (start,)):
+            bisect_left(route_flights, (end,))
+        ]
+
+    def legs_to(self, destination_id: int, max_legs: int) -> dict[int, int]:
+        """Fewest legs from airports to the destination, up to ``max_legs``"""
+
+        legs = {destination_id: 0}
+        reached = [destination_id]
+        with self.lock:
+            for depth in range(1, max_legs + 1):
+                sources = []
+                for airport_id in reached:
+                    routes = self.routes_to.get(airport_id, {})
+                    for source_id in routes.values():
+                        if source_id not in legs:
+                            legs[source_id] = depth
+                            sources.append(source_id)
+                reached = sources
+
+        return legs
+
+    def search(
+            self,
+            source_id: int,
+            destination_id: int,
+            start: datetime.datetime,
+            end: datetime.datetime,
+            max_stops: int = 2,
+            min_layover: datetime.timedelta = datetime.timedelta(),
+            max_layover: datetime.timedelta = datetime.timedelta(days=1),
+    ) -> Iterator[Itinerary]:
+        """Itineraries leaving the source in [start, end), fastest first.
+
+        Best-first search: partial itineraries are extended in the order of
+        their duration so far, which only grows with more legs, so
+        complete ones come out ranked and nothing past the ones the caller
+        takes is explored. Airports from which the destination cannot be
+        reached with the stops left are not flown to. The lock is only
+        held while extending one itinerary.
+        """
+
+        legs_to = self.legs_to(destination_id, max_stops)
+        queue = []
+        sequence = count()
+
+        def extend(
+                airport_id: int,
+                visited: tuple[int, ...],
+                flights: tuple[FlightTimes, ...],
+                stops_left: int,
+                earliest: datetime.datetime,
+                latest: datetime.datetime,
+        ) -> None:
+            with self.lock:
+                routes = list(self.routes_from.get(airport_id, {}).items())
+                for route_id, next_airport_id in routes:
+                    if next_airport_id in visited:
+                        continue
+
+                    is_last_leg = next_airport_id == destination_id
+                    legs_left = legs_to.get(next_airport_id)
+                    if not is_last_leg and (
+                            legs_left is None or legs_left > stops_left
+                    ):
+                        continue
+
+                    for flight in self.departures(route_id, earliest, latest):
+                        legs = flights + (flight,)
+                        departure_time = legs[0].departure_time
+                        # a partial itinerary makes at least len(legs) stops
+                        rank = (
+                            flight.arrival_time - departure_time,
+                            len(legs) - 1 if is_last_leg else len(legs),
+                            departure_time,
+                        )
+                        heappush(queue, (
+                            rank,
+                            next(sequence),
+                            next_airport_id,
+                            visited + (next_airport_id,),
+                            legs,
+                            stops_left,
+                        ))
+
+        extend(source_id, (source_id,), (), max_stops, start, end)
+        while queue:
+            _, _, airport_id, visited, legs, stops_left = heappop(queue)
+            if airport_id == destination_id:
+                yield Itinerary(legs)
+                continue
+
+            arrival_time = legs[-1].arrival_time
+            extend(
+                airport_id,
+                visited,
+                legs,
+                stops_left - 1,
+                arrival_time + min_layover,
+                arrival_time + max_layover,
+            )
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> ItineraryIndex:
+    """Process wide index, built on first use.
+
+    Signals keep it up to date with changes made by this process, changes
+    made by other processes are picked up by a rebuild after
+    ``ITINERARY_INDEX_TTL``.
+    """
+
+    global _index
+
+    with _index_lock:
+        if _index is None or (
+                time.monotonic() - _index.built_at
+                > settings.ITINERARY_INDEX_TTL.total_seconds()
+        ):
+            _index = ItineraryIndex.build()
+
+        return _index
+
+
+def get_built_index() -> ItineraryIndex | None:
+    return _index
+
+
+def reset_index() -> None:
+    global _index
+
+    with _index_lock:
+        _index = None
+
+
+def find_itineraries(
+        source_id: int,
+        destination_id: int,
+        date: datetime.date,
+        max_stops: int,
+        min_layover: datetime.timedelta,
+        max_layover: datetime.timedelta,
+        limit: int,
+) -> list[dict]:
+    """Best itineraries of the day made only of flights with free seats.
+
+    Seats are not tracked by the index, so ranked itineraries are checked
+    against the database chunk by chunk until ``limit`` of them are found.
+    """
+
+    start = timezone.make_aware(
+        datetime.datetime.combine(date, datetime.time.min)
+    )
+    # departed flights are not listed, as in the flight list
+    itineraries = get_index().search(
+        source_id,
+        destination_id,
+        max(start, timezone.now()),
+        start + datetime.timedelta(days=1),
+        max_stops=max_stops,
+        min_layover=min_layover,
+        max_layover=max_layover,
+    )
+
+    found = []
+    flights = {}
+    checked = set()
+    while chunk := list(islice(itineraries, limit)):
+        flight_ids = {
+            flight_id
+            for itinerary in chunk
+            for flight_id in itinerary.flight_ids
+        } - checked
+        flights.update(
+            Flight.objects.filter(seats_available__gt=0)
+            .select_related(
+                "airplane__airplane_type",
+                "route__source",
+                "route__destination",
+            )
+            .prefetch_related("crew")
+            .in_bulk(flight_ids)
+        )
+        checked |= flight_ids
+
+        for itinerary in chunk:
+            if all(flight_id in flights for flight_id in itinerary.flight_ids):
+                found.append({
+                    "stops": itinerary.stops,
+                    "departure_time": itinerary.departure_time,
+                    "arrival_time": itinerary.arrival_time,
+                    "duration": itinerary.duration,
+                    "flights": [
+                        flights[flight_id]
+                        for flight_id in itinerary.flight_ids
+                    ],
+                })
+                if len(found) == limit:
+                    return found
+
+    return found
@@ -0,0 +1,54 @@
+"""orjson renderer and parser.
+
+Values orjson does not know go through the DRF JSON encoder, so the
+output is the same as the one of ``JSONRenderer``.
+"""
+import orjson
+from rest_framework import parsers, renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.utils.encoders import JSONEncoder
+
+
+_encoder = JSONEncoder()
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+class ORJSONRenderer(renderers.JSONRenderer):
+    """``application/json`` by orjson, DRF JSON when indenting"""
+
+    def render(
+            self,
+            data,
+            accepted_media_type: str = None,
+            renderer_context: dict = None
+    ) -> bytes:
+        if data is None:
+            return b""
+
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(
+            data,
+            default=_encoder.default,
+            option=ORJSON_OPTIONS
+        )
+        # same as JSONRenderer, these are line breaks in javascript
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
+
+
+class ORJSONParser(parsers.JSONParser):
+    def parse(
+            self,
+            stream,
+            media_type: str = None,
+            parser_context: dict = None
+    ):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as error:
+            raise ParseError(f"JSON parse error - {error}")
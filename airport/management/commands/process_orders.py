@@ -0,0 +1,33 @@
+import time
+
+from django.core.management import BaseCommand
+
+from airport.order_queue import process_order_queue
+
+
+class Command(BaseCommand):
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument(
+            "--watch",
+            action="store_true",
+            help="Keep polling the queue after it is drained"
+        )
+        parser.add_argument("--poll-interval", type=float, default=1.0)
+
+    def handle(self, *args, **options) -> None:
+        while True:
+            processed = process_order_queue(
+                batch_size=options["batch_size"],
+                workers=options["workers"],
+            )
+            if processed or not options["watch"]:
+                self.stdout.write(
+                    self.style.SUCCESS(f"Processed {processed} orders")
+                )
+
+            if not options["watch"]:
+                break
+
+            time.sleep(options["poll_interval"])
@@ -0,0 +1,15 @@
+from django.core.management import BaseCommand
+
+from airport.idempotency import purge_expired_keys
+
+
+class Command(BaseCommand):
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options) -> None:
+        purged = purge_expired_keys(batch_size=options["batch_size"])
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Purged {purged} expired idempotency keys")
+        )
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management import BaseCommand
+
+from airport.distances import rebuild_distance_matrix, rebuild_if_outdated
+
+
+class Command(BaseCommand):
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--watch",
+            action="store_true",
+            help="Keep rebuilding the matrix after airport or route changes"
+        )
+        parser.add_argument("--poll-interval", type=float, default=5.0)
+
+    def handle(self, *args, **options) -> None:
+        matrix = rebuild_distance_matrix()
+
+        while True:
+            if matrix is not None:
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"Built distance matrix of "
+                        f"{len(matrix.airport_ids)} airports"
+                    )
+                )
+
+            if not options["watch"]:
+                break
+
+            time.sleep(options["poll_interval"])
+            matrix = rebuild_if_outdated()
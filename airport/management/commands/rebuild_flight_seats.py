@@ -0,0 +1,15 @@
+from django.core.management import BaseCommand
+
+from airport.seats import rebuild_seats
+
+
+class Command(BaseCommand):
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options) -> None:
+        rebuilt = rebuild_seats(batch_size=options["batch_size"])
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt seats of {rebuilt} flights")
+        )
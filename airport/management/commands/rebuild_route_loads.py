@@ -0,0 +1,15 @@
+from django.core.management import BaseCommand
+
+from airport.route_loads import rebuild_route_loads
+
+
+class Command(BaseCommand):
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--chunk-weeks", type=int, default=26)
+
+    def handle(self, *args, **options) -> None:
+        rebuilt = rebuild_route_loads(chunk_weeks=options["chunk_weeks"])
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {rebuilt} weekly route loads")
+        )
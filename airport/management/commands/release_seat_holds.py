@@ -0,0 +1,15 @@
+from django.core.management import BaseCommand
+
+from airport.holds import release_expired_holds
+
+
+class Command(BaseCommand):
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options) -> None:
+        released = release_expired_holds(batch_size=options["batch_size"])
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Released {released} expired seat holds")
+        )
@@ -0,0 +1,29 @@
+from django.core.management import BaseCommand, CommandError
+
+from airport.counters import verify_counters
+
+
+class Command(BaseCommand):
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--repair",
+            action="store_true",
+            help="Set wrong counters to the actual counts"
+        )
+
+    def handle(self, *args, **options) -> None:
+        wrong = verify_counters(repair=options["repair"])
+
+        for relation, pk, stored, actual in wrong:
+            self.stdout.write(f"{relation} of {pk}: {stored}, actual {actual}")
+
+        if not wrong:
+            self.stdout.write(self.style.SUCCESS("All counters are right"))
+        elif options["repair"]:
+            self.stdout.write(
+                self.style.SUCCESS(f"Repaired {len(wrong)} counters")
+            )
+        else:
+            raise CommandError(
+                f"{len(wrong)} counters are wrong, run with --repair"
+            )
@@ -0,0 +1,48 @@
+# Generated by Django 5.1.1 on 2026-10-17 06:29
+
+from django.db import migrations, models
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_flight_seats(apps, schema_editor):
+    Airplane = apps.get_model("airport", "Airplane")
+    Flight = apps.get_model("airport", "Flight")
+    Ticket = apps.get_model("airport", "Ticket")
+
+    sold = (
+        Ticket.objects.filter(flight=OuterRef("pk"))
+        .order_by()
+        .values("flight")
+        .annotate(sold=Count("id"))
+        .values("sold")
+    )
+    capacity = Airplane.objects.filter(pk=OuterRef("airplane_id")).values(
+        capacity=F("rows") * F("seats_in_row")
+    )
+
+    Flight.objects.update(seats_sold=Coalesce(Subquery(sold), Value(0)))
+    Flight.objects.update(
+        seats_available=Subquery(capacity) - F("seats_sold")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airport', '0008_alter_airplane_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='flight',
+            name='seats_available',
+            field=models.IntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='flight',
+            name='seats_sold',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_flight_seats, migrations.RunPython.noop),
+    ]
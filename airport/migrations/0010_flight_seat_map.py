@@ -0,0 +1,42 @@
+# Generated by Django 5.1.1 on 2026-10-17 06:32
+
+from django.db import migrations, models
+
+
+def fill_seat_maps(apps, schema_editor):
+    Flight = apps.get_model("airport", "Flight")
+    Ticket = apps.get_model("airport", "Ticket")
+
+    flights = Flight.objects.select_related("airplane").in_bulk()
+    seat_maps = dict.fromkeys(flights, 0)
+    for flight_id, row, seat in Ticket.objects.values_list(
+            "flight", "row", "seat"
+    ):
+        airplane = flights[flight_id].airplane
+        if 0 < row <= airplane.rows and 0 < seat <= airplane.seats_in_row:
+            seat_maps[flight_id] |= 1 << (
+                (row - 1) * airplane.seats_in_row + seat - 1
+            )
+
+    for flight_id, flight in flights.items():
+        size = flight.airplane.rows * flight.airplane.seats_in_row
+        flight.seat_map = seat_maps[flight_id].to_bytes(
+            (size + 7) // 8, "little"
+        )
+    Flight.objects.bulk_update(flights.values(), ["seat_map"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airport', '0009_flight_seat_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='flight',
+            name='seat_map',
+            field=models.BinaryField(default=b''),
+        ),
+        migrations.RunPython(fill_seat_maps, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.1.1 on 2026-10-17 07:12
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+SEARCH_FIELDS = ("name", "closest_big_city")
+
+POSTGRES_INDEX = (
+    "CREATE INDEX IF NOT EXISTS airport_{field}_trgm_idx "
+    "ON airport_airport USING gin (UPPER({field}::text) gin_trgm_ops)"
+)
+
+SQLITE_FTS_TABLE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS airport_airport_search USING fts5("
+    "name, closest_big_city, content='airport_airport', "
+    "content_rowid='id', tokenize='trigram')",
+    "INSERT INTO airport_airport_search(airport_airport_search) "
+    "VALUES ('rebuild')",
+    "CREATE TRIGGER IF NOT EXISTS airport_airport_search_insert "
+    "AFTER INSERT ON airport_airport BEGIN "
+    "INSERT INTO airport_airport_search(rowid, name, closest_big_city) "
+    "VALUES (new.id, new.name, new.closest_big_city); END",
+    "CREATE TRIGGER IF NOT EXISTS airport_airport_search_delete "
+    "AFTER DELETE ON airport_airport BEGIN "
+    "INSERT INTO airport_airport_search"
+    "(airport_airport_search, rowid, name, closest_big_city) "
+    "VALUES ('delete', old.id, old.name, old.closest_big_city); END",
+    "CREATE TRIGGER IF NOT EXISTS airport_airport_search_update "
+    "AFTER UPDATE ON airport_airport BEGIN "
+    "INSERT INTO airport_airport_search"
+    "(airport_airport_search, rowid, name, closest_big_city) "
+    "VALUES ('delete', old.id, old.name, old.closest_big_city); "
+    "INSERT INTO airport_airport_search(rowid, name, closest_big_city) "
+    "VALUES (new.id, new.name, new.closest_big_city); END",
+]
+
+
+def create_search_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+
+    if connection.vendor == "postgresql":
+        for field in SEARCH_FIELDS:
+            schema_editor.execute(POSTGRES_INDEX.format(field=field))
+    elif (
+            connection.vendor == "sqlite"
+            and connection.Database.sqlite_version_info >= (3, 34)
+    ):
+        for statement in SQLITE_FTS_TABLE:
+            schema_editor.execute(statement)
+
+
+def drop_search_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+
+    if connection.vendor == "postgresql":
+        for field in SEARCH_FIELDS:
+            schema_editor.execute(
+                f"DROP INDEX IF EXISTS airport_{field}_trgm_idx"
+            )
+    elif connection.vendor == "sqlite":
+        for action in ("insert", "delete", "update"):
+            schema_editor.execute(
+                f"DROP TRIGGER IF EXISTS airport_airport_search_{action}"
+            )
+        schema_editor.execute("DROP TABLE IF EXISTS airport_airport_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airport', '0013_orderrequest'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.1.1 on 2026-10-17 07:16
+
+from django.db import migrations, models
+
+
+# as airport.search built documents when this migration was written
+DOCUMENT_FIELDS = (
+    "route__source__name",
+    "route__source__closest_big_city",
+    "route__destination__name",
+    "route__destination__closest_big_city",
+    "airplane__name",
+)
+DOCUMENT_SEPARATOR = "\n"
+
+POSTGRES_INDEX = (
+    "CREATE INDEX IF NOT EXISTS airport_flight_search_document_idx "
+    "ON airport_flight USING gin (to_tsvector('simple', search_document))"
+)
+
+
+def fill_search_documents(apps, schema_editor):
+    Flight = apps.get_model("airport", "Flight")
+    flights = Flight.objects.using(schema_editor.connection.alias)
+
+    pairs = flights.order_by().values_list(
+        "route_id", "airplane_id", *DOCUMENT_FIELDS
+    ).distinct()
+    for route_id, airplane_id, *values in pairs:
+        flights.filter(route_id=route_id, airplane_id=airplane_id).update(
+            search_document=DOCUMENT_SEPARATOR.join(
+                " ".join(value.casefold().split()) for value in values
+            )
+        )
+
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(POSTGRES_INDEX)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(
+            "DROP INDEX IF EXISTS airport_flight_search_document_idx"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airport', '0014_airport_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='flight',
+            name='search_document',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.RunPython(fill_search_documents, drop_search_index),
+    ]
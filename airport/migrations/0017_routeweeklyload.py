@@ -0,0 +1,29 @@
+# Generated by Django 5.1.1 on 2026-10-17 07:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airport', '0016_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RouteWeeklyLoad',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week', models.DateField()),
+                ('flights', models.PositiveIntegerField(default=0)),
+                ('seats_sold', models.IntegerField(default=0)),
+                ('capacity', models.PositiveIntegerField(default=0)),
+                ('route', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='weekly_loads', to='airport.route')),
+            ],
+            options={
+                'ordering': ('-week', 'route'),
+                'constraints': [models.UniqueConstraint(fields=('route', 'week'), name='route_weekly_load_unique_route_and_week')],
+            },
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.1.1 on 2026-10-17 08:19
+
+from importlib import import_module
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def _count(model, counter, counted, foreign_key):
+    counts = (
+        counted.objects.filter(**{foreign_key: OuterRef("pk")})
+        .order_by()
+        .values(foreign_key)
+        .annotate(count=Count("*"))
+        .values("count")
+    )
+    model.objects.update(**{counter: Coalesce(Subquery(counts), Value(0))})
+
+
+def restore_search_indexes(apps, schema_editor):
+    # SQLite copies airport_airport to a new table to add columns, which
+    # drops the triggers keeping its search table in sync
+    import_module(
+        "airport.migrations.0014_airport_search_indexes"
+    ).create_search_indexes(apps, schema_editor)
+
+
+def fill_counter_caches(apps, schema_editor):
+    Airplane = apps.get_model("airport", "Airplane")
+    Airport = apps.get_model("airport", "Airport")
+    Crew = apps.get_model("airport", "Crew")
+    Flight = apps.get_model("airport", "Flight")
+    Route = apps.get_model("airport", "Route")
+
+    _count(Airplane, "flights_count", Flight, "airplane_id")
+    _count(Route, "flights_count", Flight, "route_id")
+    _count(Crew, "flights_count", Flight.crew.through, "crew_id")
+    _count(Airport, "routes_from_count", Route, "source_id")
+    _count(Airport, "routes_to_count", Route, "destination_id")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airport', '0019_tableversion'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, restore_search_indexes),
+        migrations.AddField(
+            model_name='airplane',
+            name='flights_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='airport',
+            name='routes_from_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='airport',
+            name='routes_to_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='crew',
+            name='flights_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='route',
+            name='flights_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(restore_search_indexes, migrations.RunPython.noop),
+        migrations.RunPython(fill_counter_caches, migrations.RunPython.noop),
+    ]
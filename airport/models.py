@@ -1,8 +1,10 @@
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.db.models import UniqueConstraint
 
+from airport.search import flight_search_document
 from airport.utils import airplane_image
 from airport.validators import (
     validate_time,
@@ -31,6 +33,8 @@ class Airplane(models.Model):
         on_delete=models.CASCADE,
         related_name="airplanes"
     )
+    # counter caches are kept by signals, see airport.counters
+    flights_count = models.IntegerField(default=0, editable=False)
 
     @property
     def capacity(self):
@@ -69,6 +73,8 @@ class Airplane(models.Model):
 class Airport(models.Model):
     name = models.CharField(max_length=255)
     closest_big_city = models.CharField(max_length=255)
+    routes_from_count = models.IntegerField(default=0, editable=False)
+    routes_to_count = models.IntegerField(default=0, editable=False)
 
     def __str__(self) -> str:
         return f"Airport - {self.name}, closest to {self.closest_big_city}"
@@ -86,6 +92,7 @@ class Route(models.Model):
         related_name="routes_to"
     )
     distance = models.PositiveIntegerField()
+    flights_count = models.IntegerField(default=0, editable=False)
 
     def __str__(self) -> str:
         return f"Route {self.source.name} -- {self.destination.name}"
@@ -102,6 +109,7 @@ class Route(models.Model):
 class Crew(models.Model):
     first_name = models.CharField(max_length=255)
     last_name = models.CharField(max_length=255)
+    flights_count = models.IntegerField(default=0, editable=False)
 
     @property
     def full_name(self):
@@ -115,7 +123,8 @@ class Flight(models.Model):
     route = models.ForeignKey(
         Route,
         on_delete=models.CASCADE,
-        related_name="flights"
+        related_name="flights",
+        db_index=False
     )
     airplane = models.ForeignKey(
         Airplane,
@@ -125,9 +134,35 @@ class Flight(models.Model):
     departure_time = models.DateTimeField()
     arrival_time = models.DateTimeField()
     crew = models.ManyToManyField(Crew, related_name="flights")
+    seats_sold = models.PositiveIntegerField(default=0, editable=False)
+    seats_available = models.IntegerField(
+        default=0,
+        editable=False,
+        db_index=True
+    )
+    seat_map = models.BinaryField(default=b"")
+    # normalized names of the route airports and the airplane, kept in sync
+    # by signals and searched instead of joining them
+    search_document = models.TextField(default="", editable=False)
+
+    SEAT_FIELDS = ("seats_sold", "seats_available", "seat_map")
 
     class Meta:
         ordering = ("departure_time",)
+        indexes = [
+            # upcoming flights, departure day filters, default ordering and
+            # keyset pages
+            models.Index(
+                fields=["departure_time", "id"],
+                name="flight_departure_idx"
+            ),
+            models.Index(fields=["arrival_time"], name="flight_arrival_idx"),
+            # also serves lookups by route alone
+            models.Index(
+                fields=["route", "departure_time"],
+                name="flight_route_departure_idx"
+            ),
+        ]
 
     def __str__(self) -> str:
         return (f"{self.route} - {self.airplane.name}, "
@@ -150,6 +185,20 @@ class Flight(models.Model):
             update_fields=None,
     ):
         self.full_clean()
+        self.search_document = flight_search_document(self)
+
+        if self._state.adding:
+            self.seats_available = self.airplane.capacity - self.seats_sold
+        elif update_fields is None:
+            # Seat fields are written by ticket writes under a row lock,
+            # so the values loaded on this instance may already be stale.
+            update_fields = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.SEAT_FIELDS
+            ]
+
         return super().save(
             *args,
             force_insert=force_insert,
@@ -217,11 +266,189 @@ class Order(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
-        related_name="orders"
+        related_name="orders",
+        db_index=False
     )
 
     class Meta:
         ordering = ("-created_at",)
+        indexes = [
+            # orders of a user, newest first, also for keyset pages
+            models.Index(
+                fields=["user", "-created_at", "-id"],
+                name="order_user_created_idx"
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"{self.user.username} order"
+
+
+class OrderRequest(models.Model):
+    """Order payload queued by an asynchronous order request"""
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        PROCESSING = "processing", "Processing"
+        COMPLETED = "completed", "Completed"
+        FAILED = "failed", "Failed"
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="order_requests",
+        db_index=False
+    )
+    payload = models.JSONField()
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.PENDING
+    )
+    order = models.OneToOneField(
+        Order,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="order_request"
+    )
+    errors = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ("-created_at",)
+        indexes = [
+            models.Index(
+                fields=["status", "created_at"],
+                name="order_request_queue_idx"
+            ),
+            models.Index(
+                fields=["user", "-created_at"],
+                name="order_request_user_idx"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user} order request ({self.status})"
+
+
+class SeatHold(models.Model):
+    row = models.PositiveIntegerField()
+    seat = models.PositiveIntegerField()
+    flight = models.ForeignKey(
+        Flight,
+        on_delete=models.CASCADE,
+        related_name="seat_holds"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="seat_holds"
+    )
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(
+                fields=["flight", "row", "seat"],
+                name="seat_hold_unique_row_and_seat"
+            )
+        ]
+
+    def __str__(self) -> str:
+        return str(
+            f"{self.user} hold for (row - {self.row}, seat - {self.seat}) "
+            f"until {self.expires_at.strftime('%d %b %y %H:%M')}"
+        )
+
+
+class IdempotencyKey(models.Model):
+    """Stored response of a POST sent with an ``Idempotency-Key`` header.
+
+    ``status_code`` stays empty while the first request is being processed,
+    since ``locked_at``.
+    """
+
+    key = models.CharField(max_length=255)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="idempotency_keys"
+    )
+    request_hash = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(
+        null=True,
+        blank=True,
+        encoder=DjangoJSONEncoder
+    )
+    response_headers = models.JSONField(null=True, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(
+                fields=["user", "key"],
+                name="idempotency_key_unique_user_and_key"
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user} idempotency key {self.key}"
+
+
+class RouteWeeklyLoad(models.Model):
+    """Seats sold and offered on a route during one week.
+
+    ``week`` is the Monday of the local week of flight departures. Rows are
+    kept up to date by ``airport.route_loads``.
+    """
+
+    route = models.ForeignKey(
+        Route,
+        on_delete=models.CASCADE,
+        related_name="weekly_loads",
+        db_index=False
+    )
+    week = models.DateField()
+    flights = models.PositiveIntegerField(default=0)
+    seats_sold = models.IntegerField(default=0)
+    capacity = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ("-week", "route")
+        constraints = [
+            UniqueConstraint(
+                fields=["route", "week"],
+                name="route_weekly_load_unique_route_and_week"
+            )
+        ]
+
+    @property
+    def load_factor(self) -> float | None:
+        if not self.capacity:
+            return None
+
+        return self.seats_sold / self.capacity
+
+    def __str__(self) -> str:
+        return f"{self.route} week of {self.week}"
+
+
+class TableVersion(models.Model):
+    """Version of a table, or of one row, for conditional GETs.
+
+    ``key`` is the model label, or the label and the primary key for a
+    row. Rows are bumped by ``airport.versions``.
+    """
+
+    key = models.CharField(max_length=100, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+    modified_at = models.DateTimeField()
+
+    def __str__(self) -> str:
+        return f"{self.key} version {self.version}"
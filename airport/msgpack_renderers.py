@@ -0,0 +1,45 @@
+"""MessagePack renderer and parser.
+
+Values msgpack does not know are converted by the DRF JSON encoder, as
+for JSON responses.
+"""
+import msgpack
+from rest_framework import parsers, renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.utils.encoders import JSONEncoder
+
+
+_encoder = JSONEncoder()
+
+
+class MessagePackRenderer(renderers.BaseRenderer):
+    media_type = "application/msgpack"
+    format = "msgpack"  # noqa: VNE003
+    charset = None
+    render_style = "binary"
+
+    def render(
+            self,
+            data,
+            accepted_media_type: str = None,
+            renderer_context: dict = None
+    ) -> bytes:
+        if data is None:
+            return b""
+
+        return msgpack.packb(data, default=_encoder.default)
+
+
+class MessagePackParser(parsers.BaseParser):
+    media_type = "application/msgpack"
+
+    def parse(
+            self,
+            stream,
+            media_type: str = None,
+            parser_context: dict = None
+    ):
+        try:
+            return msgpack.unpackb(stream.read(), strict_map_key=False)
+        except (msgpack.UnpackException, ValueError, TypeError) as error:
+            raise ParseError(f"MessagePack parse error - {error}")
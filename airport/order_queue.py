@@ -0,0 +1,154 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import APIException, ValidationError
+
+from airport.models import OrderRequest
+from airport.serializers import OrderSerializer
+from airport.transactions import retry_on_conflict
+
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_order(
+        user: settings.AUTH_USER_MODEL,
+        payload: dict
+) -> OrderRequest:
+    return OrderRequest.objects.create(user=user, payload=payload)
+
+
+@retry_on_conflict()
+def claim_order_requests(batch_size: int) -> list[OrderRequest]:
+    """Mark the oldest queued requests as processing and return them.
+
+    Requests claimed by a worker which did not finish them within
+    ``ORDER_QUEUE_CLAIM_TIMEOUT`` are claimed again. Rows locked by other
+    workers are skipped on databases supporting ``SKIP LOCKED``.
+    """
+
+    now = timezone.now()
+    with transaction.atomic():
+        order_requests = list(
+            OrderRequest.objects.select_for_update(
+                skip_locked=True,
+                of=("self",)
+            )
+            .filter(
+                Q(status=OrderRequest.Status.PENDING)
+                | Q(
+                    status=OrderRequest.Status.PROCESSING,
+                    claimed_at__lt=now - settings.ORDER_QUEUE_CLAIM_TIMEOUT,
+                )
+            )
+            .select_related("user")
+            .order_by("created_at")[:batch_size]
+        )
+        OrderRequest.objects.filter(
+            pk__in=[order_request.pk for order_request in order_requests]
+        ).update(status=OrderRequest.Status.PROCESSING, claimed_at=now)
+
+    return order_requests
+
+
+def _failure_errors(error: Exception) -> dict:
+    if isinstance(error, ValidationError):
+        return error.detail
+    if isinstance(error, APIException):
+        return {"detail": error.detail}
+
+    return {"detail": "Order could not be processed"}
+
+
+@retry_on_conflict()
+def _create_order(order_request: OrderRequest) -> OrderRequest:
+    with transaction.atomic():
+        locked = OrderRequest.objects.select_for_update(
+            of=("self",)
+        ).select_related("user").get(pk=order_request.pk)
+
+        # another worker finished the request after reclaiming it
+        if (
+                locked.status != OrderRequest.Status.PROCESSING
+                or locked.order_id is not None
+        ):
+            return locked
+
+        serializer = OrderSerializer(data=locked.payload)
+        try:
+            with transaction.atomic():
+                serializer.is_valid(raise_exception=True)
+                locked.order = serializer.save(user=locked.user)
+        except APIException as error:
+            locked.status = OrderRequest.Status.FAILED
+            locked.errors = _failure_errors(error)
+        else:
+            locked.status = OrderRequest.Status.COMPLETED
+
+        locked.processed_at = timezone.now()
+        locked.save(
+            update_fields=["status", "order", "errors", "processed_at"]
+        )
+
+    return locked
+
+
+def process_order_request(order_request: OrderRequest) -> OrderRequest:
+    """Create the order of a queued request, errors are stored on it.
+
+    The request row stays locked while its order is created and it is
+    marked in the same transaction, so a request reclaimed from a slow
+    worker never gets a second order.
+    """
+
+    try:
+        return _create_order(order_request)
+    except Exception as error:
+        if not isinstance(error, APIException):
+            logger.exception("Order request %s failed", order_request.pk)
+
+        OrderRequest.objects.filter(
+            pk=order_request.pk,
+            status=OrderRequest.Status.PROCESSING,
+            order__isnull=True,
+        ).update(
+            status=OrderRequest.Status.FAILED,
+            errors=_failure_errors(error),
+            processed_at=timezone.now(),
+        )
+        order_request.refresh_from_db()
+        return order_request
+
+
+def _process_in_thread(order_request: OrderRequest) -> OrderRequest:
+    try:
+        return process_order_request(order_request)
+    finally:
+        connection.close()
+
+
+def process_order_queue(batch_size: int = 50, workers: int = 4) -> int:
+    """Drain the queue batch by batch, returns number of processed requests.
+
+    Every batch is processed by at most ``workers`` threads, each with its
+    own database connection. A single worker runs in the calling thread.
+    """
+
+    processed = 0
+    if workers == 1:
+        while order_requests := claim_order_requests(batch_size):
+            processed += len(list(map(process_order_request, order_requests)))
+
+        return processed
+
+    with ThreadPoolExecutor(workers) as executor:
+        while order_requests := claim_order_requests(batch_size):
+            processed += len(
+                list(executor.map(_process_in_thread, order_requests))
+            )
+
+    return processed
@@ -1,10 +1,175 @@
+import base64
+import binascii
+import datetime
+import hashlib
+import json
+import math
+from functools import partial
+from operator import attrgetter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db import connections
+from django.db.models import Q, QuerySet
 from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from rest_framework.views import APIView
+
+
+COUNT_STRATEGIES = ("exact", "cached", "estimated", "omitted")
+
+
+def estimate_count(queryset: QuerySet) -> int | None:
+    """Rows of ``queryset`` by the Postgres planner, ``None`` elsewhere.
+
+    The planner takes them from ``reltuples`` of the table and the
+    statistics of the filtered columns, so nothing is counted.
+    """
+
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+
+    sql, params = queryset.order_by().values("pk").query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class ApproximatePaginator(Paginator):
+    """Paginator which takes ``count`` as given, ``None`` when not counted.
+
+    Every page is read with one extra row to know whether there is a next
+    one, so a stale or estimated count never hides rows nor adds pages.
+    The ``last`` page is taken from the count, there is none without it.
+    """
+
+    def __init__(
+            self,
+            object_list: QuerySet,
+            per_page: int,
+            count: int | None = None
+    ):
+        super().__init__(object_list, per_page)
+        self.count = count
+        self.num_pages = (
+            None if count is None
+            else max(1, math.ceil(count / per_page))
+        )
+
+    def validate_number(self, number) -> int:
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger("That page number is not an integer")
+
+        if number < 1:
+            raise EmptyPage("That page number is less than 1")
+
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage("That page contains no results")
+
+        self.num_pages = number + (len(rows) > self.per_page)
+        return self._get_page(rows[:self.per_page], number, self)
 
 
 class PaginationWithPages(pagination.PageNumberPagination):
+    """Page numbers with the count strategy of the view.
+
+    ``count_strategy`` of the view is one of ``COUNT_STRATEGIES``:
+    ``cached`` keeps counts for ``PAGINATION_COUNT_CACHE_TIMEOUT`` per
+    filter params (and per user unless ``count_cache_per_user`` of the
+    view is false), ``estimated`` takes them from the Postgres planner
+    and is ``exact`` on other databases, ``omitted`` does not count.
+    """
+
     page_size_query_param = "page_size"
     max_page_size = 10
+    count_strategy = "exact"
+    # params which do not change the number of rows
+    uncounted_query_params = ("ordering", "cursor", "fields", "exclude")
+
+    def paginate_queryset(
+            self,
+            queryset: QuerySet,
+            request: Request,
+            view: APIView = None
+    ) -> list | None:
+        strategy = getattr(view, "count_strategy", self.count_strategy)
+        if strategy not in COUNT_STRATEGIES:
+            raise ValueError(f"Unknown count strategy {strategy!r}")
+
+        count = None
+        if strategy == "cached":
+            count = self.get_cached_count(queryset, request, view)
+        elif strategy == "estimated":
+            count = estimate_count(queryset)
+            if count is None:
+                strategy = "exact"
+
+        self.count_strategy_used = strategy
+        if strategy != "exact":
+            self.django_paginator_class = partial(
+                ApproximatePaginator,
+                count=count
+            )
+
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_count_cache_key(self, request: Request, view: APIView) -> str:
+        skipped = {
+            self.page_query_param,
+            self.page_size_query_param,
+            *self.uncounted_query_params,
+        }
+        params = sorted(
+            (key, value.strip())
+            for key, values in request.query_params.lists()
+            if key not in skipped
+            for value in values
+            if value.strip()
+        )
+        user = (
+            request.user.pk
+            if getattr(view, "count_cache_per_user", True)
+            else None
+        )
+        digest = hashlib.sha256(
+            json.dumps([request.path, user, params]).encode()
+        ).hexdigest()
+        return f"pagination_count:{digest}"
+
+    def get_cached_count(
+            self,
+            queryset: QuerySet,
+            request: Request,
+            view: APIView
+    ) -> int:
+        key = self.get_count_cache_key(request, view)
+        count = cache.get(key)
+        if count is None:
+            count = queryset.count()
+            cache.set(
+                key,
+                count,
+                settings.PAGINATION_COUNT_CACHE_TIMEOUT.total_seconds()
+            )
+
+        return count
 
     def get_paginated_response(self, data: dict) -> Response:
         return Response(
@@ -14,7 +179,168 @@ class PaginationWithPages(pagination.PageNumberPagination):
                     "previous": self.get_previous_link()
                 },
                 "count": self.page.paginator.count,
+                "count_strategy": self.count_strategy_used,
                 "page": self.page.number,
                 "results": data,
             }
         )
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+
+    raise TypeError(f"Cannot put {type(value).__name__} into a cursor")
+
+
+class KeysetPagination(PaginationWithPages):
+    """Page numbers, or keyset pages when ``cursor`` is in the query.
+
+    A keyset page continues after the last row of the previous one in the
+    queryset ordering, with ``id`` as the tie breaker, so there is neither
+    OFFSET nor COUNT and deep pages cost as much as the first one. An empty
+    ``cursor`` starts from the first page.
+    """
+
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    keyset = False
+
+    def paginate_queryset(
+            self,
+            queryset: QuerySet,
+            request: Request,
+            view: APIView = None
+    ) -> list | None:
+        if self.cursor_query_param not in request.query_params:
+            return super().paginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        self.keyset = True
+        self.request = request
+        self.ordering = self.get_ordering(queryset)
+
+        cursor = request.query_params[self.cursor_query_param]
+        if cursor:
+            queryset = queryset.filter(self.after(self.decode_cursor(cursor)))
+
+        rows = list(queryset.order_by(*self.ordering)[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        self.last_row = rows[-1] if rows else None
+
+        return rows
+
+    def get_ordering(self, queryset: QuerySet) -> list[str]:
+        query = queryset.query
+        ordering = list(
+            query.order_by
+            or (query.default_ordering and queryset.model._meta.ordering)
+            or []
+        )
+        if not all(isinstance(field, str) for field in ordering):
+            raise NotFound("Keyset pages need ordering by fields")
+
+        ordering = [
+            field.replace("pk", "id") if field.lstrip("-") == "pk" else field
+            for field in ordering
+        ]
+        if not {"id", "-id"} & set(ordering):
+            descending = bool(ordering) and ordering[0].startswith("-")
+            ordering.append("-id" if descending else "id")
+
+        return ordering
+
+    def after(self, values: list) -> Q:
+        """Rows after ``values`` in the lexicographic ``ordering``"""
+
+        condition = None
+        for field, value in reversed(list(zip(self.ordering, values))):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            beyond = Q(**{f"{name}__{lookup}": value})
+            condition = (
+                beyond if condition is None
+                else beyond | Q(**{name: value}) & condition
+            )
+
+        # a plain range on the leading field lets the index do the work
+        first = self.ordering[0]
+        lookup = "lte" if first.startswith("-") else "gte"
+        return Q(**{f"{first.lstrip('-')}__{lookup}": values[0]}) & condition
+
+    def encode_cursor(self, values: list) -> str:
+        data = json.dumps(
+            {"ordering": self.ordering, "values": values},
+            default=_encode_value
+        )
+        return base64.urlsafe_b64encode(data.encode()).decode()
+
+    def decode_cursor(self, cursor: str) -> list:
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            values = data["values"]
+            valid = (
+                data["ordering"] == self.ordering
+                and len(values) == len(self.ordering)
+            )
+        except (binascii.Error, ValueError, KeyError, TypeError):
+            valid = False
+
+        if not valid:
+            raise NotFound(self.invalid_cursor_message)
+
+        return values
+
+    def get_next_link(self) -> str | None:
+        if not self.keyset:
+            return super().get_next_link()
+
+        if not self.has_next:
+            return None
+
+        # rows of values() querysets are keyed by the ordering fields
+        values = [
+            self.last_row[field.lstrip("-")]
+            if isinstance(self.last_row, dict)
+            else attrgetter(field.lstrip("-").replace("__", "."))(
+                self.last_row
+            )
+            for field in self.ordering
+        ]
+        url = remove_query_param(
+            self.request.build_absolute_uri(),
+            self.page_query_param
+        )
+        return replace_query_param(
+            url,
+            self.cursor_query_param,
+            self.encode_cursor(values)
+        )
+
+    def get_paginated_response(self, data: dict) -> Response:
+        if not self.keyset:
+            return super().get_paginated_response(data)
+
+        return Response(
+            {
+                "links": {"next": self.get_next_link(), "previous": None},
+                "results": data,
+            }
+        )
+
+    def get_schema_operation_parameters(self, view: APIView) -> list[dict]:
+        return super().get_schema_operation_parameters(view) + [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Keyset pages without count, "
+                               "empty for the first page",
+                "schema": {"type": "string"},
+            }
+        ]
@@ -0,0 +1,191 @@
+import datetime
+from typing import Iterable
+
+from django.db import transaction
+from django.db.models import (
+    Count,
+    DateField,
+    F,
+    Max,
+    Min,
+    Q,
+    QuerySet,
+    Sum,
+)
+from django.db.models.functions import TruncWeek
+from django.utils import timezone
+
+from airport.models import Flight, RouteWeeklyLoad
+
+
+LoadKey = tuple[int, datetime.date]
+
+COUNTER_FIELDS = ("flights", "seats_sold", "capacity")
+
+
+def week_of(moment: datetime.datetime) -> datetime.date:
+    """Monday of the local week of ``moment``"""
+
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+
+    day = timezone.localtime(moment).date()
+    return day - datetime.timedelta(days=day.weekday())
+
+
+def _week_start(week: datetime.date) -> datetime.datetime:
+    return timezone.make_aware(
+        datetime.datetime.combine(week, datetime.time.min)
+    )
+
+
+def _weeks_flights(
+        start: datetime.date,
+        end: datetime.date
+) -> QuerySet[Flight]:
+    return Flight.objects.filter(
+        departure_time__gte=_week_start(start),
+        departure_time__lt=_week_start(end),
+    )
+
+
+def _with_week(flights: QuerySet[Flight]) -> QuerySet[Flight]:
+    return flights.annotate(
+        week=TruncWeek(
+            "departure_time",
+            tzinfo=timezone.get_current_timezone(),
+            output_field=DateField()
+        )
+    )
+
+
+def _week_loads(flights: QuerySet[Flight]) -> QuerySet:
+    return (
+        _with_week(flights)
+        .values("route", "week")
+        .annotate(
+            flights=Count("id"),
+            seats_sold=Sum("seats_sold"),
+            capacity=Sum(F("airplane__rows") * F("airplane__seats_in_row")),
+        )
+        .order_by()
+    )
+
+
+def refresh_route_loads(keys: Iterable[LoadKey]) -> None:
+    """Recount summary rows of (route id, week) keys from their flights"""
+
+    for route_id, week in sorted(set(keys)):
+        load = _week_loads(
+            _weeks_flights(week, week + datetime.timedelta(weeks=1))
+            .filter(route_id=route_id)
+        ).order_by("week").first()
+
+        if load is None:
+            RouteWeeklyLoad.objects.filter(
+                route_id=route_id,
+                week=week
+            ).delete()
+        else:
+            RouteWeeklyLoad.objects.update_or_create(
+                route_id=route_id,
+                week=week,
+                defaults={field: load[field] for field in COUNTER_FIELDS}
+            )
+
+
+def refresh_flight_loads(flights: QuerySet[Flight]) -> None:
+    """Recount summary rows of every week ``flights`` depart in"""
+
+    refresh_route_loads(
+        _with_week(flights).order_by().values_list("route", "week").distinct()
+    )
+
+
+def record_seats_sold(sold_per_week: dict[LoadKey, int]) -> None:
+    """Add seats sold by a ticket write to the summary rows.
+
+    Called in the transaction of the ticket write, rows which do not exist
+    yet are recounted once it commits.
+    """
+
+    missing = []
+    for (route_id, week), sold in sorted(sold_per_week.items()):
+        updated = RouteWeeklyLoad.objects.filter(
+            route_id=route_id,
+            week=week
+        ).update(seats_sold=F("seats_sold") + sold)
+
+        if not updated:
+            missing.append((route_id, week))
+
+    if missing:
+        transaction.on_commit(lambda: refresh_route_loads(missing))
+
+
+def _rebuild_chunk(start: datetime.date, end: datetime.date) -> int:
+    # Locking the rows first makes ticket writes, which update flight
+    # counters before the summary, either finish before the counters are
+    # read or wait and add their seats to the rebuilt rows.
+    existing = {
+        (load.route_id, load.week): load
+        for load in RouteWeeklyLoad.objects.select_for_update().filter(
+            week__gte=start,
+            week__lt=end
+        )
+    }
+
+    created = []
+    updated = []
+    for load in _week_loads(_weeks_flights(start, end)):
+        row = existing.pop((load["route"], load["week"]), None)
+        if row is None:
+            created.append(
+                RouteWeeklyLoad(
+                    route_id=load["route"],
+                    week=load["week"],
+                    **{field: load[field] for field in COUNTER_FIELDS}
+                )
+            )
+        else:
+            for field in COUNTER_FIELDS:
+                setattr(row, field, load[field])
+            updated.append(row)
+
+    RouteWeeklyLoad.objects.bulk_create(created)
+    RouteWeeklyLoad.objects.bulk_update(updated, COUNTER_FIELDS)
+    RouteWeeklyLoad.objects.filter(
+        pk__in=[row.pk for row in existing.values()]
+    ).delete()
+
+    return len(created) + len(updated)
+
+
+def rebuild_route_loads(chunk_weeks: int = 26) -> int:
+    """Recount all summary rows from flights, one transaction per chunk.
+
+    Returns the number of (route, week) rows kept.
+    """
+
+    bounds = Flight.objects.aggregate(
+        first=Min("departure_time"),
+        last=Max("departure_time")
+    )
+    if bounds["first"] is None:
+        RouteWeeklyLoad.objects.all().delete()
+        return 0
+
+    week = week_of(bounds["first"])
+    last_week = week_of(bounds["last"])
+    RouteWeeklyLoad.objects.filter(
+        Q(week__lt=week) | Q(week__gt=last_week)
+    ).delete()
+
+    rebuilt = 0
+    while week <= last_week:
+        end = week + datetime.timedelta(weeks=chunk_weeks)
+        with transaction.atomic():
+            rebuilt += _rebuild_chunk(week, end)
+        week = end
+
+    return rebuilt
@@ -1,5 +1,6 @@
 from typing import Callable
 
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import (
     extend_schema,
     OpenApiParameter,
@@ -7,99 +8,121 @@ from drf_spectacular.utils import (
 )
 import datetime
 
+from airport.exports import EXPORT_CONTENT_TYPES
+from airport.serializers import (
+    OrderAutoAssignSerializer,
+    OrderRequestSerializer,
+    OrderSerializer,
+    ItinerarySearchSerializer,
+    ItinerarySerializer,
+    DistanceSearchSerializer,
+    DistanceSerializer,
+    AirportAutocompleteSerializer,
+    AirportAutocompleteQuerySerializer,
+    FareCalendarQuerySerializer,
+    FareCalendarSerializer,
+    RouteWeeklyLoadQuerySerializer,
+    ExportQuerySerializer,
+)
+
+
+FLIGHT_DATE_PARAMETERS = [
+    OpenApiParameter(
+        "departure_day",
+        type=str,
+        description="Find all flights at selected departure day",
+        required=False,
+        examples=[
+            OpenApiExample("", value=""),
+            OpenApiExample(
+                "today",
+                value=str(datetime.date.today())
+            ),
+            OpenApiExample("27 October", value="2024-10-27"),
+        ]
+    ),
+    OpenApiParameter(
+        "arrival_day",
+        type=str,
+        description="Find all flights at selected arrival day",
+        required=False,
+        examples=[
+            OpenApiExample("", value=""),
+            OpenApiExample(
+                "today",
+                value=str(datetime.date.today())
+            ),
+            OpenApiExample("28 October", value="2024-10-28"),
+        ]
+    ),
+    OpenApiParameter(
+        "departure_start",
+        type=str,
+        description="Find all flights departure time that "
+                    "will fly after selected date",
+        required=False,
+        examples=[
+            OpenApiExample("", value=""),
+            OpenApiExample(
+                "today",
+                value=str(datetime.date.today())
+            ),
+            OpenApiExample("16 October", value="2024-10-16"),
+        ]
+    ),
+    OpenApiParameter(
+        "arriving_start",
+        type=str,
+        description="Find all flights arriving time that "
+                    "will fly after selected date",
+        required=False,
+        examples=[
+            OpenApiExample("", value=""),
+            OpenApiExample(
+                "today",
+                value=str(datetime.date.today())
+            ),
+            OpenApiExample("16 October", value="2024-10-16"),
+        ]
+    ),
+    OpenApiParameter(
+        "departure_end",
+        type=str,
+        description="Find all flights departure time that "
+                    "will fly before selected date",
+        required=False,
+        examples=[
+            OpenApiExample("", value=""),
+            OpenApiExample(
+                "today",
+                value=str(datetime.date.today())
+            ),
+            OpenApiExample("1 November", value="2024-11-01"),
+        ]
+    ),
+    OpenApiParameter(
+        "arriving_end",
+        type=str,
+        description="Find all flights arriving time that "
+                    "will fly before selected date",
+        required=False,
+        examples=[
+            OpenApiExample("", value=""),
+            OpenApiExample(
+                "today",
+                value=str(datetime.date.today())
+            ),
+            OpenApiExample("28 October", value="2024-10-28"),
+        ]
+    ),
+]
+
 
 def flight_list_schema() -> Callable:
     def decorator(func: Callable):
         return extend_schema(
             parameters=[
-                OpenApiParameter(
-                    "departure_day",
-                    type=str,
-                    description="Find all flights at selected departure day",
-                    required=False,
-                    examples=[
-                        OpenApiExample("", value=""),
-                        OpenApiExample(
-                            "today",
-                            value=str(datetime.date.today())
-                        ),
-                        OpenApiExample("27 October", value="2024-10-27"),
-                    ]
-                ),
-                OpenApiParameter(
-                    "arrival_day",
-                    type=str,
-                    description="Find all flights at selected arrival day",
-                    required=False,
-                    examples=[
-                        OpenApiExample("", value=""),
-                        OpenApiExample(
-                            "today",
-                            value=str(datetime.date.today())
-                        ),
-                        OpenApiExample("28 October", value="2024-10-28"),
-                    ]
-                ),
-                OpenApiParameter(
-                    "departure_start",
-                    type=str,
-                    description="Find all flights departure time that "
-                                "will fly after selected date",
-                    required=False,
-                    examples=[
-                        OpenApiExample("", value=""),
-                        OpenApiExample(
-                            "today",
-                            value=str(datetime.date.today())
-                        ),
-                        OpenApiExample("16 October", value="2024-10-16"),
-                    ]
-                ),
-                OpenApiParameter(
-                    "arriving_start",
-                    type=str,
-                    description="Find all flights arriving time that "
-                                "will fly after selected date",
-                    required=False,
-                    examples=[
-                        OpenApiExample("", value=""),
-                        OpenApiExample(
-                            "today",
-                            value=str(datetime.date.today())
-                        ),
-                        OpenApiExample("16 October", value="2024-10-16"),
-                    ]
-                ),
-                OpenApiParameter(
-                    "departure_end",
-                    type=str,
-                    description="Find all flights departure time that "
-                                "will fly before selected date",
-                    required=False,
-                    examples=[
-                        OpenApiExample("", value=""),
-                        OpenApiExample(
-                            "today",
-                            value=str(datetime.date.today())
-                        ),
-                        OpenApiExample("1 November", value="2024-11-01"),
-                    ]
-                ),
-                OpenApiParameter(
-                    "arriving_end",
-                    type=str,
-                    description="Find all flights arriving time that "
-                                "will fly before selected date",
-                    required=False,
-                    examples=[
-                        OpenApiExample("", value=""),
-                        OpenApiExample(
-                            "today",
-                            value=str(datetime.date.today())
-                        ),
-                        OpenApiExample("28 October", value="2024-10-28"),
-                    ]
-                ),
+                *FLIGHT_DATE_PARAMETERS,
                 OpenApiParameter(
                     "ordering",
                     type={"type": "list", "items": {"type": "str"}},
@@ -145,6 +168,29 @@ def flight_list_schema() -> Callable:
     return decorator
 
 
+def flight_detail_schema() -> Callable:
+    def decorator(func: Callable):
+        return extend_schema(
+            parameters=[
+                OpenApiParameter(
+                    "seat_map",
+                    type=bool,
+                    description="Add `seat_map` - base64 encoded bitset of "
+                                "taken seats, bit `(row - 1) * seats_in_row "
+                                "+ (seat - 1)` of little-endian bytes is "
+                                "set when the seat is taken",
+                    required=False,
+                    examples=[
+                        OpenApiExample("", value=""),
+                        OpenApiExample("with seat map", value="1"),
+                    ]
+                ),
+            ]
+        )(func)
+
+    return decorator
+
+
 def route_list_schema() -> Callable:
     def decorator(func: Callable):
         return extend_schema(
@@ -250,10 +296,22 @@ def airplane_list_schema() -> Callable:
     return decorator
 
 
+ORDER_NORMALIZED_PARAMETER = OpenApiParameter(
+    "normalized",
+    type=bool,
+    description=(
+        "Flight ids in tickets, and a `flights` map of the flights by id "
+        "which renders each flight once"
+    ),
+    required=False,
+)
+
+
 def order_list_schema() -> Callable:
     def decorator(func: Callable):
         return extend_schema(
             parameters=[
+                ORDER_NORMALIZED_PARAMETER,
                 OpenApiParameter(
                     "ordering",
                     type={"type": "list", "items": {"type": "str"}},
@@ -271,3 +329,133 @@ def order_list_schema() -> Callable:
         )(func)
 
     return decorator
+
+
+def order_detail_schema() -> Callable:
+    def decorator(func: Callable):
+        return extend_schema(parameters=[ORDER_NORMALIZED_PARAMETER])(func)
+
+    return decorator
+
+
+IDEMPOTENCY_KEY_PARAMETER = OpenApiParameter(
+    "Idempotency-Key",
+    type=str,
+    location=OpenApiParameter.HEADER,
+    description=(
+        "Unique key of the order request, repeated requests with the same "
+        "key return the response of the first one without a new order"
+    ),
+)
+
+
+def order_create_schema() -> Callable:
+    def decorator(func: Callable):
+        return extend_schema(
+            parameters=[
+                IDEMPOTENCY_KEY_PARAMETER,
+                OpenApiParameter(
+                    "Prefer",
+                    type=str,
+                    location=OpenApiParameter.HEADER,
+                    description=(
+                        "With respond-async the order is queued and 202 "
+                        "with the order request status URL is returned"
+                    ),
+                    examples=[
+                        OpenApiExample("async", value="respond-async"),
+                    ]
+                ),
+            ],
+            responses={
+                201: OrderSerializer,
+                202: OrderRequestSerializer,
+            }
+        )(func)
+
+    return decorator
+
+
+def order_auto_assign_schema() -> Callable:
+    def decorator(func: Callable):
+        return extend_schema(
+            request=OrderAutoAssignSerializer,
+            parameters=[IDEMPOTENCY_KEY_PARAMETER],
+            responses=OrderSerializer,
+            examples=[
+                OpenApiExample(
+                    "3 adjacent seats",
+                    value={"flight": 1, "count": 3, "adjacent": True},
+                    request_only=True,
+                ),
+                OpenApiExample(
+                    "2 any seats",
+                    value={"flight": 1, "count": 2},
+                    request_only=True,
+                ),
+            ]
+        )(func)
+
+    return decorator
+
+
+def itinerary_list_schema() -> Callable:
+    def decorator(func: Callable):
+        return extend_schema(
+            parameters=[ItinerarySearchSerializer],
+            responses=ItinerarySerializer(many=True),
+        )(func)
+
+    return decorator
+
+
+def distance_list_schema() -> Callable:
+    def decorator(func: Callable):
+        return extend_schema(
+            parameters=[DistanceSearchSerializer],
+            responses=DistanceSerializer,
+        )(func)
+
+    return decorator
+
+
+def airport_autocomplete_schema() -> Callable:
+    def decorator(func: Callable):
+        return extend_schema(
+            parameters=[AirportAutocompleteQuerySerializer],
+            responses=AirportAutocompleteSerializer(many=True),
+        )(func)
+
+    return decorator
+
+
+def route_calendar_schema() -> Callable:
+    def decorator(func: Callable):
+        return extend_schema(
+            parameters=[FareCalendarQuerySerializer],
+            responses=FareCalendarSerializer,
+        )(func)
+
+    return decorator
+
+
+def route_load_list_schema() -> Callable:
+    def decorator(func: Callable):
+        return extend_schema(
+            parameters=[RouteWeeklyLoadQuerySerializer],
+        )(func)
+
+    return decorator
+
+
+def export_schema(parameters: list = ()) -> Callable:
+    def decorator(func: Callable):
+        return extend_schema(
+            parameters=[ExportQuerySerializer, *parameters],
+            responses={
+                (200, content_type.split(";")[0]): OpenApiTypes.BINARY
+                for content_type in EXPORT_CONTENT_TYPES.values()
+            },
+        )(func)
+
+    return decorator
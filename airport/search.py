@@ -0,0 +1,128 @@
+import re
+from operator import attrgetter
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchVectorExact,
+    SearchVectorField,
+)
+from django.db import connections
+from django.db.models import Func, Model, Q, QuerySet
+from django.db.models.expressions import RawSQL
+
+
+SEARCH_FIELDS = ("name", "closest_big_city")
+# lookups joined into the search document of a flight
+FLIGHT_DOCUMENT_FIELDS = (
+    "route__source__name",
+    "route__source__closest_big_city",
+    "route__destination__name",
+    "route__destination__closest_big_city",
+    "airplane__name",
+)
+# separates fields in a document, normalized terms never contain it
+DOCUMENT_SEPARATOR = "\n"
+FTS_TABLE = "airport_airport_search"
+# shorter terms have no trigram to look up in the FTS5 index
+FTS_MIN_TERM_LENGTH = 3
+
+
+def has_fts_table(using: str) -> bool:
+    connection = connections[using]
+    return (
+        connection.vendor == "sqlite"
+        and connection.Database.sqlite_version_info >= (3, 34)
+    )
+
+
+def airport_search_q(
+        field: str,
+        term: str,
+        prefix: str = "",
+        using: str = "default"
+) -> Q:
+    """Case-insensitive substring match of an airport field.
+
+    On Postgres ``icontains`` is served by the pg_trgm GIN index on
+    ``UPPER(field)``, on SQLite the term is looked up in the FTS5 trigram
+    table. ``prefix`` is the lookup path to the airport, e.g. ``source__``.
+    """
+
+    if field not in SEARCH_FIELDS:
+        raise ValueError(f"Airport field {field} is not indexed for search")
+
+    if has_fts_table(using) and len(term) >= FTS_MIN_TERM_LENGTH:
+        phrase = term.replace('"', '""')
+        return Q(**{
+            f"{prefix}id__in": RawSQL(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s",
+                [f'{field} : "{phrase}"']
+            )
+        })
+
+    return Q(**{f"{prefix}{field}__icontains": term})
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.casefold().split())
+
+
+def build_search_document(values: list[str]) -> str:
+    return DOCUMENT_SEPARATOR.join(normalize(value) for value in values)
+
+
+def flight_search_document(flight: Model) -> str:
+    return build_search_document([
+        attrgetter(field.replace("__", "."))(flight)
+        for field in FLIGHT_DOCUMENT_FIELDS
+    ])
+
+
+def refresh_flight_search_documents(flights: QuerySet) -> None:
+    """Rebuild search documents of ``flights`` from their related rows.
+
+    Flights of one route and airplane share a document, so there is one
+    UPDATE per such pair instead of one per flight.
+    """
+
+    pairs = flights.order_by().values_list(
+        "route_id", "airplane_id", *FLIGHT_DOCUMENT_FIELDS
+    ).distinct()
+
+    for route_id, airplane_id, *values in pairs:
+        flights.filter(route_id=route_id, airplane_id=airplane_id).update(
+            search_document=build_search_document(values)
+        )
+
+
+class DocumentVector(Func):
+    """``to_tsvector`` of a search document, same as its GIN index"""
+
+    function = "to_tsvector"
+    template = "%(function)s('simple', %(expressions)s)"
+    output_field = SearchVectorField()
+
+
+def document_search_q(field: str, term: str, using: str = "default") -> Q:
+    """Match of a search term in a normalized document column.
+
+    On Postgres words of the term are prefixes of consecutive words in the
+    tsvector served by the GIN index, elsewhere the term is a substring of
+    the column.
+    """
+
+    term = normalize(term)
+
+    if connections[using].vendor == "postgresql":
+        words = re.findall(r"\w+", term)
+        if words:
+            return Q(SearchVectorExact(
+                DocumentVector(field),
+                SearchQuery(
+                    " <-> ".join(f"{word}:*" for word in words),
+                    config="simple",
+                    search_type="raw"
+                )
+            ))
+
+    return Q(**{f"{field}__contains": term})
@@ -0,0 +1,129 @@
+import base64
+from typing import Iterator
+
+
+class SeatMap:
+    """Bitset of taken seats in a flight.
+
+    Seat ``(row, seat)`` is stored in bit ``(row - 1) * seats_in_row +
+    (seat - 1)`` of a little-endian integer, so the whole map of a flight
+    fits in ``ceil(rows * seats_in_row / 8)`` bytes.
+    """
+
+    def __init__(self, rows: int, seats_in_row: int, data: bytes = b""):
+        self.rows = rows
+        self.seats_in_row = seats_in_row
+        self.bits = int.from_bytes(data, "little") & ((1 << self.size) - 1)
+
+    @classmethod
+    def for_flight(cls, flight) -> "SeatMap":
+        return cls(
+            flight.airplane.rows,
+            flight.airplane.seats_in_row,
+            bytes(flight.seat_map),
+        )
+
+    @property
+    def size(self) -> int:
+        return self.rows * self.seats_in_row
+
+    def __bytes__(self) -> bytes:
+        return self.bits.to_bytes((self.size + 7) // 8, "little")
+
+    def _index(self, row: int, seat: int) -> int:
+        if not (0 < row <= self.rows and 0 < seat <= self.seats_in_row):
+            raise IndexError(f"Seat ({row}, {seat}) is out of the airplane")
+
+        return (row - 1) * self.seats_in_row + seat - 1
+
+    def is_taken(self, row: int, seat: int) -> bool:
+        return bool(self.bits >> self._index(row, seat) & 1)
+
+    def take(self, row: int, seat: int) -> None:
+        self.bits |= 1 << self._index(row, seat)
+
+    def release(self, row: int, seat: int) -> None:
+        self.bits &= ~(1 << self._index(row, seat))
+
+    def free_in_row(self, row: int) -> int:
+        """Free seats of one row, bit ``seat - 1`` is set for a free seat"""
+
+        row_mask = (1 << self.seats_in_row) - 1
+        return ~(self.bits >> (row - 1) * self.seats_in_row) & row_mask
+
+    def find_block(self, count: int) -> list[tuple[int, int]] | None:
+        """Closest to the front row block of ``count`` adjacent free seats.
+
+        Within a row the block nearest to the middle of the row is taken.
+        """
+
+        if not 0 < count <= self.seats_in_row:
+            return None
+
+        middle = self.seats_in_row - count
+        for row in range(1, self.rows + 1):
+            free = self.free_in_row(row)
+            # bit i stays set only if seats i..i + count - 1 are all free
+            starts = free
+            for shift in range(1, count):
+                starts &= free >> shift
+
+            best_start = None
+            while starts:
+                lowest = starts & -starts
+                start = lowest.bit_length() - 1
+                if best_start is None or (
+                        abs(2 * start - middle) < abs(2 * best_start - middle)
+                ):
+                    best_start = start
+                starts ^= lowest
+
+            if best_start is not None:
+                return [
+                    (row, seat + 1)
+                    for seat in range(best_start, best_start + count)
+                ]
+
+        return None
+
+    def find_free_seats(
+            self,
+            count: int,
+            adjacent: bool = False
+    ) -> list[tuple[int, int]] | None:
+        """Best available ``count`` seats or None when they do not fit.
+
+        Adjacent seats in one row are preferred, without ``adjacent`` the
+        first free seats from the front are taken when no such block left.
+        """
+
+        block = self.find_block(count)
+        if block or adjacent:
+            return block
+
+        seats = []
+        for row in range(1, self.rows + 1):
+            free = self.free_in_row(row)
+            while free and len(seats) < count:
+                lowest = free & -free
+                seats.append((row, lowest.bit_length()))
+                free ^= lowest
+
+            if len(seats) == count:
+                return seats
+
+        return None
+
+    def taken(self) -> Iterator[tuple[int, int]]:
+        bits = self.bits
+        while bits:
+            lowest = bits & -bits
+            row, seat = divmod(lowest.bit_length() - 1, self.seats_in_row)
+            yield row + 1, seat + 1
+            bits ^= lowest
+
+    def taken_places(self) -> list[dict]:
+        return [{"row": row, "seat": seat} for row, seat in self.taken()]
+
+    def encode(self) -> str:
+        return base64.b64encode(bytes(self)).decode()
@@ -0,0 +1,161 @@
+from collections import defaultdict
+from typing import Iterable
+
+from django.db import transaction
+from django.db.models import F, Count, OuterRef, Subquery, Value, QuerySet
+from django.db.models.functions import Coalesce
+
+from airport.fare_calendar import invalidate_fare_calendars
+from airport.models import Airplane, Flight, Ticket
+from airport.route_loads import record_seats_sold, week_of
+from airport.seat_map import SeatMap
+from airport.versions import bump_versions, row_key
+
+
+def lock_flights(flight_ids: Iterable[int]) -> dict[int, Flight]:
+    """Lock flight rows for seat writes, always in ascending id order"""
+
+    return {
+        flight.pk: flight
+        for flight in Flight.objects.select_for_update(of=("self",))
+        .select_related("airplane")
+        .filter(pk__in=flight_ids)
+        .order_by("pk")
+    }
+
+
+def _write_seats(
+        tickets: Iterable[Ticket],
+        booked: bool,
+        flights: dict[int, Flight] = None
+) -> None:
+    seats_per_flight = defaultdict(list)
+    for ticket in tickets:
+        seats_per_flight[ticket.flight_id].append((ticket.row, ticket.seat))
+
+    with transaction.atomic():
+        if flights is None:
+            flights = lock_flights(seats_per_flight)
+
+        sold_per_week = defaultdict(int)
+        for flight_id, seats in sorted(seats_per_flight.items()):
+            flight = flights.get(flight_id)
+            if flight is None:
+                continue
+
+            seat_map = SeatMap.for_flight(flight)
+            for row, seat in seats:
+                try:
+                    if booked:
+                        seat_map.take(row, seat)
+                    else:
+                        seat_map.release(row, seat)
+                except IndexError:
+                    continue
+
+            flight.seat_map = bytes(seat_map)
+            sold = len(seats) if booked else -len(seats)
+            Flight.objects.filter(pk=flight_id).update(
+                seat_map=flight.seat_map,
+                seats_sold=F("seats_sold") + sold,
+                seats_available=F("seats_available") - sold,
+            )
+            sold_per_week[
+                flight.route_id, week_of(flight.departure_time)
+            ] += sold
+
+        record_seats_sold(sold_per_week)
+        # seats only show in flight details
+        bump_versions(
+            row_key(Flight, pk) for pk in seats_per_flight if pk in flights
+        )
+        invalidate_fare_calendars(
+            flights[flight_id].route_id
+            for flight_id in seats_per_flight
+            if flight_id in flights
+        )
+
+
+def book_seats(
+        tickets: Iterable[Ticket],
+        flights: dict[int, Flight] = None
+) -> None:
+    """Mark seats of freshly written tickets as taken in their flights.
+
+    ``flights`` are rows already locked by ``lock_flights`` in the current
+    transaction, they are locked here otherwise.
+    """
+
+    _write_seats(tickets, booked=True, flights=flights)
+
+
+def release_seats(tickets: Iterable[Ticket]) -> None:
+    """Give seats of removed tickets back to their flights"""
+
+    _write_seats(tickets, booked=False)
+
+
+def _rebuild_seat_counters(queryset: QuerySet[Flight]) -> int:
+    sold = (
+        Ticket.objects.filter(flight=OuterRef("pk"))
+        .order_by()
+        .values("flight")
+        .annotate(sold=Count("id"))
+        .values("sold")
+    )
+    capacity = Airplane.objects.filter(pk=OuterRef("airplane_id")).values(
+        capacity=F("rows") * F("seats_in_row")
+    )
+
+    queryset.update(seats_sold=Coalesce(Subquery(sold), Value(0)))
+    return queryset.update(
+        seats_available=Subquery(capacity) - F("seats_sold")
+    )
+
+
+def _rebuild_seat_maps(queryset: QuerySet[Flight], batch_size: int) -> None:
+    # keyset batches, OFFSET would rescan every batch before the next one
+    flights = queryset.select_related("airplane").order_by("pk")
+    last_pk = 0
+    while batch := list(flights.filter(pk__gt=last_pk)[:batch_size]):
+        last_pk = batch[-1].pk
+        seat_maps = {
+            flight.pk: SeatMap(
+                flight.airplane.rows,
+                flight.airplane.seats_in_row
+            )
+            for flight in batch
+        }
+
+        tickets = Ticket.objects.filter(flight__in=batch).values_list(
+            "flight", "row", "seat"
+        )
+        for flight_id, row, seat in tickets:
+            try:
+                seat_maps[flight_id].take(row, seat)
+            except IndexError:
+                continue
+
+        for flight in batch:
+            flight.seat_map = bytes(seat_maps[flight.pk])
+        Flight.objects.bulk_update(batch, ["seat_map"])
+        bump_versions(row_key(Flight, pk) for pk in seat_maps)
+
+
+def rebuild_seats(
+        queryset: QuerySet[Flight] = None,
+        batch_size: int = 500
+) -> int:
+    """Recount seat counters and seat maps of flights from Ticket rows"""
+
+    if queryset is None:
+        queryset = Flight.objects.all()
+
+    with transaction.atomic():
+        rebuilt = _rebuild_seat_counters(queryset)
+        _rebuild_seat_maps(queryset, batch_size)
+        invalidate_fare_calendars(
+            queryset.order_by().values_list("route_id", flat=True).distinct()
+        )
+
+    return rebuilt
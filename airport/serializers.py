@@ -1,4 +1,10 @@
+import datetime
+from collections import Counter
+from typing import Callable
+
+from django.conf import settings
 from django.db import transaction
+from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
@@ -11,11 +17,26 @@ from airport.models import (
     Flight,
     Ticket,
     Order,
+    OrderRequest,
+    RouteWeeklyLoad,
+    SeatHold,
+)
+from airport.autocomplete import AUTOCOMPLETE_LIMIT
+from airport.exports import EXPORT_CONTENT_TYPES
+from airport.flight_list import FLIGHT_TIME_FORMAT
+from airport.holds import (
+    hold_seats,
+    claim_held_seats,
+    seats_held_by_others,
 )
+from airport.seat_map import SeatMap
+from airport.seats import lock_flights, book_seats
 from airport.validators import (
+    SEAT_TAKEN_MESSAGE,
     validate_time,
     validate_ticket,
     validate_file_size,
+    validate_seat_is_free,
 )
 
 
@@ -27,7 +48,7 @@ class AirplaneTypeSerializer(serializers.ModelSerializer):
 
 class AirplaneSerializer(serializers.ModelSerializer):
     used_in_flights = serializers.IntegerField(
-        source="flights.count",
+        source="flights_count",
         read_only=True
     )
 
@@ -77,6 +98,29 @@ class AirportSerializer(serializers.ModelSerializer):
         fields = ("id", "name", "closest_big_city")
 
 
+class AirportAutocompleteSerializer(serializers.ModelSerializer):
+    routes_count = serializers.IntegerField(source="routes_from_count")
+
+    class Meta:
+        model = Airport
+        fields = ("id", "name", "closest_big_city", "routes_count")
+
+
+class AirportAutocompleteQuerySerializer(serializers.Serializer):
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=AUTOCOMPLETE_LIMIT,
+        default=AUTOCOMPLETE_LIMIT
+    )
+
+    def get_fields(self) -> dict:
+        # the public parameter is the short ``q``
+        return {
+            "q": serializers.CharField(trim_whitespace=True),
+            **super().get_fields(),
+        }
+
+
 class AirportDetailSerializer(serializers.ModelSerializer):
     depart_for = serializers.SerializerMethodField(read_only=True)
     accepts_from = serializers.SerializerMethodField(read_only=True)
@@ -155,13 +199,26 @@ class FlightDetailSerializer(FlightSerializer):
     airplane = AirplaneListSerializer(read_only=True)
     crew = CrewSerializer(many=True, read_only=True)
     taken_places = serializers.SerializerMethodField()
+    seat_map = serializers.SerializerMethodField()
 
     class Meta:
         model = FlightSerializer.Meta.model
-        fields = FlightSerializer.Meta.fields + ("taken_places",)
+        fields = FlightSerializer.Meta.fields + ("taken_places", "seat_map")
+
+    def get_fields(self) -> dict:
+        fields = super().get_fields()
+        request = self.context.get("request")
+
+        if not (request and request.query_params.get("seat_map")):
+            fields.pop("seat_map")
+
+        return fields
 
     def get_taken_places(self, obj: Flight) -> list[dict]:
-        return [ticket for ticket in obj.tickets.values("row", "seat")]
+        return SeatMap.for_flight(obj).taken_places()
+
+    def get_seat_map(self, obj: Flight) -> str:
+        return SeatMap.for_flight(obj).encode()
 
 
 class FlightListSerializer(serializers.ModelSerializer):
@@ -185,14 +242,17 @@ class FlightListSerializer(serializers.ModelSerializer):
         slug_field="name",
         read_only=True
     )
-    tickets_available = serializers.IntegerField(read_only=True)
+    tickets_available = serializers.IntegerField(
+        source="seats_available",
+        read_only=True
+    )
     crew = serializers.SlugRelatedField(
         many=True,
         slug_field="full_name",
         read_only=True
     )
-    departure_time = serializers.DateTimeField(format="%d %B %y %H:%M")
-    arrival_time = serializers.DateTimeField(format="%d %B %y %H:%M")
+    departure_time = serializers.DateTimeField(format=FLIGHT_TIME_FORMAT)
+    arrival_time = serializers.DateTimeField(format=FLIGHT_TIME_FORMAT)
 
     class Meta:
         model = Flight
@@ -209,10 +269,51 @@ class FlightListSerializer(serializers.ModelSerializer):
         )
 
 
+class BatchedFlightField(serializers.PrimaryKeyRelatedField):
+    """Flight field which takes flights preloaded by TicketBatchSerializer"""
+
+    def to_internal_value(self, data):
+        flights = getattr(self.parent.parent, "flights", None)
+
+        if flights is not None and not isinstance(data, bool):
+            try:
+                return flights[int(data)]
+            except (KeyError, TypeError, ValueError):
+                pass
+
+        return super().to_internal_value(data)
+
+
+class TicketBatchSerializer(serializers.ListSerializer):
+    """Load flights (with airplanes) of all tickets in one query"""
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            flight_ids = set()
+            for ticket_data in data:
+                try:
+                    flight_ids.add(int(ticket_data["flight"]))
+                except (KeyError, TypeError, ValueError):
+                    continue
+
+            self.flights = Flight.objects.select_related(
+                "airplane"
+            ).in_bulk(flight_ids)
+
+        return super().to_internal_value(data)
+
+
 class TicketSerializer(serializers.ModelSerializer):
+    flight = BatchedFlightField(
+        queryset=Flight.objects.select_related("airplane")
+    )
+
     class Meta:
         model = Ticket
         fields = ("id", "row", "seat", "flight")
+        list_serializer_class = TicketBatchSerializer
+        # taken seats are looked up in the flight seat map in validate()
+        validators = []
 
     def validate(self, attrs):
         validate_ticket(
@@ -221,6 +322,12 @@ class TicketSerializer(serializers.ModelSerializer):
             attrs["flight"].airplane,
             ValidationError,
         )
+        validate_seat_is_free(
+            attrs["row"],
+            attrs["seat"],
+            SeatMap.for_flight(attrs["flight"]),
+            ValidationError,
+        )
         return attrs
 
 
@@ -243,19 +350,321 @@ class OrderSerializer(serializers.ModelSerializer):
         model = Order
         fields = ("id", "created_at", "tickets")
 
+    @staticmethod
+    def _collect_ticket_errors(
+            tickets_data: list[dict],
+            validate: Callable
+    ) -> list[dict]:
+        errors = []
+        for ticket_data in tickets_data:
+            try:
+                validate(**ticket_data)
+            except ValidationError as error:
+                errors.append({"non_field_errors": error.detail})
+            else:
+                errors.append({})
+
+        return errors
+
+    def validate_tickets(self, tickets_data: list[dict]) -> list[dict]:
+        seats = Counter(
+            (ticket_data["flight"], ticket_data["row"], ticket_data["seat"])
+            for ticket_data in tickets_data
+        )
+
+        def validate_seat_is_unique(flight, row, seat) -> None:
+            if seats[flight, row, seat] > 1:
+                raise ValidationError(SEAT_TAKEN_MESSAGE, code="unique")
+
+        errors = self._collect_ticket_errors(
+            tickets_data,
+            validate_seat_is_unique
+        )
+        if any(errors):
+            raise ValidationError(errors)
+
+        return tickets_data
+
     def create(self, validated_data: dict) -> Order:
         tickets_data = validated_data.pop("tickets")
         with transaction.atomic():
+            # flights are always locked first and in ascending id order,
+            # so concurrent orders cannot deadlock on them or on holds
+            flights = lock_flights(
+                {ticket_data["flight"].pk for ticket_data in tickets_data}
+            )
+            claim_held_seats(validated_data["user"], tickets_data)
+            seat_maps = {
+                flight_id: SeatMap.for_flight(flight)
+                for flight_id, flight in flights.items()
+            }
+
+            def validate_seat_is_not_sold(flight, row, seat) -> None:
+                validate_seat_is_free(
+                    row,
+                    seat,
+                    seat_maps[flight.pk],
+                    ValidationError
+                )
+
+            errors = self._collect_ticket_errors(
+                tickets_data,
+                validate_seat_is_not_sold
+            )
+            if any(errors):
+                raise ValidationError({"tickets": errors})
+
             order = Order.objects.create(**validated_data)
-            for ticket_data in tickets_data:
-                Ticket.objects.create(order=order, **ticket_data)
+            tickets = Ticket.objects.bulk_create(
+                Ticket(order=order, **ticket_data)
+                for ticket_data in tickets_data
+            )
+            book_seats(tickets, flights)
 
             return order
 
 
+class OrderAutoAssignSerializer(serializers.Serializer):
+    flight = serializers.PrimaryKeyRelatedField(
+        queryset=Flight.objects.select_related("airplane")
+    )
+    count = serializers.IntegerField(min_value=1)
+    adjacent = serializers.BooleanField(default=False)
+
+    def validate(self, attrs: dict) -> dict:
+        airplane = attrs["flight"].airplane
+
+        if attrs["adjacent"] and attrs["count"] > airplane.seats_in_row:
+            raise ValidationError(
+                {
+                    "count": _(
+                        "Only %(seats)s adjacent seats fit in one row"
+                    ) % {"seats": airplane.seats_in_row}
+                }
+            )
+
+        return attrs
+
+    def create(self, validated_data: dict) -> Order:
+        user = validated_data["user"]
+        flight = validated_data["flight"]
+
+        with transaction.atomic():
+            seat_map = SeatMap.for_flight(
+                lock_flights([flight.pk])[flight.pk]
+            )
+            for row, seat in seats_held_by_others(user, flight):
+                try:
+                    seat_map.take(row, seat)
+                except IndexError:
+                    # held before the airplane got fewer seats
+                    continue
+
+            seats = seat_map.find_free_seats(
+                validated_data["count"],
+                adjacent=validated_data["adjacent"]
+            )
+            if seats is None:
+                raise ValidationError(
+                    {"count": _("Not enough free seats on this flight")}
+                )
+
+            return OrderSerializer().create(
+                {
+                    "user": user,
+                    "tickets": [
+                        {"flight": flight, "row": row, "seat": seat}
+                        for row, seat in seats
+                    ],
+                }
+            )
+
+
 class OrderListSerializer(OrderSerializer):
     tickets = TicketListSerializer(many=True, read_only=True)
 
 
 class OrderDetailSerializer(OrderListSerializer):
     tickets = TicketDetailSerializer(many=True, read_only=True)
+
+
+class SeatSerializer(serializers.Serializer):
+    row = serializers.IntegerField(min_value=1)
+    seat = serializers.IntegerField(min_value=1)
+
+
+class SeatHoldSerializer(serializers.ModelSerializer):
+    expires_at = serializers.DateTimeField(
+        format="%d %B %y %H:%M:%S",
+        read_only=True
+    )
+
+    class Meta:
+        model = SeatHold
+        fields = ("id", "flight", "row", "seat", "expires_at")
+        read_only_fields = fields
+
+
+class SeatHoldCreateSerializer(serializers.Serializer):
+    flight = serializers.PrimaryKeyRelatedField(
+        queryset=Flight.objects.select_related("airplane")
+    )
+    seats = SeatSerializer(many=True, allow_empty=False)
+    expires_at = serializers.DateTimeField(
+        format="%d %B %y %H:%M:%S",
+        read_only=True
+    )
+
+    def validate(self, attrs: dict) -> dict:
+        seats = [(seat["row"], seat["seat"]) for seat in attrs["seats"]]
+        if len(set(seats)) != len(seats):
+            raise ValidationError(
+                {"seats": _("Every seat can be held only once")}
+            )
+
+        for row, seat in seats:
+            validate_ticket(
+                row,
+                seat,
+                attrs["flight"].airplane,
+                ValidationError,
+            )
+        return attrs
+
+    def create(self, validated_data: dict) -> dict:
+        validated_data["expires_at"] = hold_seats(
+            validated_data["user"],
+            validated_data["flight"],
+            [(seat["row"], seat["seat"]) for seat in validated_data["seats"]],
+        )
+        return validated_data
+
+
+class OrderRequestSerializer(serializers.ModelSerializer):
+    status_url = serializers.HyperlinkedIdentityField(
+        view_name="airport:order-request-detail"
+    )
+    created_at = serializers.DateTimeField(
+        format="%d %B %y %H:%M:%S",
+        read_only=True
+    )
+    processed_at = serializers.DateTimeField(
+        format="%d %B %y %H:%M:%S",
+        read_only=True
+    )
+
+    class Meta:
+        model = OrderRequest
+        fields = (
+            "id",
+            "status",
+            "status_url",
+            "order",
+            "errors",
+            "created_at",
+            "processed_at",
+        )
+        read_only_fields = fields
+
+
+MINUTE = datetime.timedelta(minutes=1)
+
+
+class ItinerarySearchSerializer(serializers.Serializer):
+    source = serializers.IntegerField(min_value=1)
+    destination = serializers.IntegerField(min_value=1)
+    date = serializers.DateField()
+    max_stops = serializers.IntegerField(min_value=0, max_value=2, default=2)
+    min_layover = serializers.IntegerField(
+        min_value=0,
+        default=settings.ITINERARY_MIN_LAYOVER // MINUTE,
+        help_text="Minutes"
+    )
+    max_layover = serializers.IntegerField(
+        min_value=0,
+        default=settings.ITINERARY_MAX_LAYOVER // MINUTE,
+        help_text="Minutes"
+    )
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+    def validate(self, attrs: dict) -> dict:
+        if attrs["source"] == attrs["destination"]:
+            raise ValidationError(
+                {"destination": _("Destination must differ from source")}
+            )
+
+        if attrs["min_layover"] > attrs["max_layover"]:
+            raise ValidationError(
+                {"max_layover": _("Must not be less than min_layover")}
+            )
+
+        return attrs
+
+
+class ItinerarySerializer(serializers.Serializer):
+    stops = serializers.IntegerField()
+    departure_time = serializers.DateTimeField(format="%d %B %y %H:%M")
+    arrival_time = serializers.DateTimeField(format="%d %B %y %H:%M")
+    duration = serializers.DurationField()
+    flights = FlightListSerializer(many=True)
+
+
+class DistanceSearchSerializer(serializers.Serializer):
+    source = serializers.IntegerField(min_value=1)
+    destination = serializers.IntegerField(min_value=1)
+
+
+class DistanceSerializer(DistanceSearchSerializer):
+    distance = serializers.IntegerField(
+        allow_null=True,
+        help_text="Shortest distance, null when there is no path"
+    )
+
+
+class ExportQuerySerializer(serializers.Serializer):
+    file_format = serializers.ChoiceField(
+        choices=list(EXPORT_CONTENT_TYPES),
+        default="ndjson"
+    )
+
+
+class OrderNormalizedQuerySerializer(serializers.Serializer):
+    normalized = serializers.BooleanField(default=False)
+
+
+class FareCalendarQuerySerializer(serializers.Serializer):
+    month = serializers.DateField(input_formats=["%Y-%m"], help_text="YYYY-MM")
+
+
+class FareCalendarDaySerializer(serializers.Serializer):
+    day = serializers.DateField()
+    flights = serializers.IntegerField()
+    min_seats_available = serializers.IntegerField()
+    seats_available = serializers.IntegerField()
+
+
+class FareCalendarSerializer(serializers.Serializer):
+    route = serializers.IntegerField()
+    month = serializers.DateField(format="%Y-%m")
+    days = FareCalendarDaySerializer(many=True)
+
+
+class RouteWeeklyLoadQuerySerializer(serializers.Serializer):
+    route = serializers.IntegerField(min_value=1, required=False)
+    week_from = serializers.DateField(required=False)
+    week_to = serializers.DateField(required=False)
+
+
+class RouteWeeklyLoadSerializer(serializers.ModelSerializer):
+    load_factor = serializers.FloatField(read_only=True, allow_null=True)
+
+    class Meta:
+        model = RouteWeeklyLoad
+        fields = (
+            "route",
+            "week",
+            "flights",
+            "seats_sold",
+            "capacity",
+            "load_factor",
+        )
@@ -1,12 +1,308 @@
 import os
 
-from django.db.models.signals import pre_delete
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import (
+    m2m_changed,
+    pre_delete,
+    pre_save,
+    post_save,
+    post_delete,
+)
 from django.dispatch import receiver
 
-from airport.models import Airplane
+from airport.autocomplete import invalidate_trie
+from airport.counters import (
+    count_deleted,
+    count_saved,
+    recount,
+    remember_counted_keys,
+    through_counted_keys,
+)
+from airport.fare_calendar import invalidate_fare_calendars
+from airport.itineraries import get_built_index
+from airport.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Flight,
+    Route,
+    Ticket,
+)
+from airport.route_loads import (
+    refresh_flight_loads,
+    refresh_route_loads,
+    week_of,
+)
+from airport.search import refresh_flight_search_documents
+from airport.seats import book_seats, release_seats, rebuild_seats
+from airport.versions import bump_rows, bump_tables
 
 
 @receiver(pre_delete, sender=Airplane)
 def delete_image(sender, instance, **kwargs):
     if instance.image and os.path.isfile(instance.image.path):
         os.remove(instance.image.path)
+
+
+@receiver(pre_save, sender=Airplane)
+def remember_previous_layout(sender, instance, raw, **kwargs):
+    instance.previous_layout = None
+    if not instance._state.adding and not raw:
+        instance.previous_layout = Airplane.objects.filter(
+            pk=instance.pk
+        ).values_list("rows", "seats_in_row").first()
+
+
+@receiver(post_save, sender=Airplane)
+def update_flights_capacity(sender, instance, created, raw, **kwargs):
+    if created or raw:
+        return
+
+    layout = (instance.rows, instance.seats_in_row)
+    if getattr(instance, "previous_layout", None) != layout:
+        rebuild_seats(Flight.objects.filter(airplane=instance))
+
+
+@receiver(post_save, sender=Flight)
+def update_flight_seats(sender, instance, created, raw, **kwargs):
+    if created or raw:
+        return
+
+    previous_airplane_id = getattr(instance, "previous_airplane_id", None)
+    if previous_airplane_id != instance.airplane_id:
+        rebuild_seats(Flight.objects.filter(pk=instance.pk))
+
+
+@receiver(pre_save, sender=Ticket)
+def remember_previous_seat(sender, instance, raw, **kwargs):
+    instance.previous_seat = None
+    if not instance._state.adding and not raw:
+        instance.previous_seat = Ticket.objects.filter(
+            pk=instance.pk
+        ).only("flight", "row", "seat").first()
+
+
+@receiver(post_save, sender=Ticket)
+def book_ticket_seat(sender, instance, raw, **kwargs):
+    if raw:
+        return
+
+    if instance.previous_seat:
+        release_seats([instance.previous_seat])
+    book_seats([instance])
+
+
+@receiver(post_delete, sender=Ticket)
+def release_ticket_seat(sender, instance, **kwargs):
+    release_seats([instance])
+
+
+def _update_itinerary_index(method: str, *args) -> None:
+    """Apply the change to an already built index once it is committed"""
+
+    def update() -> None:
+        index = get_built_index()
+        if index is not None:
+            getattr(index, method)(*args)
+
+    transaction.on_commit(update)
+
+
+@receiver(post_save, sender=Route)
+def index_route(sender, instance, **kwargs):
+    _update_itinerary_index(
+        "add_route",
+        instance.pk,
+        instance.source_id,
+        instance.destination_id
+    )
+
+
+@receiver(post_delete, sender=Route)
+def unindex_route(sender, instance, **kwargs):
+    _update_itinerary_index("remove_route", instance.pk)
+
+
+@receiver(post_save, sender=Flight)
+def index_flight(sender, instance, **kwargs):
+    _update_itinerary_index(
+        "add_flight",
+        instance.pk,
+        instance.route_id,
+        instance.departure_time,
+        instance.arrival_time
+    )
+
+
+@receiver(post_delete, sender=Flight)
+def unindex_flight(sender, instance, **kwargs):
+    _update_itinerary_index("remove_flight", instance.pk)
+
+
+@receiver(post_save, sender=Airport)
+@receiver(post_delete, sender=Airport)
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=Route)
+def invalidate_autocomplete(sender, **kwargs):
+    transaction.on_commit(invalidate_trie)
+
+
+@receiver(post_save, sender=Flight)
+def index_loaded_flight(sender, instance, raw, **kwargs):
+    # fixtures skip Flight.save, which builds the document otherwise
+    if raw:
+        refresh_flight_search_documents(Flight.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Airport)
+def refresh_airport_flights(sender, instance, created, raw, **kwargs):
+    if not created and not raw:
+        refresh_flight_search_documents(
+            Flight.objects.filter(
+                Q(route__source=instance) | Q(route__destination=instance)
+            )
+        )
+
+
+@receiver(post_save, sender=Route)
+def refresh_route_flights(sender, instance, created, raw, **kwargs):
+    if not created and not raw:
+        refresh_flight_search_documents(instance.flights.all())
+
+
+@receiver(post_save, sender=Airplane)
+def refresh_airplane_flights(sender, instance, created, raw, **kwargs):
+    if not created and not raw:
+        refresh_flight_search_documents(instance.flights.all())
+
+
+@receiver(post_save, sender=Flight)
+@receiver(post_delete, sender=Flight)
+def invalidate_route_fare_calendar(sender, instance, **kwargs):
+    route_ids = {instance.route_id}
+    if getattr(instance, "previous_route_id", None):
+        route_ids.add(instance.previous_route_id)
+
+    invalidate_fare_calendars(route_ids)
+
+
+@receiver(pre_save, sender=Flight)
+def remember_previous_flight(sender, instance, raw, **kwargs):
+    instance.previous_route_id = None
+    instance.previous_airplane_id = None
+    instance.previous_load_key = None
+    if not instance._state.adding and not raw:
+        previous = Flight.objects.filter(pk=instance.pk).values_list(
+            "route_id", "airplane_id", "departure_time"
+        ).first()
+        if previous:
+            instance.previous_route_id = previous[0]
+            instance.previous_airplane_id = previous[1]
+            instance.previous_load_key = (previous[0], week_of(previous[2]))
+
+
+@receiver(post_save, sender=Flight)
+@receiver(post_delete, sender=Flight)
+def refresh_flight_route_loads(sender, instance, **kwargs):
+    keys = [(instance.route_id, week_of(instance.departure_time))]
+    if getattr(instance, "previous_load_key", None):
+        keys.append(instance.previous_load_key)
+
+    transaction.on_commit(lambda: refresh_route_loads(keys))
+
+
+@receiver(post_save, sender=Airplane)
+def refresh_airplane_route_loads(sender, instance, created, raw, **kwargs):
+    if not created and not raw:
+        transaction.on_commit(
+            lambda: refresh_flight_loads(instance.flights.all())
+        )
+
+
+@receiver(post_save, sender=Airport)
+@receiver(post_delete, sender=Airport)
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=Route)
+@receiver(post_save, sender=Airplane)
+@receiver(post_delete, sender=Airplane)
+@receiver(post_save, sender=AirplaneType)
+@receiver(post_delete, sender=AirplaneType)
+@receiver(post_save, sender=Crew)
+@receiver(post_delete, sender=Crew)
+def bump_table_version(sender, **kwargs):
+    bump_tables(sender)
+
+
+@receiver(post_save, sender=Flight)
+@receiver(post_delete, sender=Flight)
+def bump_flight_version(sender, instance, **kwargs):
+    bump_rows(Flight, [instance.pk])
+
+
+@receiver(m2m_changed, sender=Flight.crew.through)
+def bump_crew_flight_versions(
+        sender,
+        instance,
+        action,
+        reverse,
+        pk_set,
+        **kwargs
+):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            bump_rows(Flight, [instance.pk])
+        return
+
+    # crew.flights changed, the flights are in pk_set or cleared
+    if action == "pre_clear":
+        instance.cleared_flight_ids = list(
+            instance.flights.values_list("pk", flat=True)
+        )
+    elif action in ("post_add", "post_remove"):
+        bump_rows(Flight, pk_set)
+    elif action == "post_clear":
+        bump_rows(Flight, instance.cleared_flight_ids)
+
+
+@receiver(pre_save, sender=Flight)
+@receiver(pre_save, sender=Route)
+def remember_counted_keys_on_save(sender, instance, update_fields, **kwargs):
+    remember_counted_keys(instance, update_fields)
+
+
+@receiver(post_save, sender=Flight)
+@receiver(post_save, sender=Route)
+def update_counters_on_save(sender, instance, created, **kwargs):
+    count_saved(instance, created)
+
+
+@receiver(post_delete, sender=Flight)
+@receiver(post_delete, sender=Route)
+def update_counters_on_delete(sender, instance, **kwargs):
+    count_deleted(instance)
+
+
+@receiver(pre_delete, sender=Flight)
+def remember_flight_crew_keys(sender, instance, **kwargs):
+    # the crew rows are deleted with the flight without signals
+    instance.counted_crew_keys = through_counted_keys(
+        Flight.crew.through,
+        instance
+    )
+
+
+@receiver(post_delete, sender=Flight)
+def recount_flight_crew(sender, instance, **kwargs):
+    recount(instance.counted_crew_keys)
+
+
+@receiver(m2m_changed, sender=Flight.crew.through)
+def recount_changed_crew(sender, instance, action, pk_set, **kwargs):
+    if action == "pre_clear":
+        instance.counted_crew_keys = through_counted_keys(sender, instance)
+    elif action == "post_clear":
+        recount(instance.counted_crew_keys)
+    elif action in ("post_add", "post_remove"):
+        recount(through_counted_keys(sender, instance, pk_set))
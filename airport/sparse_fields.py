@@ -0,0 +1,184 @@
+from functools import cached_property
+
+from django.db.models import QuerySet
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+
+FieldPath = tuple[str, ...]
+
+
+def _parse_paths(value: str) -> list[FieldPath]:
+    return [
+        tuple(part.strip() for part in path.split("."))
+        for path in value.split(",")
+        if path.strip()
+    ]
+
+
+def _fields_of(field) -> dict | None:
+    if isinstance(field, serializers.ListSerializer):
+        field = field.child
+
+    if isinstance(field, serializers.Serializer):
+        return field.fields
+
+    return None
+
+
+class FieldSelection:
+    """Serializer field paths asked for by ``fields`` and ``exclude``.
+
+    Paths are dotted, ``tickets.flight.id`` keeps only the id of the
+    ticket flights, and a field without nested ones keeps its whole
+    subtree. Without ``fields`` everything but ``exclude`` is kept.
+    """
+
+    def __init__(
+            self,
+            fields: list[FieldPath] | None = None,
+            exclude: list[FieldPath] = ()
+    ):
+        self.fields = fields
+        self.exclude = list(exclude)
+
+    def __bool__(self) -> bool:
+        return self.fields is not None or bool(self.exclude)
+
+    def includes(self, path: FieldPath | str) -> bool:
+        if isinstance(path, str):
+            path = tuple(path.split("."))
+
+        if any(path[:len(excluded)] == excluded for excluded in self.exclude):
+            return False
+
+        if self.fields is None:
+            return True
+
+        return any(
+            path[:len(requested)] == requested
+            or requested[:len(path)] == path
+            for requested in self.fields
+        )
+
+    def nested(self, prefix: FieldPath) -> "FieldSelection":
+        """Selection of the fields under ``prefix``, relative to it"""
+
+        size = len(prefix)
+        fields = None
+        if self.fields is not None and not any(
+                prefix[:len(requested)] == requested
+                for requested in self.fields
+        ):
+            fields = [
+                requested[size:] for requested in self.fields
+                if requested[:size] == prefix
+            ]
+
+        return FieldSelection(
+            fields,
+            [
+                excluded[size:] for excluded in self.exclude
+                if excluded[:size] == prefix and len(excluded) > size
+            ]
+        )
+
+    def validate(self, serializer, param_paths: dict[str, list]) -> None:
+        errors = {}
+        for param, paths in param_paths.items():
+            for path in paths:
+                fields = _fields_of(serializer)
+                for name in path:
+                    if fields is None or name not in fields:
+                        errors.setdefault(param, []).append(
+                            f"Unknown field {'.'.join(path)!r}"
+                        )
+                        break
+                    fields = _fields_of(fields[name])
+
+        if errors:
+            raise ValidationError(errors)
+
+    def prune(self, serializer, prefix: FieldPath = ()) -> None:
+        fields = _fields_of(serializer)
+        if fields is None:
+            return
+
+        for name in list(fields):
+            path = prefix + (name,)
+            if self.includes(path):
+                self.prune(fields[name], path)
+            else:
+                fields.pop(name)
+
+
+class SparseFieldsMixin:
+    """``?fields=`` and ``?exclude=`` for the responses of a viewset.
+
+    Besides dropping serializer fields, ``select_requested`` applies only
+    the ``select_related`` / ``prefetch_related`` lookups of
+    ``field_select_related`` / ``field_prefetch_related`` whose field
+    path is requested, so the rows of dropped fields are not read.
+    """
+
+    fields_query_param = "fields"
+    exclude_query_param = "exclude"
+    # field path: lookups it needs
+    field_select_related = {}
+    field_prefetch_related = {}
+
+    @cached_property
+    def field_selection(self) -> FieldSelection:
+        params = self.request.query_params
+        if self.request.method not in SAFE_METHODS:
+            return FieldSelection()
+
+        param_paths = {
+            param: _parse_paths(params[param])
+            for param in (self.fields_query_param, self.exclude_query_param)
+            if param in params
+        }
+        selection = FieldSelection(
+            param_paths.get(self.fields_query_param),
+            param_paths.get(self.exclude_query_param, ())
+        )
+        if selection:
+            selection.validate(
+                self.get_serializer_class()(
+                    context=self.get_serializer_context()
+                ),
+                param_paths
+            )
+
+        return selection
+
+    def select_requested(self, queryset: QuerySet) -> QuerySet:
+        selection = self.field_selection
+
+        select_related = {}
+        for path, lookups in self.field_select_related.items():
+            if selection.includes(path):
+                select_related.update(dict.fromkeys(lookups))
+
+        prefetch_related = {}
+        for path, lookups in self.field_prefetch_related.items():
+            if selection.includes(path):
+                prefetch_related.update(
+                    (getattr(lookup, "prefetch_to", lookup), lookup)
+                    for lookup in lookups
+                )
+
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related.values())
+
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if self.field_selection:
+            self.field_selection.prune(serializer)
+
+        return serializer
@@ -4,11 +4,13 @@ from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from airport.autocomplete import invalidate_trie, MAX_PREFIX_LENGTH
 from airport.models import Airport, Route
 from airport.serializers import AirportSerializer, AirportDetailSerializer
 
 
 AIRPORT_URL = reverse("airport:airport-list")
+AUTOCOMPLETE_URL = reverse("airport:airport-autocomplete")
 
 
 def sample_route(airport1: Airport, airport2: Airport) -> Route:
@@ -80,6 +82,72 @@ class AuthenticatedAirportTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data, serializer.data)
 
+    def test_airport_search(self):
+        boryspil = sample_airport(name="Boryspil", closest_big_city="Kyiv")
+        zhuliany = sample_airport(name="Zhuliany", closest_big_city="Kyiv")
+        sample_airport(name="Chopin", closest_big_city="Warsaw")
+
+        response = self.client.get(AIRPORT_URL, {"search": "KYI"})
+
+        self.assertEqual(
+            [airport["id"] for airport in response.data["results"]],
+            [boryspil.id, zhuliany.id]
+        )
+
+    def test_airport_search_every_term_matches(self):
+        boryspil = sample_airport(name="Boryspil", closest_big_city="Kyiv")
+        sample_airport(name="Zhuliany", closest_big_city="Kyiv")
+
+        response = self.client.get(AIRPORT_URL, {"search": "kyiv bor"})
+
+        self.assertEqual(
+            [airport["id"] for airport in response.data["results"]],
+            [boryspil.id]
+        )
+
+    def test_airport_search_short_and_quoted_terms(self):
+        airport = sample_airport(
+            name='"Quoted" airport',
+            closest_big_city="LA"
+        )
+
+        short = self.client.get(AIRPORT_URL, {"search": "la"})
+        quoted = self.client.get(AIRPORT_URL, {"search": '"quoted"'})
+
+        self.assertEqual(short.data["results"][0]["id"], airport.id)
+        self.assertEqual(quoted.data["results"][0]["id"], airport.id)
+
+    def test_airport_search_after_update_and_delete(self):
+        airport = sample_airport(name="Boryspil")
+        deleted = sample_airport(name="Boryspil old")
+        airport.name = "Kyiv international"
+        airport.save()
+        deleted.delete()
+
+        old_name = self.client.get(AIRPORT_URL, {"search": "boryspil"})
+        new_name = self.client.get(AIRPORT_URL, {"search": "international"})
+
+        self.assertEqual(old_name.data["results"], [])
+        self.assertEqual(new_name.data["results"][0]["id"], airport.id)
+
+    def test_airport_list_not_modified(self):
+        airport = sample_airport()
+        response = self.client.get(AIRPORT_URL)
+        etag = response["ETag"]
+
+        response = self.client.get(AIRPORT_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        sample_route(airport, sample_airport(name="Airport 2"))
+        response = self.client.get(AIRPORT_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+        etag = response["ETag"]
+        sample_route(airport, airport)
+        response = self.client.get(AIRPORT_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
     def test_airport_create_forbidden(self):
         payload = {
             "name": "Forbidden",
@@ -91,6 +159,91 @@ class AuthenticatedAirportTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
 
+class AirportAutocompleteTests(TestCase):
+    def setUp(self):
+        invalidate_trie()
+        self.addCleanup(invalidate_trie)
+
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="autocomplete@mail.co",
+                password="12R445%3df"
+            )
+        )
+        self.boryspil = sample_airport(
+            name="Kyiv Boryspil",
+            closest_big_city="Kyiv"
+        )
+        self.zhuliany = sample_airport(
+            name="Zhuliany",
+            closest_big_city="Kyiv"
+        )
+        self.krakow = sample_airport(
+            name="Krakow Balice",
+            closest_big_city="Krakow"
+        )
+        sample_route(self.zhuliany, self.krakow)
+
+    def autocomplete(self, query: str, **params) -> list[int]:
+        response = self.client.get(AUTOCOMPLETE_URL, {"q": query, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        return [airport["id"] for airport in response.data]
+
+    def test_autocomplete_ranked_by_routes(self):
+        response = self.client.get(AUTOCOMPLETE_URL, {"q": "KY"})
+
+        self.assertEqual(
+            response.data,
+            [
+                {
+                    "id": self.zhuliany.id,
+                    "name": "Zhuliany",
+                    "closest_big_city": "Kyiv",
+                    "routes_count": 1,
+                },
+                {
+                    "id": self.boryspil.id,
+                    "name": "Kyiv Boryspil",
+                    "closest_big_city": "Kyiv",
+                    "routes_count": 0,
+                },
+            ]
+        )
+
+    def test_autocomplete_word_prefixes(self):
+        self.assertEqual(self.autocomplete("bor"), [self.boryspil.id])
+        self.assertEqual(self.autocomplete("kyiv  bo"), [self.boryspil.id])
+        self.assertEqual(self.autocomplete("oryspil"), [])
+
+    def test_autocomplete_limit(self):
+        self.assertEqual(self.autocomplete("k", limit=1), [self.zhuliany.id])
+
+    def test_autocomplete_long_query(self):
+        query = "airport " + "x" * MAX_PREFIX_LENGTH
+        shorter = sample_airport(name=f"International {query}")
+        longer = sample_airport(name=f"International {query}y")
+        invalidate_trie()
+
+        self.assertEqual(self.autocomplete(query), [shorter.id, longer.id])
+        self.assertEqual(self.autocomplete(f"{query}y"), [longer.id])
+        self.assertEqual(self.autocomplete(f"{query}x"), [])
+
+    def test_autocomplete_invalidated_on_commit(self):
+        self.autocomplete("lviv")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            lviv = sample_airport(name="Lviv", closest_big_city="Lviv")
+
+        self.assertEqual(self.autocomplete("lviv"), [lviv.id])
+
+    def test_autocomplete_query_required(self):
+        response = self.client.get(AUTOCOMPLETE_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
 class AdminAirportTest(TestCase):
     def setUp(self):
         self.client = APIClient()
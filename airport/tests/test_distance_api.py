@@ -0,0 +1,138 @@
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.distances import (
+    rebuild_distance_matrix,
+    rebuild_if_outdated,
+    shortest_distances,
+)
+from airport.tests.test_airport_api import sample_airport, sample_route
+
+
+DISTANCE_URL = reverse("airport:distance-list")
+
+
+class ShortestDistancesTests(TestCase):
+    def test_shortest_distances(self):
+        routes = np.array([
+            [1, 2, 100],
+            [2, 3, 50],
+            [1, 3, 200],
+            [3, 1, 10],
+        ])
+
+        distances = shortest_distances(np.array([1, 2, 3, 4]), routes)
+
+        self.assertEqual(
+            distances.tolist(),
+            [
+                [0, 100, 150, np.inf],
+                [60, 0, 50, np.inf],
+                [10, 110, 0, np.inf],
+                [np.inf, np.inf, np.inf, 0],
+            ]
+        )
+
+
+class DistanceApiTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.matrix_path = Path(directory.name) / "distances.npz"
+        settings_override = override_settings(
+            DISTANCE_MATRIX_PATH=self.matrix_path
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="distance@mail.co",
+            password="12R445%3df"
+        )
+        self.client.force_authenticate(self.user)
+
+        self.kyiv = sample_airport(name="Kyiv")
+        self.warsaw = sample_airport(name="Warsaw")
+        self.lisbon = sample_airport(name="Lisbon")
+        self.route = sample_route(self.kyiv, self.warsaw)
+        self.route.distance = 700
+        self.route.save()
+        sample_route(self.warsaw, self.lisbon)
+
+    def get_distance(self, source, destination):
+        return self.client.get(
+            DISTANCE_URL,
+            {"source": source.id, "destination": destination.id}
+        )
+
+    def test_distance_through_other_airport(self):
+        response = self.get_distance(self.kyiv, self.lisbon)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data,
+            {
+                "source": self.kyiv.id,
+                "destination": self.lisbon.id,
+                "distance": 760,
+            }
+        )
+        self.assertTrue(self.matrix_path.exists())
+
+    def test_unreachable_airport(self):
+        response = self.get_distance(self.lisbon, self.kyiv)
+
+        self.assertIsNone(response.data["distance"])
+
+    def test_matrix_rebuilt_after_route_change(self):
+        self.get_distance(self.kyiv, self.lisbon)
+
+        with patch(
+                "airport.distances.rebuild_distance_matrix",
+                wraps=rebuild_distance_matrix
+        ) as rebuild:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.route.distance = 300
+                self.route.save()
+                sample_route(self.lisbon, self.kyiv)
+
+            # requests keep reading the last matrix
+            self.assertEqual(
+                self.get_distance(self.kyiv, self.lisbon).data["distance"],
+                760
+            )
+            rebuild.assert_not_called()
+
+            self.assertIsNotNone(rebuild_if_outdated())
+            self.assertIsNone(rebuild_if_outdated())
+            rebuild.assert_called_once()
+
+        self.assertEqual(
+            self.get_distance(self.kyiv, self.lisbon).data["distance"],
+            360
+        )
+        self.assertEqual(
+            self.get_distance(self.lisbon, self.kyiv).data["distance"],
+            60
+        )
+
+    def test_rebuild_distance_matrix_command(self):
+        call_command("rebuild_distance_matrix", stdout=StringIO())
+
+        with np.load(self.matrix_path) as data:
+            self.assertEqual(
+                data["airport_ids"].tolist(),
+                [self.kyiv.id, self.warsaw.id, self.lisbon.id]
+            )
+            self.assertEqual(data["distances"][0, 2], 760)
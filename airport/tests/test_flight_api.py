@@ -1,22 +1,40 @@
+import base64
+import csv
 import datetime
+import gzip
+import io
+import json
+from urllib.parse import parse_qs, urlparse
 
 import pytz
+from unittest import mock
+
 from django.contrib.auth import get_user_model
-from django.db.models import F, Count
+from django.core.cache import cache
+from django.core.management import call_command, CommandError
+from django.db import connection
+from django.db.models import F, Count, Prefetch
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
-from rest_framework.test import APIClient
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
 
-from airport.models import Flight
+from airport.counters import verify_counters
+from airport.filters import DocumentSearchFilter
+from airport.models import Crew, Flight, Order, Ticket
 from airport.serializers import FlightListSerializer, FlightDetailSerializer
 from airport.tests.test_airplane_api import sample_airplane
 from airport.tests.test_airplane_type_api import sample_airplane_type
 from airport.tests.test_airport_api import sample_route, sample_airport
 from airport.tests.test_crew_api import sample_crew
+from airport.views import FlightViewSet
 
 
 FLIGHT_URL = reverse("airport:flight-list")
+AIRPLANE_URL = reverse("airport:airplane-list")
+EXPORT_URL = reverse("airport:flight-export")
 
 
 def sample_flight(**additional) -> Flight:
@@ -106,6 +124,41 @@ class AuthenticatedFlightTests(TestCase):
         for flight in response.data["results"]:
             self.assertIn(flight, serializer.data)
 
+    def test_flight_list_projection(self):
+        data = get_flight_data()
+        crew = [data["maks"], data["user"], sample_crew(first_name="Olha")]
+
+        flight = sample_flight(
+            route=data["route1"], airplane=data["airplane1"]
+        )
+        flight.crew.add(*reversed(crew))
+        sample_flight(route=data["route2"], airplane=data["airplane2"])
+
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(FLIGHT_URL)
+
+        flights = Flight.objects.prefetch_related(
+            Prefetch("crew", queryset=Crew.objects.order_by("id"))
+        ).order_by("id")
+        serializer = FlightListSerializer(flights, many=True)
+
+        self.assertEqual(response.data["results"], serializer.data)
+        self.assertEqual(
+            response.data["results"][0]["crew"],
+            ["Maks Test last", "User Test last", "Olha Test last"]
+        )
+
+        for _ in range(3):
+            sample_flight(
+                route=data["route1"], airplane=data["airplane2"]
+            ).crew.add(*crew)
+        cache.clear()
+        with CaptureQueriesContext(connection) as more_queries:
+            self.client.get(FLIGHT_URL)
+
+        self.assertEqual(len(more_queries), len(queries))
+
     def test_flight_ordering(self):
         data = get_flight_data()
 
@@ -200,6 +253,11 @@ class AuthenticatedFlightTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["results"], serializer.data)
 
+    def test_flight_filter_by_invalid_day(self):
+        response = self.client.get(FLIGHT_URL, {"departure_day": "5 Dec"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_flight_filter_by_arrival_day(self):
         data = get_flight_data()
 
@@ -524,11 +582,48 @@ class AuthenticatedFlightTests(TestCase):
 
         response = self.client.get(detail_url(flight.id))
 
-        serializer = FlightDetailSerializer(flight)
+        # the airplane counts the flight in the database only
+        serializer = FlightDetailSerializer(Flight.objects.get(pk=flight.id))
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data, serializer.data)
 
+    def test_flight_detail_seat_map(self):
+        data = get_flight_data()
+        flight = sample_flight(
+            route=data["route1"],
+            airplane=data["airplane1"]
+        )
+        order = Order.objects.create(
+            user=get_user_model().objects.get(
+                email="maksymkorniev88@gmail.com"
+            )
+        )
+        Ticket.objects.create(row=2, seat=3, flight=flight, order=order)
+        Ticket.objects.create(row=1, seat=12, flight=flight, order=order)
+
+        response = self.client.get(detail_url(flight.id))
+        seat_map_response = self.client.get(
+            detail_url(flight.id),
+            {"seat_map": 1}
+        )
+
+        seats_in_row = flight.airplane.seats_in_row
+        seat_map = int.from_bytes(
+            base64.b64decode(seat_map_response.data["seat_map"]),
+            "little"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("seat_map", response.data)
+        self.assertEqual(
+            response.data["taken_places"],
+            [{"row": 1, "seat": 12}, {"row": 2, "seat": 3}]
+        )
+        self.assertEqual(
+            seat_map,
+            1 << (seats_in_row + 2) | 1 << (seats_in_row - 1)
+        )
+
     def test_flight_create_forbidden(self):
         data = get_flight_data()
         payload = {
@@ -544,6 +639,639 @@ class AuthenticatedFlightTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
 
+class FlightExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="export@mail.co",
+                password="ssAp@dr1AASow2"
+            )
+        )
+
+        data = get_flight_data()
+        self.flights = [
+            sample_flight(
+                route=data["route1"],
+                airplane=data["airplane1"],
+                departure_time=datetime.datetime(2026, 12, day, 10),
+                arrival_time=datetime.datetime(2026, 12, day, 12),
+            )
+            for day in (6, 4, 5)
+        ]
+        self.flights[0].crew.add(data["maks"], data["user"])
+
+    def export(self, **params) -> tuple:
+        response = self.client.get(EXPORT_URL, params)
+        return response, b"".join(response.streaming_content)
+
+    def test_export_ndjson(self):
+        response, content = self.export()
+
+        flights = Flight.objects.prefetch_related(
+            Prefetch("crew", queryset=Crew.objects.order_by("id"))
+        ).order_by("departure_time")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(
+            [json.loads(line) for line in content.decode().splitlines()],
+            FlightListSerializer(flights, many=True).data
+        )
+
+    def test_export_csv_with_filters(self):
+        response, content = self.export(
+            file_format="csv",
+            departure_start="2026-12-05"
+        )
+
+        rows = list(csv.reader(io.StringIO(content.decode())))
+        self.assertEqual(
+            response["Content-Disposition"],
+            'attachment; filename="flights.csv"'
+        )
+        self.assertEqual(
+            rows[0],
+            ["id", "out_of", "to", "airplane_name", "airplane_type",
+             "departure_time", "arrival_time", "tickets_available", "crew"]
+        )
+        self.assertEqual(
+            [(row[0], row[-1]) for row in rows[1:]],
+            [
+                (str(self.flights[2].id), ""),
+                (str(self.flights[0].id), "Maks Test last; User Test last"),
+            ]
+        )
+
+    def test_export_gzip(self):
+        plain = self.export()[1]
+
+        response = self.client.get(EXPORT_URL, HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(
+            gzip.decompress(b"".join(response.streaming_content)),
+            plain
+        )
+
+    def test_export_ignores_accept(self):
+        response = self.client.get(
+            EXPORT_URL,
+            HTTP_ACCEPT="application/x-ndjson"
+        )
+        invalid = self.client.get(EXPORT_URL, {"file_format": "xml"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(invalid.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("file_format", invalid.data)
+
+
+class FlightSparseFieldsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="fields@mail.co",
+                password="ssAp@dr1AASow2"
+            )
+        )
+
+        data = get_flight_data()
+        self.flight = sample_flight(
+            route=data["route1"],
+            airplane=data["airplane1"]
+        )
+        self.flight.crew.add(data["maks"], data["user"])
+
+    def get(self, url: str, params: dict) -> tuple:
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data, [query["sql"] for query in queries]
+
+    def test_list_fields(self):
+        data, queries = self.get(
+            FLIGHT_URL,
+            {"fields": "id,departure_time", "page_size": 1}
+        )
+
+        self.assertEqual(
+            data["results"],
+            [{"id": self.flight.id, "departure_time": "05 December 26 00:00"}]
+        )
+        self.assertFalse(
+            any("airport_route" in sql or "airport_flight_crew" in sql
+                for sql in queries)
+        )
+
+    def test_detail_fields_and_exclude(self):
+        data, queries = self.get(
+            detail_url(self.flight.id),
+            {"fields": "id,route.source,crew.first_name"}
+        )
+
+        self.assertEqual(
+            data,
+            {
+                "id": self.flight.id,
+                "route": {"source": "Some airport"},
+                "crew": [{"first_name": "Maks"}, {"first_name": "User"}],
+            }
+        )
+        self.assertFalse(any("airport_airplane" in sql for sql in queries))
+
+        data, queries = self.get(
+            detail_url(self.flight.id),
+            {"exclude": "crew,taken_places,airplane.airplane_type"}
+        )
+
+        self.assertNotIn("crew", data)
+        self.assertNotIn("taken_places", data)
+        self.assertNotIn("airplane_type", data["airplane"])
+        self.assertFalse(any("airport_crew" in sql for sql in queries))
+        self.assertFalse(any("airport_airplanetype" in sql for sql in queries))
+
+    def test_unknown_fields(self):
+        for params in (
+                {"fields": "id,price"},
+                {"exclude": "route.gate"},
+                {"fields": "crew.first_name.x"},
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(detail_url(self.flight.id), params)
+
+                self.assertEqual(
+                    response.status_code,
+                    status.HTTP_400_BAD_REQUEST
+                )
+                self.assertIn(next(iter(params)), response.data)
+
+
+class FlightSearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="search@mail.co",
+                password="ssAp@dr1AASow2"
+            )
+        )
+
+        self.boryspil = sample_airport(
+            name="Boryspil",
+            closest_big_city="Kyiv"
+        )
+        self.chopin = sample_airport(name="Chopin", closest_big_city="Warsaw")
+        self.airplane = sample_airplane(name="Dreamliner")
+        self.route = sample_route(self.boryspil, self.chopin)
+        self.flight = sample_flight(route=self.route, airplane=self.airplane)
+        self.other_flight = sample_flight(
+            route=sample_route(self.chopin, sample_airport(name="Heathrow")),
+            airplane=sample_airplane(name="Airbus")
+        )
+
+    def search(self, term: str) -> list[int]:
+        response = self.client.get(FLIGHT_URL, {"search": term})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [flight["id"] for flight in response.data["results"]]
+
+    def test_search_document_built_on_save(self):
+        self.assertEqual(
+            self.flight.search_document,
+            "boryspil\nkyiv\nchopin\nwarsaw\ndreamliner"
+        )
+
+    def test_search_by_related_names(self):
+        self.assertEqual(self.search("kyiv"), [self.flight.id])
+        self.assertEqual(self.search("DREAM"), [self.flight.id])
+        self.assertEqual(
+            sorted(self.search("chopin")),
+            [self.flight.id, self.other_flight.id]
+        )
+        self.assertEqual(self.search("boryspil airbus"), [])
+
+    def test_search_does_not_join_related_tables(self):
+        queryset = DocumentSearchFilter().filter_queryset(
+            Request(APIRequestFactory().get(FLIGHT_URL, {"search": "kyiv"})),
+            Flight.objects.all(),
+            FlightViewSet()
+        )
+
+        self.assertNotIn("JOIN", str(queryset.query))
+
+    def test_document_refreshed_on_related_changes(self):
+        self.boryspil.closest_big_city = "Kiev"
+        self.boryspil.save()
+        self.assertEqual(self.search("kiev"), [self.flight.id])
+
+        self.airplane.name = "Jumbo"
+        self.airplane.save()
+        self.assertEqual(self.search("jumbo"), [self.flight.id])
+
+        self.route.destination = sample_airport(name="Schiphol")
+        self.route.save()
+        self.assertEqual(self.search("schiphol"), [self.flight.id])
+        self.assertEqual(self.search("warsaw"), [self.other_flight.id])
+
+
+class FlightKeysetPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="pages@mail.co",
+                password="ssAp@dr1AASow2"
+            )
+        )
+
+        data = get_flight_data()
+        departure_times = [
+            datetime.datetime(2026, 12, day, hour)
+            for day, hour in ((5, 8), (5, 8), (5, 8), (6, 9), (4, 7), (7, 1))
+        ]
+        for number, departure_time in enumerate(departure_times):
+            sample_flight(
+                route=data["route1"],
+                airplane=data["airplane1" if number % 2 else "airplane2"],
+                departure_time=departure_time,
+                arrival_time=departure_time + datetime.timedelta(hours=3),
+            )
+
+    def walk_pages(self, **params) -> list[int]:
+        ids = []
+        url = FLIGHT_URL
+        params = {"cursor": "", "page_size": 2, **params}
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn("count", response.data)
+            ids += [flight["id"] for flight in response.data["results"]]
+            url, params = response.data["links"]["next"], None
+
+        return ids
+
+    def test_keyset_pages_by_departure(self):
+        with CaptureQueriesContext(connection) as queries:
+            ids = self.walk_pages()
+
+        self.assertEqual(
+            ids,
+            list(
+                Flight.objects.order_by("departure_time", "id")
+                .values_list("id", flat=True)
+            )
+        )
+        self.assertFalse(
+            any("COUNT" in query["sql"] for query in queries.captured_queries)
+        )
+
+    def test_keyset_pages_follow_ordering(self):
+        ids = self.walk_pages(ordering="-airplane__name,departure_time")
+
+        self.assertEqual(
+            ids,
+            list(
+                Flight.objects.order_by(
+                    "-airplane__name", "departure_time", "-id"
+                ).values_list("id", flat=True)
+            )
+        )
+
+    def test_invalid_cursor(self):
+        next_link = self.client.get(
+            FLIGHT_URL,
+            {"cursor": "", "page_size": 2}
+        ).data["links"]["next"]
+        cursor = parse_qs(urlparse(next_link).query)["cursor"][0]
+
+        for params in (
+                {"cursor": "not a cursor"},
+                {"cursor": cursor, "ordering": "arrival_time"},
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(FLIGHT_URL, params)
+                self.assertEqual(
+                    response.status_code,
+                    status.HTTP_404_NOT_FOUND
+                )
+
+    def test_page_numbers_without_cursor(self):
+        response = self.client.get(FLIGHT_URL, {"page": 2, "page_size": 2})
+
+        self.assertEqual(response.data["count"], 6)
+        self.assertEqual(response.data["page"], 2)
+
+    def test_cached_count(self):
+        self.client.get(FLIGHT_URL, {"page_size": 2})
+        flight = Flight.objects.first()
+        sample_flight(
+            route=flight.route,
+            airplane=flight.airplane,
+            departure_time=datetime.datetime(2026, 12, 8, 10),
+            arrival_time=datetime.datetime(2026, 12, 8, 13),
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                FLIGHT_URL,
+                {"page": 4, "page_size": 2, "ordering": "-departure_time"}
+            )
+
+        self.assertFalse(
+            any("COUNT(" in query["sql"] for query in queries)
+        )
+        self.assertEqual(response.data["count_strategy"], "cached")
+        self.assertEqual(response.data["count"], 6)
+        # rows are read past the stale count
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertIsNone(response.data["links"]["next"])
+
+    def test_last_page_of_approximate_counts(self):
+        response = self.client.get(
+            FLIGHT_URL,
+            {"page": "last", "page_size": 2}
+        )
+
+        self.assertEqual(response.data["count_strategy"], "cached")
+        self.assertEqual(response.data["page"], 3)
+        self.assertIsNone(response.data["links"]["next"])
+
+        with mock.patch.object(FlightViewSet, "count_strategy", "omitted"):
+            response = self.client.get(
+                FLIGHT_URL,
+                {"page": "last", "page_size": 2}
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_count_strategies(self):
+        for strategy, estimate, expected in (
+                ("omitted", None, ("omitted", None)),
+                ("estimated", None, ("exact", 6)),
+                ("estimated", 4, ("estimated", 4)),
+        ):
+            with self.subTest(strategy=strategy, estimate=estimate), \
+                    mock.patch.object(
+                        FlightViewSet, "count_strategy", strategy
+                    ), \
+                    mock.patch(
+                        "airport.pagination.estimate_count",
+                        return_value=estimate
+                    ):
+                response = self.client.get(
+                    FLIGHT_URL,
+                    {"page": 2, "page_size": 2}
+                )
+                last_page = self.client.get(
+                    FLIGHT_URL,
+                    {"page": 3, "page_size": 2}
+                )
+                beyond = self.client.get(
+                    FLIGHT_URL,
+                    {"page": 4, "page_size": 2}
+                )
+
+                self.assertEqual(
+                    (response.data["count_strategy"], response.data["count"]),
+                    expected
+                )
+                self.assertIsNotNone(response.data["links"]["next"])
+                self.assertIsNone(last_page.data["links"]["next"])
+                self.assertEqual(
+                    beyond.status_code,
+                    status.HTTP_404_NOT_FOUND
+                )
+
+
+class FlightConditionalGetTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="etag@mail.co",
+            password="ssAp@dr1AASow2"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        self.data = get_flight_data()
+        self.flight = sample_flight(
+            route=self.data["route1"],
+            airplane=self.data["airplane1"]
+        )
+        self.url = detail_url(self.flight.id)
+
+    def get_etag(self) -> str:
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response["ETag"]
+
+    def test_not_modified_without_serializer(self):
+        response = self.client.get(self.url)
+        etag = response["ETag"]
+
+        self.assertTrue(etag.startswith('"'))
+        self.assertIn("Last-Modified", response)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(len(queries), 2)
+        self.assertIn("airport_tableversion", queries[0]["sql"])
+        self.assertIn("airport_flight", queries[1]["sql"])
+
+        response = self.client.get(
+            self.url,
+            HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_departed_flight_not_found_with_etag(self):
+        etag = self.get_etag()
+        Flight.objects.filter(pk=self.flight.pk).update(
+            departure_time=datetime.datetime.now(datetime.UTC)
+            - datetime.timedelta(hours=1)
+        )
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_etag_changes_with_flight_data(self):
+        etag = self.get_etag()
+
+        sample_flight(
+            route=self.data["route1"],
+            airplane=self.data["airplane1"]
+        )
+        self.assertEqual(self.get_etag(), etag)
+
+        Ticket.objects.create(
+            row=1,
+            seat=1,
+            flight=self.flight,
+            order=Order.objects.create(user=self.user)
+        )
+        booked = self.get_etag()
+        self.assertNotEqual(booked, etag)
+
+        self.flight.crew.add(self.data["maks"])
+        crewed = self.get_etag()
+        self.assertNotEqual(crewed, booked)
+
+        self.data["maks"].flights.clear()
+        self.assertNotEqual(self.get_etag(), crewed)
+
+    def test_etag_depends_on_query_and_format(self):
+        etag = self.get_etag()
+
+        response = self.client.get(self.url, {"seat_map": 1})
+        self.assertNotEqual(response["ETag"], etag)
+
+        response = self.client.get(
+            self.url,
+            HTTP_ACCEPT="application/msgpack",
+            HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class FlightCounterCacheTests(TestCase):
+    def setUp(self):
+        self.data = get_flight_data()
+        self.flight = sample_flight(
+            route=self.data["route1"],
+            airplane=self.data["airplane1"]
+        )
+
+    def assertCounts(self, instances_counts: dict) -> None:
+        for (instance, counter), count in instances_counts.items():
+            instance.refresh_from_db(fields=[counter])
+            self.assertEqual(getattr(instance, counter), count, counter)
+
+        self.assertEqual(verify_counters(), [])
+
+    def test_flight_counters(self):
+        data = self.data
+        other = sample_flight(
+            route=data["route1"],
+            airplane=data["airplane1"]
+        )
+        self.assertCounts({
+            (data["airplane1"], "flights_count"): 2,
+            (data["route1"], "flights_count"): 2,
+        })
+
+        other.airplane = data["airplane2"]
+        other.route = data["route2"]
+        other.save()
+        self.assertCounts({
+            (data["airplane1"], "flights_count"): 1,
+            (data["airplane2"], "flights_count"): 1,
+            (data["route1"], "flights_count"): 1,
+            (data["route2"], "flights_count"): 1,
+        })
+
+        other.delete()
+        self.assertCounts({
+            (data["airplane2"], "flights_count"): 0,
+            (data["route2"], "flights_count"): 0,
+        })
+
+    def test_crew_counters(self):
+        maks, user = self.data["maks"], self.data["user"]
+        other = sample_flight(
+            route=self.data["route1"],
+            airplane=self.data["airplane1"]
+        )
+
+        self.flight.crew.add(maks, user)
+        self.flight.crew.add(maks)
+        maks.flights.add(other)
+        self.assertCounts({(maks, "flights_count"): 2})
+
+        self.flight.crew.remove(user)
+        self.assertCounts({(user, "flights_count"): 0})
+
+        maks.flights.clear()
+        self.flight.crew.set([maks, user])
+        other.crew.add(user)
+        self.assertCounts({
+            (maks, "flights_count"): 1,
+            (user, "flights_count"): 2,
+        })
+
+        self.flight.delete()
+        self.assertCounts({
+            (maks, "flights_count"): 0,
+            (user, "flights_count"): 1,
+        })
+
+    def test_airport_route_counters(self):
+        route = self.data["route1"]
+        source, destination = route.source, route.destination
+        self.assertCounts({
+            (source, "routes_from_count"): 1,
+            (source, "routes_to_count"): 1,
+        })
+
+        route.delete()
+        self.assertCounts({
+            (source, "routes_from_count"): 0,
+            (destination, "routes_to_count"): 0,
+            (destination, "routes_from_count"): 1,
+        })
+
+    def test_verify_and_repair_counters(self):
+        Flight.objects.bulk_create([
+            Flight(
+                route=self.data["route2"],
+                airplane=self.data["airplane1"],
+                departure_time=self.flight.departure_time,
+                arrival_time=self.flight.arrival_time,
+            )
+        ])
+
+        with self.assertRaises(CommandError):
+            call_command("verify_counters", stdout=io.StringIO())
+
+        out = io.StringIO()
+        call_command("verify_counters", repair=True, stdout=out)
+
+        self.assertIn("Repaired 2 counters", out.getvalue())
+        self.assertCounts({
+            (self.data["airplane1"], "flights_count"): 2,
+            (self.data["route2"], "flights_count"): 1,
+        })
+
+    def test_airplane_list_reads_counter(self):
+        client = APIClient()
+        client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="counter@mail.co",
+                password="ssAp@dr1AASow2"
+            )
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(AIRPLANE_URL, {"ordering": "name"})
+
+        self.assertEqual(
+            {
+                airplane["id"]: airplane["used_in_flights"]
+                for airplane in response.data["results"]
+            },
+            {self.data["airplane1"].id: 1, self.data["airplane2"].id: 0}
+        )
+        self.assertFalse(
+            any('"airport_flight"' in query["sql"] for query in queries)
+        )
+
+
 class AdminFlightTest(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -0,0 +1,199 @@
+import datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import IdempotencyKey, Order, Ticket
+from airport.tests.test_order_api import (
+    ORDER_URL,
+    ORDER_AUTO_ASSIGN_URL,
+    sample_flight,
+)
+
+
+def sample_key(**additional) -> IdempotencyKey:
+    defaults = {
+        "key": "order-1",
+        "request_hash": "",
+        "status_code": status.HTTP_201_CREATED,
+        "response_body": {"id": 1, "tickets": []},
+        "expires_at": timezone.now() + datetime.timedelta(hours=1),
+    }
+    defaults.update(additional)
+
+    return IdempotencyKey.objects.create(**defaults)
+
+
+class IdempotentOrderTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="idempotent@mail.co",
+            password="12R445%3df"
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+        self.payload = {
+            "tickets": [{"row": 1, "seat": 1, "flight": self.flight.id}]
+        }
+
+    def post_order(self, key: str = "order-1", payload: dict = None):
+        return self.client.post(
+            ORDER_URL,
+            payload or self.payload,
+            format="json",
+            headers={"Idempotency-Key": key}
+        )
+
+    def test_order_create_replayed(self):
+        response = self.post_order()
+
+        with self.assertNumQueries(1):
+            replayed = self.post_order()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(replayed.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(replayed.data, response.data)
+        self.assertEqual(replayed.headers["Idempotent-Replayed"], "true")
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_order_create_different_keys(self):
+        self.post_order()
+        response = self.post_order(
+            key="order-2",
+            payload={
+                "tickets": [{"row": 1, "seat": 2, "flight": self.flight.id}]
+            }
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_order_create_without_key(self):
+        self.client.post(ORDER_URL, self.payload, format="json")
+
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def test_keys_are_per_user(self):
+        self.post_order()
+        other_user = get_user_model().objects.create_user(
+            email="other.idempotent@mail.co",
+            password="12R445%3df"
+        )
+        self.client.force_authenticate(other_user)
+
+        response = self.post_order(
+            payload={
+                "tickets": [{"row": 1, "seat": 2, "flight": self.flight.id}]
+            }
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_key_reused_with_other_payload(self):
+        self.post_order()
+
+        response = self.post_order(
+            payload={
+                "tickets": [{"row": 1, "seat": 2, "flight": self.flight.id}]
+            }
+        )
+
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_key_in_progress(self):
+        sample_key(
+            user=self.user,
+            status_code=None,
+            response_body=None,
+            request_hash="in progress",
+            locked_at=timezone.now()
+        )
+
+        response = self.post_order()
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(Order.objects.exists())
+
+    def test_abandoned_key_is_claimed_again(self):
+        sample_key(
+            user=self.user,
+            status_code=None,
+            response_body=None,
+            request_hash="crashed",
+            locked_at=timezone.now() - datetime.timedelta(minutes=5)
+        )
+
+        response = self.post_order()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            IdempotencyKey.objects.get().status_code,
+            status.HTTP_201_CREATED
+        )
+
+    def test_failed_request_releases_key(self):
+        Ticket.objects.create(
+            row=1,
+            seat=1,
+            flight=self.flight,
+            order=Order.objects.create(user=self.user)
+        )
+
+        response = self.post_order()
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def test_expired_key_is_reused(self):
+        sample_key(
+            user=self.user,
+            expires_at=timezone.now() - datetime.timedelta(minutes=1)
+        )
+
+        response = self.post_order()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(
+            IdempotencyKey.objects.get().response_body["id"],
+            response.data["id"]
+        )
+
+    def test_auto_assign_replayed(self):
+        payload = {"flight": self.flight.id, "count": 2}
+        headers = {"Idempotency-Key": "auto-1"}
+
+        response = self.client.post(
+            ORDER_AUTO_ASSIGN_URL, payload, format="json", headers=headers
+        )
+        replayed = self.client.post(
+            ORDER_AUTO_ASSIGN_URL, payload, format="json", headers=headers
+        )
+
+        self.assertEqual(replayed.data, response.data)
+        self.assertEqual(Ticket.objects.count(), 2)
+
+    def test_purge_idempotency_keys_command(self):
+        key = sample_key(user=self.user)
+        for number in range(3):
+            sample_key(
+                user=self.user,
+                key=f"expired-{number}",
+                expires_at=timezone.now() - datetime.timedelta(minutes=1)
+            )
+
+        call_command("purge_idempotency_keys", batch_size=2, stdout=StringIO())
+
+        self.assertEqual(list(IdempotencyKey.objects.all()), [key])
@@ -0,0 +1,213 @@
+import datetime
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.itineraries import get_index, reset_index
+from airport.models import Flight, Route
+from airport.tests.test_airplane_api import sample_airplane
+from airport.tests.test_airport_api import sample_airport, sample_route
+from airport.tests.test_flight_api import sample_flight
+
+
+ITINERARY_URL = reverse("airport:itinerary-list")
+
+
+def at(hour: int, minute: int = 0, day: int = 5) -> datetime.datetime:
+    return timezone.make_aware(
+        datetime.datetime(2026, 12, day) + datetime.timedelta(
+            hours=hour,
+            minutes=minute
+        )
+    )
+
+
+class ItinerarySearchTests(TestCase):
+    def setUp(self):
+        reset_index()
+        self.addCleanup(reset_index)
+
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="traveller@mail.co",
+            password="12R445%3df"
+        )
+        self.client.force_authenticate(self.user)
+
+        self.kyiv = sample_airport(name="Kyiv")
+        self.warsaw = sample_airport(name="Warsaw")
+        self.berlin = sample_airport(name="Berlin")
+        self.lisbon = sample_airport(name="Lisbon")
+        self.airplane = sample_airplane()
+
+        self.kyiv_warsaw = sample_route(self.kyiv, self.warsaw)
+        self.warsaw_berlin = sample_route(self.warsaw, self.berlin)
+        self.berlin_lisbon = sample_route(self.berlin, self.lisbon)
+        self.warsaw_lisbon = sample_route(self.warsaw, self.lisbon)
+
+    def flight(
+            self,
+            route: Route,
+            departure_time: datetime.datetime,
+            arrival_time: datetime.datetime
+    ) -> Flight:
+        return sample_flight(
+            route=route,
+            airplane=self.airplane,
+            departure_time=departure_time,
+            arrival_time=arrival_time
+        )
+
+    def search(self, destination=None, **params):
+        return self.client.get(
+            ITINERARY_URL,
+            {
+                "source": self.kyiv.id,
+                "destination": (destination or self.lisbon).id,
+                "date": "2026-12-05",
+                **params
+            }
+        )
+
+    def test_connecting_itineraries_ranked_by_duration(self):
+        to_warsaw = self.flight(self.kyiv_warsaw, at(8), at(10))
+        to_lisbon = self.flight(self.warsaw_lisbon, at(20), at(23))
+        to_berlin = self.flight(self.warsaw_berlin, at(11), at(12))
+        berlin_to_lisbon = self.flight(self.berlin_lisbon, at(13), at(15))
+
+        response = self.search()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [
+                [flight["id"] for flight in itinerary["flights"]]
+                for itinerary in response.data
+            ],
+            [
+                [to_warsaw.id, to_berlin.id, berlin_to_lisbon.id],
+                [to_warsaw.id, to_lisbon.id],
+            ]
+        )
+        self.assertEqual(response.data[0]["stops"], 2)
+        self.assertEqual(response.data[0]["duration"], "07:00:00")
+
+    def test_direct_flight(self):
+        flight = self.flight(self.kyiv_warsaw, at(8), at(10))
+
+        response = self.search(destination=self.warsaw)
+
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]["stops"], 0)
+        self.assertEqual(response.data[0]["flights"][0]["id"], flight.id)
+
+    def test_layover_window(self):
+        self.flight(self.kyiv_warsaw, at(8), at(10))
+        self.flight(self.warsaw_lisbon, at(10, 20), at(13))
+        in_window = self.flight(self.warsaw_lisbon, at(11), at(14))
+        self.flight(self.warsaw_lisbon, at(23), at(23, 50))
+
+        response = self.search(min_layover=30, max_layover=120)
+
+        self.assertEqual(
+            [itinerary["flights"][-1]["id"] for itinerary in response.data],
+            [in_window.id]
+        )
+
+    def test_max_stops(self):
+        self.flight(self.kyiv_warsaw, at(8), at(10))
+        self.flight(self.warsaw_berlin, at(11), at(12))
+        self.flight(self.berlin_lisbon, at(13), at(15))
+
+        response = self.search(max_stops=1)
+
+        self.assertEqual(response.data, [])
+
+    def test_only_flights_departing_on_date(self):
+        self.flight(self.kyiv_warsaw, at(8, day=6), at(10, day=6))
+
+        response = self.search(destination=self.warsaw)
+
+        self.assertEqual(response.data, [])
+
+    def test_departed_flights_skipped(self):
+        self.flight(self.kyiv_warsaw, at(8), at(10))
+        later = self.flight(self.kyiv_warsaw, at(12), at(14))
+
+        with patch("django.utils.timezone.now", return_value=at(9)):
+            response = self.search(destination=self.warsaw)
+
+        self.assertEqual(
+            [itinerary["flights"][0]["id"] for itinerary in response.data],
+            [later.id]
+        )
+
+    def test_departed_flights_left_out_of_index(self):
+        departed = self.flight(self.kyiv_warsaw, at(8), at(10))
+        later = self.flight(self.kyiv_warsaw, at(12), at(14))
+
+        with patch("django.utils.timezone.now", return_value=at(9)):
+            index = get_index()
+            self.assertNotIn(departed.id, index.flight_routes)
+
+        reset_index()
+        index = get_index()
+        with patch("django.utils.timezone.now", return_value=at(9)):
+            index.add_flight(later.id, self.kyiv_warsaw.id, at(13), at(15))
+
+        self.assertNotIn(departed.id, index.flight_routes)
+        self.assertEqual(
+            index.flights[self.kyiv_warsaw.id],
+            [(at(13), at(15), later.id)]
+        )
+
+    def test_sold_out_flights_skipped(self):
+        self.flight(self.kyiv_warsaw, at(8), at(10))
+        sold_out = self.flight(self.warsaw_lisbon, at(11), at(14))
+        Flight.objects.filter(pk=sold_out.pk).update(seats_available=0)
+
+        response = self.search()
+
+        self.assertEqual(response.data, [])
+
+    def test_invalid_params(self):
+        too_many_stops = self.search(max_stops=3)
+        same_airport = self.search(destination=self.kyiv)
+
+        self.assertEqual(
+            too_many_stops.status_code,
+            status.HTTP_400_BAD_REQUEST
+        )
+        self.assertIn("max_stops", too_many_stops.data)
+        self.assertEqual(
+            same_airport.status_code,
+            status.HTTP_400_BAD_REQUEST
+        )
+        self.assertIn("destination", same_airport.data)
+
+    def test_index_updated_on_commit(self):
+        self.search()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            to_warsaw = self.flight(self.kyiv_warsaw, at(8), at(10))
+            to_lisbon = self.flight(self.warsaw_lisbon, at(11), at(14))
+
+        response = self.search()
+        self.assertEqual(
+            [flight["id"] for flight in response.data[0]["flights"]],
+            [to_warsaw.id, to_lisbon.id]
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            to_lisbon.departure_time = at(12)
+            to_lisbon.save()
+            self.kyiv_warsaw.delete()
+
+        self.assertEqual(get_index().flights[self.warsaw_lisbon.id][0], (
+            at(12), at(14), to_lisbon.id
+        ))
+        self.assertEqual(self.search().data, [])
@@ -1,11 +1,25 @@
+import csv
+import datetime
+import json
+from io import StringIO
+from unittest.mock import patch
+
+import msgpack
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.management import call_command
+from django.db import connection, IntegrityError, OperationalError
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient
 
-from airport.models import Order, Flight, Ticket
+from airport import seats
+from airport.models import Order, Flight, Ticket, SeatHold
+from airport.seat_map import SeatMap
 from airport.serializers import OrderListSerializer, OrderDetailSerializer
 from airport.tests import test_flight_api
 from airport.tests.test_airplane_api import sample_airplane
@@ -15,6 +29,8 @@ from airport.tests.test_crew_api import sample_crew
 
 
 ORDER_URL = reverse("airport:order-list")
+ORDER_AUTO_ASSIGN_URL = reverse("airport:order-auto-assign")
+ORDER_EXPORT_URL = reverse("airport:order-export")
 COUNTER = 0
 
 
@@ -99,6 +115,40 @@ class AuthenticatedCrewTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["results"], serializer.data)
 
+    def test_order_keyset_pages(self):
+        orders = [sample_order(self.user) for _ in range(7)]
+        sample_order(get_user_model().objects.create_user(
+            email="other@mail.co",
+            password="12R445%3df"
+        ))
+        # equal timestamps are ordered by id
+        Order.objects.filter(
+            pk__in=[order.pk for order in orders[2:5]]
+        ).update(created_at=orders[2].created_at)
+
+        ids = []
+        url = ORDER_URL
+        params = {"cursor": "", "page_size": 3}
+        with CaptureQueriesContext(connection) as queries:
+            while url:
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertNotIn("count", response.data)
+                ids += [order["id"] for order in response.data["results"]]
+                url, params = response.data["links"]["next"], None
+
+        self.assertEqual(
+            ids,
+            list(
+                Order.objects.filter(user=self.user)
+                .order_by("-created_at", "-id")
+                .values_list("id", flat=True)
+            )
+        )
+        self.assertFalse(
+            any("COUNT" in query["sql"] for query in queries.captured_queries)
+        )
+
     def test_order_detail(self):
         order = sample_order(self.user)
         sample_ticket(order=order)
@@ -111,6 +161,142 @@ class AuthenticatedCrewTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data, serializer.data)
 
+    def test_order_detail_renderers(self):
+        order = sample_order(self.user)
+        sample_ticket(order=order)
+        sample_ticket(seat=1, order=order)
+
+        response = self.client.get(detail_url(order.id))
+        packed = self.client.get(
+            detail_url(order.id),
+            HTTP_ACCEPT="application/msgpack"
+        )
+
+        data = OrderDetailSerializer(order).data
+        self.assertEqual(response.content, JSONRenderer().render(data))
+        self.assertEqual(packed["Content-Type"], "application/msgpack")
+        self.assertEqual(
+            msgpack.unpackb(packed.content),
+            json.loads(response.content)
+        )
+        # flight datetime formats
+        self.assertEqual(
+            msgpack.unpackb(packed.content)["tickets"][0]["flight"][
+                "departure_time"
+            ],
+            "05 December 26 00:00"
+        )
+
+    def test_order_create_msgpack(self):
+        flight = sample_flight()
+        payload = {"tickets": [{"row": 1, "seat": 3, "flight": flight.id}]}
+
+        response = self.client.post(
+            ORDER_URL,
+            data=msgpack.packb(payload),
+            content_type="application/msgpack",
+            HTTP_ACCEPT="application/msgpack"
+        )
+        invalid = self.client.post(
+            ORDER_URL,
+            data=b"\xc1",
+            content_type="application/msgpack"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        ticket = msgpack.unpackb(response.content)["tickets"][0]
+        self.assertEqual(
+            (ticket["row"], ticket["seat"], ticket["flight"]),
+            (1, 3, flight.id)
+        )
+        self.assertEqual(invalid.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_order_list_fields(self):
+        order = sample_order(self.user)
+        sample_ticket(order=order)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(ORDER_URL, {"fields": "id"})
+        with CaptureQueriesContext(connection) as ticket_queries:
+            tickets = self.client.get(
+                ORDER_URL,
+                {"fields": "tickets.flight.out_of"}
+            )
+
+        self.assertEqual(response.data["results"], [{"id": order.id}])
+        self.assertFalse(
+            any("airport_ticket" in query["sql"] for query in queries)
+        )
+        self.assertEqual(
+            tickets.data["results"],
+            [{"tickets": [{"flight": {"out_of": "Some airport"}}]}]
+        )
+        self.assertFalse(
+            any(
+                "airport_crew" in query["sql"]
+                or "airport_airplane" in query["sql"]
+                for query in ticket_queries
+            )
+        )
+
+    def test_order_detail_normalized(self):
+        order = sample_order(self.user)
+        flight = sample_flight()
+        other_flight = sample_flight()
+        for seat in range(1, 6):
+            sample_ticket(seat=seat, flight=flight, order=order)
+        sample_ticket(flight=other_flight, order=order)
+
+        response = self.client.get(detail_url(order.id), {"normalized": 1})
+        detail = OrderDetailSerializer(order).data
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["tickets"],
+            [
+                {**ticket, "flight": ticket["flight"]["id"]}
+                for ticket in detail["tickets"]
+            ]
+        )
+        self.assertEqual(
+            response.data["flights"],
+            {
+                str(ticket["flight"]["id"]): ticket["flight"]
+                for ticket in detail["tickets"]
+            }
+        )
+        self.assertEqual(
+            list(response.data["flights"]),
+            [str(flight.id), str(other_flight.id)]
+        )
+
+    def test_order_list_normalized_fields(self):
+        order = sample_order(self.user)
+        flight = sample_flight()
+        sample_ticket(flight=flight, order=order)
+        sample_ticket(seat=1, flight=flight, order=order)
+
+        response = self.client.get(
+            ORDER_URL,
+            {"normalized": "true", "fields": "id,tickets.flight.out_of"}
+        )
+        without_flights = self.client.get(
+            ORDER_URL,
+            {"normalized": "true", "exclude": "tickets.flight"}
+        )
+        invalid = self.client.get(ORDER_URL, {"normalized": "maybe"})
+
+        self.assertEqual(
+            response.data["results"],
+            [{"id": order.id, "tickets": [{"flight": flight.id}] * 2}]
+        )
+        self.assertEqual(
+            response.data["flights"],
+            {str(flight.id): {"out_of": "Some airport"}}
+        )
+        self.assertNotIn("flights", without_flights.data)
+        self.assertEqual(invalid.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_order_create(self):
         flight = sample_flight()
         payload = {
@@ -171,6 +357,75 @@ class AuthenticatedCrewTests(TestCase):
             response.data["tickets"][0]["seat"]
         )
 
+    def test_create_order_taken_seat(self):
+        ticket = sample_ticket(order=sample_order(self.user))
+        payload = {
+            "tickets": [
+                {
+                    "row": ticket.row,
+                    "seat": ticket.seat,
+                    "flight": ticket.flight.id
+                }
+            ]
+        }
+
+        response = self.client.post(ORDER_URL, data=payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(
+            "The fields row, seat, flight must make a unique set.",
+            response.data["tickets"][0]["non_field_errors"]
+        )
+
+    def test_create_order_same_seat_twice(self):
+        flight = sample_flight()
+        payload = {
+            "tickets": [
+                {"row": 1, "seat": 1, "flight": flight.id},
+                {"row": 1, "seat": 2, "flight": flight.id},
+                {"row": 1, "seat": 1, "flight": flight.id},
+            ]
+        }
+
+        response = self.client.post(ORDER_URL, data=payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["tickets"][1], {})
+        for ticket_errors in (
+                response.data["tickets"][0],
+                response.data["tickets"][2],
+        ):
+            self.assertIn(
+                "The fields row, seat, flight must make a unique set.",
+                ticket_errors["non_field_errors"]
+            )
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_create_order_queries_do_not_grow_with_tickets(self):
+        flight = sample_flight()
+
+        def count_order_queries(seats: range) -> int:
+            payload = {
+                "tickets": [
+                    {"row": 2, "seat": seat, "flight": flight.id}
+                    for seat in seats
+                ]
+            }
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(
+                    ORDER_URL,
+                    data=payload,
+                    format="json"
+                )
+
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            return len(queries)
+
+        self.assertEqual(
+            count_order_queries(range(1, 2)),
+            count_order_queries(range(2, 8))
+        )
+
     def test_update_not_allowed(self):
         order = sample_order(self.user)
         ticket = sample_ticket(order=order)
@@ -203,3 +458,404 @@ class AuthenticatedCrewTests(TestCase):
             response.status_code,
             status.HTTP_405_METHOD_NOT_ALLOWED
         )
+
+
+class OrderExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="export@mail.co",
+            password="12R445%3df"
+        )
+        self.order = sample_order(self.user)
+        sample_ticket(seat=1, order=self.order)
+        sample_ticket(seat=3, order=self.order)
+        sample_order(get_user_model().objects.create_user(
+            email="other@mail.co",
+            password="12R445%3df"
+        ))
+
+    def test_export_staff_only(self):
+        self.client.force_authenticate(self.user)
+
+        response = self.client.get(ORDER_EXPORT_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_export_orders(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser(
+                email="admin@mail.co",
+                password="12R445%3df"
+            )
+        )
+
+        lines = b"".join(
+            self.client.get(ORDER_EXPORT_URL).streaming_content
+        ).decode().splitlines()
+        rows = list(csv.reader(StringIO(b"".join(
+            self.client.get(
+                ORDER_EXPORT_URL,
+                {"file_format": "csv"}
+            ).streaming_content
+        ).decode())))
+
+        orders = [json.loads(line) for line in lines]
+        self.assertEqual(
+            [(order["user"], len(order["tickets"])) for order in orders],
+            [("export@mail.co", 2), ("other@mail.co", 0)]
+        )
+        self.assertEqual(
+            rows[0],
+            ["order", "user", "created_at", "flight", "row", "seat"]
+        )
+        self.assertEqual(
+            [row[-1] for row in rows[1:]],
+            ["1", "3"]
+        )
+
+
+class OrderAutoAssignTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="auto.assign@mail.co",
+            password="12R445%3df"
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+        self.order = sample_order(self.user)
+
+    def take_seats(self, *seats: tuple[int, int]) -> None:
+        for row, seat in seats:
+            Ticket.objects.create(
+                row=row,
+                seat=seat,
+                flight=self.flight,
+                order=self.order
+            )
+
+    def assigned_seats(self, response) -> list[tuple[int, int]]:
+        return sorted(
+            (ticket["row"], ticket["seat"])
+            for ticket in response.data["tickets"]
+        )
+
+    def test_auto_assign_adjacent_seats(self):
+        self.take_seats(*((1, seat) for seat in range(3, 10)))
+        payload = {"flight": self.flight.id, "count": 3, "adjacent": True}
+
+        response = self.client.post(
+            ORDER_AUTO_ASSIGN_URL,
+            data=payload,
+            format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            self.assigned_seats(response),
+            [(1, 10), (1, 11), (1, 12)]
+        )
+        self.assertEqual(
+            Order.objects.get(pk=response.data["id"]).user,
+            self.user
+        )
+
+    def test_auto_assign_seats_centered_in_row(self):
+        payload = {"flight": self.flight.id, "count": 2, "adjacent": True}
+
+        response = self.client.post(
+            ORDER_AUTO_ASSIGN_URL,
+            data=payload,
+            format="json"
+        )
+
+        self.assertEqual(self.assigned_seats(response), [(1, 6), (1, 7)])
+
+    def test_auto_assign_split_seats(self):
+        seats_in_row = self.flight.airplane.seats_in_row
+        self.take_seats(
+            *(
+                (row, seat)
+                for row in range(1, self.flight.airplane.rows + 1)
+                for seat in range(1, seats_in_row + 1)
+                if seat % 2
+            )
+        )
+        payload = {"flight": self.flight.id, "count": 3}
+
+        response = self.client.post(
+            ORDER_AUTO_ASSIGN_URL,
+            data=payload,
+            format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            self.assigned_seats(response),
+            [(1, 2), (1, 4), (1, 6)]
+        )
+
+    def test_auto_assign_skips_seats_held_by_others(self):
+        other_user = get_user_model().objects.create_user(
+            email="other.auto.assign@mail.co",
+            password="12R445%3df"
+        )
+        for seat in range(1, 13):
+            SeatHold.objects.create(
+                row=1,
+                seat=seat,
+                flight=self.flight,
+                user=other_user,
+                expires_at=timezone.now() + datetime.timedelta(minutes=5)
+            )
+        payload = {"flight": self.flight.id, "count": 1}
+
+        response = self.client.post(
+            ORDER_AUTO_ASSIGN_URL,
+            data=payload,
+            format="json"
+        )
+
+        self.assertEqual(self.assigned_seats(response), [(2, 6)])
+
+    def test_auto_assign_ignores_holds_out_of_airplane(self):
+        SeatHold.objects.create(
+            row=self.flight.airplane.rows + 1,
+            seat=1,
+            flight=self.flight,
+            user=get_user_model().objects.create_user(
+                email="shrunk.auto.assign@mail.co",
+                password="12R445%3df"
+            ),
+            expires_at=timezone.now() + datetime.timedelta(minutes=5)
+        )
+
+        response = self.client.post(
+            ORDER_AUTO_ASSIGN_URL,
+            data={"flight": self.flight.id, "count": 1},
+            format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_auto_assign_not_enough_seats(self):
+        payload = {
+            "flight": self.flight.id,
+            "count": self.flight.airplane.capacity + 1
+        }
+
+        response = self.client.post(
+            ORDER_AUTO_ASSIGN_URL,
+            data=payload,
+            format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("count", response.data)
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_auto_assign_too_many_adjacent_seats(self):
+        payload = {
+            "flight": self.flight.id,
+            "count": self.flight.airplane.seats_in_row + 1,
+            "adjacent": True,
+        }
+
+        response = self.client.post(
+            ORDER_AUTO_ASSIGN_URL,
+            data=payload,
+            format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("count", response.data)
+
+
+class OrderWriteConflictTests(TransactionTestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="conflict@mail.co",
+            password="12R445%3df"
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+        self.payload = {
+            "tickets": [{"row": 1, "seat": 1, "flight": self.flight.id}]
+        }
+
+    def failing_book_seats(self, error: Exception, failures: int):
+        calls = []
+
+        def book_seats(*args, **kwargs):
+            calls.append(args)
+            if len(calls) <= failures:
+                raise error
+            return seats.book_seats(*args, **kwargs)
+
+        return patch("airport.serializers.book_seats", book_seats), calls
+
+    @patch("airport.transactions.time.sleep")
+    def test_order_create_retried_after_conflict(self, sleep):
+        book_seats, calls = self.failing_book_seats(
+            OperationalError("database is locked"),
+            failures=2
+        )
+
+        with book_seats:
+            response = self.client.post(
+                ORDER_URL,
+                data=self.payload,
+                format="json"
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    @patch("airport.transactions.time.sleep")
+    def test_order_create_conflict_after_retries(self, sleep):
+        book_seats, calls = self.failing_book_seats(
+            IntegrityError("UNIQUE constraint failed: airport_ticket.row"),
+            failures=10
+        )
+
+        with book_seats:
+            response = self.client.post(
+                ORDER_URL,
+                data=self.payload,
+                format="json"
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(len(calls), 4)
+        self.assertFalse(Order.objects.exists())
+
+    def test_order_create_other_errors_not_retried(self):
+        book_seats, calls = self.failing_book_seats(
+            IntegrityError("NOT NULL constraint failed: airport_ticket.row"),
+            failures=1
+        )
+
+        with book_seats, self.assertRaises(IntegrityError):
+            self.client.post(ORDER_URL, data=self.payload, format="json")
+
+        self.assertEqual(len(calls), 1)
+
+
+class FlightSeatCountersTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="seats@mail.co",
+            password="12R445%3df"
+        )
+        self.client.force_authenticate(self.user)
+
+    def assert_seats(self, flight: Flight, sold: int) -> None:
+        flight.refresh_from_db()
+        self.assertEqual(flight.seats_sold, sold)
+        self.assertEqual(
+            flight.seats_available,
+            flight.airplane.capacity - sold
+        )
+        self.assertEqual(
+            sorted(SeatMap.for_flight(flight).taken()),
+            sorted(flight.tickets.values_list("row", "seat"))
+        )
+
+    def test_new_flight_has_all_seats_available(self):
+        self.assert_seats(sample_flight(), sold=0)
+
+    def test_order_create_books_seats(self):
+        flight = sample_flight()
+        payload = {
+            "tickets": [
+                {"row": 1, "seat": 1, "flight": flight.id},
+                {"row": 1, "seat": 2, "flight": flight.id},
+            ]
+        }
+
+        response = self.client.post(ORDER_URL, data=payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assert_seats(flight, sold=2)
+
+    def test_order_delete_releases_seats(self):
+        order = sample_order(self.user)
+        ticket = sample_ticket(order=order)
+        sample_ticket(seat=1, order=order, flight=ticket.flight)
+
+        self.assert_seats(ticket.flight, sold=2)
+
+        order.delete()
+
+        self.assert_seats(ticket.flight, sold=0)
+
+    def test_ticket_moved_to_another_flight(self):
+        ticket = sample_ticket(order=sample_order(self.user))
+        old_flight = ticket.flight
+        ticket.flight = sample_flight()
+        ticket.save()
+
+        self.assert_seats(old_flight, sold=0)
+        self.assert_seats(ticket.flight, sold=1)
+
+    def test_flight_update_keeps_seats_sold(self):
+        ticket = sample_ticket(order=sample_order(self.user))
+        flight = Flight.objects.get(pk=ticket.flight_id)
+        sample_ticket(seat=1, order=ticket.order, flight=ticket.flight)
+
+        flight.save()
+
+        self.assert_seats(flight, sold=2)
+
+    def test_airplane_capacity_change_updates_flights(self):
+        ticket = sample_ticket(order=sample_order(self.user))
+        airplane = ticket.flight.airplane
+        airplane.rows += 2
+        airplane.save()
+
+        self.assert_seats(ticket.flight, sold=1)
+
+    def test_airplane_save_without_layout_change_keeps_seats(self):
+        airplane = sample_flight().airplane
+        airplane.name = "Renamed"
+
+        with patch("airport.signals.rebuild_seats") as rebuild:
+            airplane.save()
+
+        rebuild.assert_not_called()
+
+    def test_flight_moved_to_another_airplane_rebuilds_seats(self):
+        ticket = sample_ticket(order=sample_order(self.user))
+        flight = Flight.objects.get(pk=ticket.flight_id)
+        flight.airplane = sample_airplane(rows=30)
+        flight.save()
+
+        self.assert_seats(flight, sold=1)
+
+    def test_rebuild_flight_seats(self):
+        ticket = sample_ticket(order=sample_order(self.user))
+        Flight.objects.update(seats_sold=0, seats_available=0)
+
+        call_command("rebuild_flight_seats", stdout=StringIO())
+
+        self.assert_seats(ticket.flight, sold=1)
+
+    def test_rebuild_seats_in_batches(self):
+        tickets = [
+            sample_ticket(order=sample_order(self.user)) for _ in range(3)
+        ]
+        Flight.objects.update(seat_map=b"")
+
+        with CaptureQueriesContext(connection) as queries:
+            seats.rebuild_seats(batch_size=2)
+
+        self.assertFalse(
+            any("OFFSET" in query["sql"] for query in queries.captured_queries)
+        )
+        for ticket in tickets:
+            self.assert_seats(ticket.flight, sold=1)
@@ -0,0 +1,201 @@
+import datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Order, OrderRequest, Ticket
+from airport.order_queue import process_order_request
+from airport.tests.test_order_api import ORDER_URL, sample_flight
+
+
+ORDER_REQUEST_URL = reverse("airport:order-request-list")
+ASYNC_HEADERS = {"Prefer": "respond-async"}
+
+
+def detail_url(order_request_id: int) -> str:
+    return reverse("airport:order-request-detail", args=[order_request_id])
+
+
+def process_orders() -> None:
+    call_command("process_orders", workers=1, stdout=StringIO())
+
+
+class UnauthenticatedOrderRequestTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_auth_required(self):
+        response = self.client.get(ORDER_REQUEST_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class AuthenticatedOrderRequestTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="queue@mail.co",
+            password="12R445%3df"
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+        self.payload = {
+            "tickets": [
+                {"row": 1, "seat": 1, "flight": self.flight.id},
+                {"row": 1, "seat": 2, "flight": self.flight.id},
+            ]
+        }
+
+    def test_order_create_async(self):
+        response = self.client.post(
+            ORDER_URL,
+            self.payload,
+            format="json",
+            headers=ASYNC_HEADERS
+        )
+
+        order_request = OrderRequest.objects.get()
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["status"], "pending")
+        self.assertEqual(
+            response.headers["Location"],
+            "http://testserver" + detail_url(order_request.id)
+        )
+        self.assertEqual(order_request.payload, self.payload)
+        self.assertFalse(Order.objects.exists())
+
+    def test_order_create_async_replayed_with_location(self):
+        headers = {**ASYNC_HEADERS, "Idempotency-Key": "async-1"}
+
+        response = self.client.post(
+            ORDER_URL, self.payload, format="json", headers=headers
+        )
+        replayed = self.client.post(
+            ORDER_URL, self.payload, format="json", headers=headers
+        )
+
+        self.assertEqual(replayed.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(replayed.headers["Idempotent-Replayed"], "true")
+        self.assertEqual(
+            replayed.headers["Location"],
+            response.headers["Location"]
+        )
+        self.assertEqual(OrderRequest.objects.count(), 1)
+
+    def test_order_create_async_invalid_payload(self):
+        response = self.client.post(
+            ORDER_URL,
+            {"tickets": [{"row": 100, "seat": 1, "flight": self.flight.id}]},
+            format="json",
+            headers=ASYNC_HEADERS
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(OrderRequest.objects.exists())
+
+    def test_process_orders(self):
+        self.client.post(
+            ORDER_URL,
+            self.payload,
+            format="json",
+            headers=ASYNC_HEADERS
+        )
+
+        process_orders()
+
+        order_request = OrderRequest.objects.get()
+        response = self.client.get(detail_url(order_request.id))
+        self.assertEqual(response.data["status"], "completed")
+        self.assertEqual(response.data["order"], Order.objects.get().id)
+        self.assertIsNotNone(response.data["processed_at"])
+        self.assertEqual(
+            sorted(Ticket.objects.values_list("row", "seat")),
+            [(1, 1), (1, 2)]
+        )
+
+    def test_process_orders_seat_taken_meanwhile(self):
+        self.client.post(
+            ORDER_URL,
+            self.payload,
+            format="json",
+            headers=ASYNC_HEADERS
+        )
+        self.client.post(ORDER_URL, self.payload, format="json")
+
+        process_orders()
+
+        order_request = OrderRequest.objects.get()
+        self.assertEqual(order_request.status, OrderRequest.Status.FAILED)
+        self.assertIn("tickets", order_request.errors)
+        self.assertIsNone(order_request.order)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_process_orders_reclaims_stale_requests(self):
+        stale = OrderRequest.objects.create(
+            user=self.user,
+            payload=self.payload,
+            status=OrderRequest.Status.PROCESSING,
+            claimed_at=timezone.now() - datetime.timedelta(hours=1)
+        )
+        OrderRequest.objects.create(
+            user=self.user,
+            payload=self.payload,
+            status=OrderRequest.Status.PROCESSING,
+            claimed_at=timezone.now()
+        )
+
+        process_orders()
+
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, OrderRequest.Status.COMPLETED)
+        self.assertEqual(
+            OrderRequest.objects.filter(
+                status=OrderRequest.Status.PROCESSING
+            ).count(),
+            1
+        )
+
+    def test_processed_request_is_not_ordered_again(self):
+        OrderRequest.objects.create(
+            user=self.user,
+            payload=self.payload,
+            status=OrderRequest.Status.PROCESSING,
+            claimed_at=timezone.now()
+        )
+        # a slow worker and the one which reclaimed the request
+        slow = OrderRequest.objects.get()
+        reclaimed = OrderRequest.objects.get()
+
+        process_order_request(reclaimed)
+        processed = process_order_request(slow)
+
+        self.assertEqual(processed.status, OrderRequest.Status.COMPLETED)
+        self.assertEqual(processed.order, Order.objects.get())
+        self.assertEqual(Ticket.objects.count(), 2)
+
+    def test_list_own_order_requests(self):
+        order_request = OrderRequest.objects.create(
+            user=self.user,
+            payload=self.payload
+        )
+        OrderRequest.objects.create(
+            user=get_user_model().objects.create_user(
+                email="other.queue@mail.co",
+                password="12R445%3df"
+            ),
+            payload=self.payload
+        )
+
+        response = self.client.get(ORDER_REQUEST_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [data["id"] for data in response.data["results"]],
+            [order_request.id]
+        )
@@ -0,0 +1,186 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from airport.filters import FlightDateFilterBackend
+from airport.models import Flight, Order, OrderRequest
+from airport.tests.test_airplane_api import sample_airplane
+from airport.tests.test_airport_api import sample_airport, sample_route
+
+
+FLIGHT_URL = reverse("airport:flight-list")
+ORDER_URL = reverse("airport:order-list")
+ORDER_REQUEST_URL = reverse("airport:order-request-list")
+
+# tables which are too large to be read whole by a request
+LARGE_TABLES = ("airport_flight", "airport_order", "airport_orderrequest")
+
+FLIGHTS_COUNT = 6000
+USERS_COUNT = 40
+ORDERS_PER_USER = 50
+
+
+def sequential_scans(sql: str, params: tuple = ()) -> list[str]:
+    """Plan lines of ``sql`` which read a large table row by row"""
+
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(f"EXPLAIN {sql}", params)
+            lines = [row[0] for row in cursor.fetchall()]
+            return [
+                line for line in lines
+                if any(f"Seq Scan on {table} " in f"{line} "
+                       for table in LARGE_TABLES)
+            ]
+
+        # SQLite SCAN walks the whole table or a whole index, a range
+        # lookup is a SEARCH
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        lines = [row[-1] for row in cursor.fetchall()]
+        return [
+            line for line in lines
+            if line.startswith("SCAN ") and line.split()[1] in LARGE_TABLES
+        ]
+
+
+class QueryPlanTests(TestCase):
+    """Requests over a seeded dataset have to be served by indexes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        airports = [
+            sample_airport(name=f"Airport {number}", closest_big_city=city)
+            for number, city in enumerate(("Kyiv", "Warsaw", "Lisbon", "Oslo"))
+        ]
+        routes = [
+            sample_route(source, destination)
+            for source in airports
+            for destination in airports
+            if source != destination
+        ]
+        airplanes = [
+            sample_airplane(name=f"Airplane {number}") for number in range(5)
+        ]
+
+        # most flights are in the past, as in a long running database
+        start = timezone.now() - datetime.timedelta(days=200)
+        Flight.objects.bulk_create(
+            Flight(
+                route=routes[number % len(routes)],
+                airplane=airplanes[number % len(airplanes)],
+                departure_time=start + datetime.timedelta(hours=number),
+                arrival_time=start + datetime.timedelta(hours=number + 3),
+                seats_available=60,
+                search_document=f"airport\nkyiv\nairport\nwarsaw\n{number}",
+            )
+            for number in range(FLIGHTS_COUNT)
+        )
+
+        users = get_user_model().objects.bulk_create(
+            get_user_model()(email=f"plans{number}@mail.co")
+            for number in range(USERS_COUNT)
+        )
+        cls.user = users[0]
+        Order.objects.bulk_create(
+            Order(user=user)
+            for user in users
+            for _ in range(ORDERS_PER_USER)
+        )
+        OrderRequest.objects.bulk_create(
+            OrderRequest(user=user, payload={})
+            for user in users
+            for _ in range(ORDERS_PER_USER)
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def assertIndexedRequest(self, url: str, params: dict) -> None:
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for query in queries.captured_queries:
+            if query["sql"].startswith("SELECT"):
+                self.assertEqual(sequential_scans(query["sql"]), [])
+
+    def test_flight_list_plans(self):
+        tomorrow = timezone.localdate() + datetime.timedelta(days=1)
+        week_later = timezone.localdate() + datetime.timedelta(days=7)
+
+        for params in (
+                {},
+                {"departure_day": str(tomorrow)},
+                {"arrival_day": str(tomorrow)},
+                {"departure_start": str(tomorrow)},
+                {"arriving_start": str(tomorrow)},
+                {"departure_end": str(week_later)},
+                {"arriving_end": str(week_later)},
+                {
+                    "departure_start": str(tomorrow),
+                    "arriving_end": str(week_later),
+                },
+                {"search": "kyiv"},
+                {"search": "warsaw", "departure_day": str(tomorrow)},
+                {"ordering": "airplane__name"},
+                {"ordering": "-arrival_time,departure_time"},
+        ):
+            with self.subTest(params=params):
+                self.assertIndexedRequest(FLIGHT_URL, params)
+
+    def test_day_filters_plans_without_upcoming_filter(self):
+        day = str(timezone.localdate())
+
+        for param in ("departure_day", "arrival_day"):
+            with self.subTest(param=param):
+                queryset = FlightDateFilterBackend().filter_queryset(
+                    Request(APIRequestFactory().get(FLIGHT_URL, {param: day})),
+                    Flight.objects.all(),
+                    None
+                )
+
+                self.assertEqual(
+                    sequential_scans(*queryset.query.sql_with_params()),
+                    []
+                )
+
+    def test_flight_detail_plan(self):
+        flight = Flight.objects.order_by("-departure_time").first()
+
+        self.assertIndexedRequest(
+            reverse("airport:flight-detail", args=[flight.id]),
+            {}
+        )
+
+    def test_keyset_page_plans(self):
+        for url, params in (
+                (FLIGHT_URL, {}),
+                (FLIGHT_URL, {"ordering": "-arrival_time"}),
+                (ORDER_URL, {}),
+        ):
+            with self.subTest(url=url, params=params):
+                response = self.client.get(
+                    url,
+                    {**params, "cursor": "", "page_size": 10}
+                )
+                for _ in range(2):
+                    response = self.client.get(response.data["links"]["next"])
+
+                self.assertIndexedRequest(response.data["links"]["next"], {})
+
+    def test_order_list_plans(self):
+        for url in (ORDER_URL, ORDER_REQUEST_URL):
+            with self.subTest(url=url):
+                self.assertIndexedRequest(url, {})
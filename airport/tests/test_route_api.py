@@ -1,11 +1,18 @@
+import datetime
+from unittest.mock import patch
+
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from airport.models import Airport, Route
+from airport.fare_calendar import build_fare_calendar
+from airport.models import Airport, Flight, Order, Route, Ticket
 from airport.serializers import RouteListSerializer, RouteDetailSerializer
+from airport.tests.test_airplane_api import sample_airplane
 from airport.tests.test_airport_api import sample_airport
 
 
@@ -26,6 +33,10 @@ def detail_url(route_id: int) -> str:
     return reverse("airport:route-detail", args=[route_id])
 
 
+def calendar_url(route_id: int) -> str:
+    return reverse("airport:route-calendar", args=[route_id])
+
+
 class UnauthenticatedRouteTest(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -86,6 +97,32 @@ class AuthenticatedRouteTest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["results"], serializer.data)
 
+    def test_route_filtering_by_source_city_long_term(self):
+        airport1 = sample_airport(name="Airport 1", closest_big_city="Kiyv")
+        airport2 = sample_airport(name="Airport 2", closest_big_city="Lviv")
+        route = sample_route(airport1, airport2)
+        sample_route(airport2, airport1)
+
+        response = self.client.get(ROUTE_URL, {"s_city": "KIY"})
+
+        self.assertEqual(
+            [route_data["id"] for route_data in response.data["results"]],
+            [route.id]
+        )
+
+    def test_route_search(self):
+        airport1 = sample_airport(name="Boryspil", closest_big_city="Kiyv")
+        airport2 = sample_airport(name="Airport 2", closest_big_city="Lviv")
+        route = sample_route(airport1, airport2)
+        sample_route(airport2, sample_airport(name="Airport 3"))
+
+        response = self.client.get(ROUTE_URL, {"search": "rysp"})
+
+        self.assertEqual(
+            [route_data["id"] for route_data in response.data["results"]],
+            [route.id]
+        )
+
     def test_route_filtering_by_destination_city(self):
         airport1 = sample_airport(
             name="Airport 1",
@@ -214,3 +251,117 @@ class AdminRouteTest(TestCase):
                 payload[variable_name],
                 getattr(route, variable_name).id
             )
+
+
+class RouteCalendarTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="calendar@mail.co",
+            password="12R445%3df"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        kyiv = sample_airport(name="Boryspil", closest_big_city="Kyiv")
+        warsaw = sample_airport(name="Chopin", closest_big_city="Warsaw")
+        self.route = sample_route(kyiv, warsaw)
+        self.airplane = sample_airplane()
+        self.flight = self.sample_flight(self.route, 5, 10)
+        self.sample_flight(self.route, 5, 23)
+        self.sample_flight(self.route, 7, 0)
+        self.sample_flight(self.route, 1, 0, month=1, year=2027)
+        self.sample_flight(sample_route(warsaw, kyiv), 5, 12)
+
+    def sample_flight(
+            self,
+            route: Route,
+            day: int,
+            hour: int,
+            month: int = 12,
+            year: int = 2026
+    ) -> Flight:
+        departure_time = timezone.make_aware(
+            datetime.datetime(year, month, day, hour)
+        )
+
+        return Flight.objects.create(
+            route=route,
+            airplane=self.airplane,
+            departure_time=departure_time,
+            arrival_time=departure_time + datetime.timedelta(hours=2),
+        )
+
+    def get_calendar(self, month: str = "2026-12"):
+        return self.client.get(calendar_url(self.route.id), {"month": month})
+
+    def test_calendar_per_local_day(self):
+        response = self.get_calendar()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data,
+            {
+                "route": self.route.id,
+                "month": "2026-12",
+                "days": [
+                    {
+                        "day": "2026-12-05",
+                        "flights": 2,
+                        "min_seats_available": 60,
+                        "seats_available": 120,
+                    },
+                    {
+                        "day": "2026-12-07",
+                        "flights": 1,
+                        "min_seats_available": 60,
+                        "seats_available": 60,
+                    },
+                ],
+            }
+        )
+
+    def test_calendar_cached_until_tickets_written(self):
+        with patch(
+                "airport.fare_calendar.build_fare_calendar",
+                wraps=build_fare_calendar
+        ) as build:
+            self.get_calendar()
+            self.get_calendar()
+            build.assert_called_once()
+
+            with self.captureOnCommitCallbacks(execute=True):
+                Ticket.objects.create(
+                    row=1,
+                    seat=1,
+                    flight=self.flight,
+                    order=Order.objects.create(user=self.user)
+                )
+            days = self.get_calendar().data["days"]
+
+        self.assertEqual(build.call_count, 2)
+        self.assertEqual(days[0]["min_seats_available"], 59)
+        self.assertEqual(days[0]["seats_available"], 119)
+
+    def test_calendar_invalidated_when_flight_changes_route(self):
+        self.get_calendar()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.flight.route = sample_route(
+                self.route.destination,
+                sample_airport(name="Gatwick", closest_big_city="London")
+            )
+            self.flight.save()
+        days = self.get_calendar().data["days"]
+
+        self.assertEqual(days[0]["flights"], 1)
+
+    def test_calendar_invalid_month(self):
+        response = self.get_calendar("December")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_calendar_unknown_route(self):
+        response = self.client.get(calendar_url(0), {"month": "2026-12"})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,162 @@
+import datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Flight, Order, RouteWeeklyLoad, Ticket
+from airport.tests.test_airplane_api import sample_airplane
+from airport.tests.test_airport_api import sample_airport, sample_route
+
+
+ROUTE_LOAD_URL = reverse("airport:route-load-list")
+
+MONDAY = datetime.date(2026, 11, 30)
+
+
+def departure(day: int, hour: int = 12) -> datetime.datetime:
+    return timezone.make_aware(
+        datetime.datetime.combine(
+            MONDAY + datetime.timedelta(days=day),
+            datetime.time(hour)
+        )
+    )
+
+
+class RouteWeeklyLoadTests(TestCase):
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser(
+            email="loads@mail.co",
+            password="12R445%3df"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+        kyiv = sample_airport(name="Boryspil", closest_big_city="Kyiv")
+        warsaw = sample_airport(name="Chopin", closest_big_city="Warsaw")
+        self.route = sample_route(kyiv, warsaw)
+        self.other_route = sample_route(warsaw, kyiv)
+        # 5 rows of 12 seats
+        self.airplane = sample_airplane()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.flight = self.sample_flight(self.route, departure(0))
+            self.sample_flight(self.route, departure(6, hour=23))
+            self.sample_flight(self.route, departure(7, hour=0))
+            self.sample_flight(self.other_route, departure(1))
+
+    def sample_flight(self, route, departure_time) -> Flight:
+        return Flight.objects.create(
+            route=route,
+            airplane=self.airplane,
+            departure_time=departure_time,
+            arrival_time=departure_time + datetime.timedelta(hours=2),
+        )
+
+    def load(self, route, week) -> RouteWeeklyLoad:
+        return RouteWeeklyLoad.objects.get(route=route, week=week)
+
+    def test_loads_per_local_week(self):
+        load = self.load(self.route, MONDAY)
+
+        self.assertEqual(load.flights, 2)
+        self.assertEqual(load.capacity, 120)
+        self.assertEqual(load.seats_sold, 0)
+        self.assertEqual(
+            self.load(self.route, MONDAY + datetime.timedelta(weeks=1))
+            .flights,
+            1
+        )
+
+    def test_seats_sold_follow_tickets(self):
+        order = Order.objects.create(user=self.admin)
+        ticket = Ticket.objects.create(
+            row=1,
+            seat=1,
+            flight=self.flight,
+            order=order
+        )
+        Ticket.objects.create(row=1, seat=2, flight=self.flight, order=order)
+
+        self.assertEqual(self.load(self.route, MONDAY).seats_sold, 2)
+
+        ticket.delete()
+
+        load = self.load(self.route, MONDAY)
+        self.assertEqual(load.seats_sold, 1)
+        self.assertEqual(load.load_factor, 1 / 120)
+
+    def test_moved_flight_refreshes_both_weeks(self):
+        next_week = MONDAY + datetime.timedelta(weeks=1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.flight.departure_time = departure(8)
+            self.flight.arrival_time = departure(8, hour=14)
+            self.flight.save()
+
+        self.assertEqual(self.load(self.route, MONDAY).flights, 1)
+        self.assertEqual(self.load(self.route, next_week).flights, 2)
+
+    def test_rebuild_route_loads_command(self):
+        Ticket.objects.create(
+            row=1,
+            seat=1,
+            flight=self.flight,
+            order=Order.objects.create(user=self.admin)
+        )
+        expected = list(
+            RouteWeeklyLoad.objects.values_list(
+                "route", "week", "flights", "seats_sold", "capacity"
+            )
+        )
+        RouteWeeklyLoad.objects.filter(route=self.route).update(
+            seats_sold=100
+        )
+        RouteWeeklyLoad.objects.create(
+            route=self.route,
+            week=MONDAY - datetime.timedelta(weeks=10),
+            flights=3
+        )
+
+        call_command("rebuild_route_loads", chunk_weeks=1, stdout=StringIO())
+
+        self.assertEqual(
+            list(
+                RouteWeeklyLoad.objects.values_list(
+                    "route", "week", "flights", "seats_sold", "capacity"
+                )
+            ),
+            expected
+        )
+
+    def test_route_load_list(self):
+        response = self.client.get(
+            ROUTE_LOAD_URL,
+            {"route": self.route.id, "week_from": str(MONDAY)}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [
+                (load["week"], load["flights"], load["load_factor"])
+                for load in response.data["results"]
+            ],
+            [("2026-12-07", 1, 0.0), ("2026-11-30", 2, 0.0)]
+        )
+
+    def test_route_load_list_admin_only(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="user@mail.co",
+                password="12R445%3df"
+            )
+        )
+
+        response = self.client.get(ROUTE_LOAD_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,189 @@
+import datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import SeatHold, Ticket
+from airport.tests.test_order_api import (
+    ORDER_URL,
+    sample_flight,
+    sample_order,
+)
+from airport.validators import SEAT_TAKEN_MESSAGE
+
+
+SEAT_HOLD_URL = reverse("airport:seat-hold-list")
+
+
+def sample_hold(**additional) -> SeatHold:
+    defaults = {
+        "row": 1,
+        "seat": 1,
+        "expires_at": timezone.now() + datetime.timedelta(minutes=5),
+    }
+    defaults.update(additional)
+
+    return SeatHold.objects.create(**defaults)
+
+
+def detail_url(hold_id: int) -> str:
+    return reverse("airport:seat-hold-detail", args=[hold_id])
+
+
+class UnauthenticatedSeatHoldTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_auth_required(self):
+        response = self.client.get(SEAT_HOLD_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class AuthenticatedSeatHoldTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="holder@mail.co",
+            password="12R445%3df"
+        )
+        self.other_user = get_user_model().objects.create_user(
+            email="other.holder@mail.co",
+            password="12R445%3df"
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+
+    def test_hold_seats(self):
+        payload = {
+            "flight": self.flight.id,
+            "seats": [{"row": 1, "seat": 1}, {"row": 1, "seat": 2}],
+        }
+
+        response = self.client.post(SEAT_HOLD_URL, payload, format="json")
+
+        holds = SeatHold.objects.filter(user=self.user, flight=self.flight)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIn("expires_at", response.data)
+        self.assertEqual(
+            sorted(holds.values_list("row", "seat")),
+            [(1, 1), (1, 2)]
+        )
+
+    def test_hold_seat_held_by_other_user(self):
+        sample_hold(flight=self.flight, user=self.other_user)
+        payload = {"flight": self.flight.id, "seats": [{"row": 1, "seat": 1}]}
+
+        response = self.client.post(SEAT_HOLD_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(
+            "Seat is held by another customer",
+            response.data["seats"][0]["non_field_errors"]
+        )
+
+    def test_hold_seat_with_expired_hold(self):
+        sample_hold(
+            flight=self.flight,
+            user=self.other_user,
+            expires_at=timezone.now() - datetime.timedelta(minutes=1)
+        )
+        payload = {"flight": self.flight.id, "seats": [{"row": 1, "seat": 1}]}
+
+        response = self.client.post(SEAT_HOLD_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(SeatHold.objects.get().user, self.user)
+
+    def test_hold_taken_seat(self):
+        Ticket.objects.create(
+            row=1,
+            seat=1,
+            flight=self.flight,
+            order=sample_order(self.other_user)
+        )
+        payload = {"flight": self.flight.id, "seats": [{"row": 1, "seat": 1}]}
+
+        response = self.client.post(SEAT_HOLD_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(
+            SEAT_TAKEN_MESSAGE,
+            response.data["seats"][0]["non_field_errors"]
+        )
+
+    def test_order_held_seat(self):
+        sample_hold(flight=self.flight, user=self.user)
+        payload = {
+            "tickets": [{"row": 1, "seat": 1, "flight": self.flight.id}]
+        }
+
+        response = self.client.post(ORDER_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_order_seat_held_by_other_user(self):
+        sample_hold(flight=self.flight, user=self.other_user)
+        payload = {
+            "tickets": [
+                {"row": 1, "seat": 2, "flight": self.flight.id},
+                {"row": 1, "seat": 1, "flight": self.flight.id},
+            ]
+        }
+
+        response = self.client.post(ORDER_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["tickets"][0], {})
+        self.assertIn(
+            "Seat is held by another customer",
+            response.data["tickets"][1]["non_field_errors"]
+        )
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_list_own_active_holds(self):
+        hold = sample_hold(flight=self.flight, user=self.user)
+        sample_hold(flight=self.flight, user=self.other_user, seat=2)
+        sample_hold(
+            flight=self.flight,
+            user=self.user,
+            seat=3,
+            expires_at=timezone.now() - datetime.timedelta(minutes=1)
+        )
+
+        response = self.client.get(SEAT_HOLD_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [hold_data["id"] for hold_data in response.data["results"]],
+            [hold.id]
+        )
+
+    def test_release_hold(self):
+        hold = sample_hold(flight=self.flight, user=self.user)
+
+        response = self.client.delete(detail_url(hold.id))
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_release_seat_holds_command(self):
+        hold = sample_hold(flight=self.flight, user=self.user)
+        for seat in range(2, 5):
+            sample_hold(
+                flight=self.flight,
+                user=self.other_user,
+                seat=seat,
+                expires_at=timezone.now() - datetime.timedelta(minutes=1)
+            )
+
+        call_command("release_seat_holds", batch_size=2, stdout=StringIO())
+
+        self.assertEqual(list(SeatHold.objects.all()), [hold])
@@ -0,0 +1,78 @@
+import logging
+import random
+import time
+from functools import wraps
+from typing import Callable
+
+from django.db import DatabaseError, connection
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+logger = logging.getLogger(__name__)
+
+# serialization_failure, deadlock_detected, unique_violation
+RETRYABLE_SQLSTATES = {"40001", "40P01", "23505"}
+RETRYABLE_SQLITE_ERRORS = ("database is locked", "UNIQUE constraint failed")
+
+
+class WriteConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = _(
+        "Request conflicted with concurrent orders, please try again"
+    )
+    default_code = "write_conflict"
+
+
+def is_write_conflict(error: DatabaseError) -> bool:
+    """Whether the error was caused by a concurrent transaction"""
+
+    cause = error.__cause__
+    sqlstate = getattr(cause, "sqlstate", None) or getattr(
+        cause, "pgcode", None
+    )
+    if sqlstate:
+        return sqlstate in RETRYABLE_SQLSTATES
+
+    return any(message in str(error) for message in RETRYABLE_SQLITE_ERRORS)
+
+
+def retry_on_conflict(max_retries: int = 3, delay: float = 0.05) -> Callable:
+    """Rerun a whole write when it loses a race to another transaction.
+
+    Every retry waits exponentially longer (with jitter), once retries are
+    exhausted WriteConflict (409) is raised. Nothing is retried inside an
+    outer atomic block because that transaction is already broken.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def inner(*args, **kwargs):
+            retry = 0
+            while True:
+                try:
+                    return func(*args, **kwargs)
+                except DatabaseError as error:
+                    if (
+                            not is_write_conflict(error)
+                            or connection.in_atomic_block
+                    ):
+                        raise
+
+                    if retry == max_retries:
+                        raise WriteConflict from error
+
+                    retry += 1
+                    logger.info(
+                        "Write conflict in %s, retry %s/%s: %s",
+                        func.__qualname__,
+                        retry,
+                        max_retries,
+                        error,
+                    )
+                    time.sleep(delay * 2 ** retry * random.uniform(0.5, 1))
+
+        return inner
+
+    return decorator
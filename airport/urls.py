@@ -9,6 +9,11 @@ from airport.views import (
     CrewViewSet,
     FlightViewSet,
     OrderViewSet,
+    SeatHoldViewSet,
+    OrderRequestViewSet,
+    ItineraryViewSet,
+    DistanceViewSet,
+    RouteWeeklyLoadViewSet,
 )
 
 
@@ -25,6 +30,19 @@ router.register("routes", RouteViewSet, basename="route")
 router.register("crew", CrewViewSet, basename="crew")
 router.register("flights", FlightViewSet, basename="flight")
 router.register("my_orders", OrderViewSet, basename="order")
+router.register("seat_holds", SeatHoldViewSet, basename="seat-hold")
+router.register(
+    "order_requests",
+    OrderRequestViewSet,
+    basename="order-request"
+)
+router.register("itineraries", ItineraryViewSet, basename="itinerary")
+router.register("distances", DistanceViewSet, basename="distance")
+router.register(
+    "route_loads",
+    RouteWeeklyLoadViewSet,
+    basename="route-load"
+)
 
 urlpatterns = [
     path("", include(router.urls))
@@ -5,6 +5,11 @@ from django.core.files.images import ImageFile
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
+from airport.seat_map import SeatMap
+
+
+SEAT_TAKEN_MESSAGE = _("The fields row, seat, flight must make a unique set.")
+
 
 def validate_file_size(file: ImageFile, error_to_raise: Callable):
     if file:
@@ -51,3 +56,18 @@ def validate_ticket(
                     )
                 }
             )
+
+
+def validate_seat_is_free(
+        row: int,
+        seat: int,
+        seat_map: SeatMap,
+        error_to_raise: Callable
+) -> None:
+    try:
+        taken = seat_map.is_taken(row, seat)
+    except IndexError:
+        return
+
+    if taken:
+        raise error_to_raise(SEAT_TAKEN_MESSAGE, code="unique")
@@ -0,0 +1,154 @@
+import hashlib
+import json
+from functools import wraps
+from typing import Callable, Iterable
+
+from django.db import models
+from django.db.models import F
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from airport.models import TableVersion
+
+
+def table_key(model: type[models.Model]) -> str:
+    return model._meta.label_lower
+
+
+def row_key(model: type[models.Model], pk) -> str:
+    return f"{table_key(model)}:{pk}"
+
+
+def bump_versions(keys: Iterable[str]) -> None:
+    """Give new versions to ``keys``, in the transaction of the change.
+
+    Keys seen for the first time are created, a key created concurrently
+    by another transaction is bumped once more, which only costs clients
+    one more full response.
+    """
+
+    keys = sorted(set(keys))
+    if not keys:
+        return
+
+    now = timezone.now()
+    versions = TableVersion.objects.filter(key__in=keys)
+    versions.update(version=F("version") + 1, modified_at=now)
+
+    missing = set(keys) - set(versions.values_list("key", flat=True))
+    if missing:
+        TableVersion.objects.bulk_create(
+            [
+                TableVersion(key=key, version=1, modified_at=now)
+                for key in sorted(missing)
+            ],
+            ignore_conflicts=True
+        )
+        TableVersion.objects.filter(key__in=missing).update(
+            version=F("version") + 1,
+            modified_at=now
+        )
+
+
+def bump_tables(*tables: type[models.Model]) -> None:
+    bump_versions(table_key(model) for model in tables)
+
+
+def bump_rows(model: type[models.Model], pks: Iterable) -> None:
+    bump_versions(
+        [table_key(model)] + [row_key(model, pk) for pk in pks]
+    )
+
+
+def table_versions(*tables: type[models.Model]) -> list[int]:
+    """Current versions of ``tables``, 0 for ones never changed"""
+
+    keys = [table_key(model) for model in tables]
+    versions = dict(
+        TableVersion.objects.filter(key__in=keys).values_list(
+            "key", "version"
+        )
+    )
+    return [versions.get(key, 0) for key in keys]
+
+
+def _validators(request: Request, keys: list[str]) -> tuple:
+    versions = {
+        key: (version, modified_at)
+        for key, version, modified_at in TableVersion.objects.filter(
+            key__in=keys
+        ).values_list("key", "version", "modified_at")
+    }
+
+    # the same versions give the same bytes for the same url and format
+    payload = json.dumps([
+        request.get_full_path(),
+        request.accepted_media_type,
+        [versions.get(key, (0, None))[0] for key in keys],
+    ])
+    etag = f'"{hashlib.sha256(payload.encode()).hexdigest()}"'
+
+    modified = [modified_at for _, modified_at in versions.values()]
+    last_modified = int(max(modified).timestamp()) if modified else None
+
+    return etag, last_modified
+
+
+def conditional_get(
+        *tables: type[models.Model],
+        row: bool = False
+) -> Callable:
+    """Strong ETag and Last-Modified of a viewset method from versions.
+
+    The response depends on versions of ``tables``, and of the requested
+    row of the viewset model if ``row``. They are read in one query before
+    the method runs, so a matching ``If-None-Match`` (or
+    ``If-Modified-Since``, with one second resolution) gets 304 without
+    any queryset or serializer work. Data changed after the read only
+    gets a newer body under the older ETag, which the next request
+    replaces.
+
+    Rows leave the viewset queryset without a change of their version,
+    e.g. flights once they depart, so with ``row`` a 304 is only sent
+    after a cheap check that the row is still in it.
+    """
+
+    def decorator(method: Callable) -> Callable:
+        @wraps(method)
+        def inner(view, request: Request, *args, **kwargs) -> Response:
+            keys = [table_key(model) for model in tables]
+            if row:
+                lookup = view.lookup_url_kwarg or view.lookup_field
+                keys.append(row_key(view.queryset.model, kwargs[lookup]))
+
+            etag, last_modified = _validators(request, keys)
+            response = get_conditional_response(
+                request,
+                etag=etag,
+                last_modified=last_modified
+            )
+            if response is not None and row:
+                listed = view.get_queryset().filter(
+                    **{view.lookup_field: kwargs[lookup]}
+                ).exists()
+                if not listed:
+                    response = None
+
+            if response is None:
+                response = method(view, request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+
+            response["ETag"] = etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified)
+
+            return response
+
+        return inner
+
+    return decorator
@@ -1,6 +1,9 @@
 import datetime
+from functools import cached_property
 
-from django.db.models import QuerySet, F, Count
+from django.db.models import Prefetch, QuerySet
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from rest_framework import viewsets, status, filters, mixins
 from rest_framework.decorators import action
 from rest_framework.generics import get_object_or_404
@@ -9,7 +12,12 @@ from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.serializers import ModelSerializer
 
-from airport.filters import FlightDateFilterBackend, RouteFilterBackend
+from airport.filters import (
+    AirportSearchFilter,
+    DocumentSearchFilter,
+    FlightDateFilterBackend,
+    RouteFilterBackend,
+)
 from airport.models import (
     AirplaneType,
     Airplane,
@@ -18,13 +26,28 @@ from airport.models import (
     Crew,
     Flight,
     Order,
+    OrderRequest,
+    RouteWeeklyLoad,
+    SeatHold,
 )
 from airport.ordering import MultipleOrdering
+from airport.pagination import KeysetPagination
 from airport.schemas import (
     flight_list_schema,
+    flight_detail_schema,
     airplane_list_schema,
     route_list_schema,
     order_list_schema,
+    order_detail_schema,
+    order_auto_assign_schema,
+    order_create_schema,
+    itinerary_list_schema,
+    distance_list_schema,
+    airport_autocomplete_schema,
+    route_calendar_schema,
+    route_load_list_schema,
+    export_schema,
+    FLIGHT_DATE_PARAMETERS,
 )
 from airport.serializers import (
     AirplaneTypeSerializer,
@@ -43,18 +66,57 @@ from airport.serializers import (
     OrderSerializer,
     OrderListSerializer,
     OrderDetailSerializer,
+    OrderAutoAssignSerializer,
     AirplaneImageSerializer,
+    SeatHoldSerializer,
+    SeatHoldCreateSerializer,
+    OrderRequestSerializer,
+    ItinerarySearchSerializer,
+    ItinerarySerializer,
+    DistanceSearchSerializer,
+    DistanceSerializer,
+    AirportAutocompleteQuerySerializer,
+    FareCalendarQuerySerializer,
+    FareCalendarSerializer,
+    RouteWeeklyLoadQuerySerializer,
+    RouteWeeklyLoadSerializer,
+    ExportQuerySerializer,
+    OrderNormalizedQuerySerializer,
+)
+from airport.idempotency import idempotent
+from airport.autocomplete import get_trie
+from airport.distances import get_distance_matrix
+from airport.exports import (
+    FLIGHT_CSV_COLUMNS,
+    ORDER_CSV_COLUMNS,
+    ExportContentNegotiation,
+    flight_csv_rows,
+    flight_export_items,
+    order_csv_rows,
+    order_export_items,
+    stream_export,
 )
+from airport.fare_calendar import get_fare_calendar
+from airport.flight_list import (
+    FLIGHT_LIST_FIELDS,
+    flight_list_data,
+    flight_list_values,
+)
+from airport.itineraries import find_itineraries
+from airport.order_queue import enqueue_order
+from airport.sparse_fields import SparseFieldsMixin
+from airport.transactions import retry_on_conflict
+from airport.versions import conditional_get
 
 
-class AirplaneTypeViewSet(viewsets.ModelViewSet):
+class AirplaneTypeViewSet(SparseFieldsMixin, viewsets.ModelViewSet):
     queryset = AirplaneType.objects.all()
     serializer_class = AirplaneTypeSerializer
     filter_backends = [filters.SearchFilter]
     search_fields = ["name"]
 
 
-class AirplaneViewSet(viewsets.ModelViewSet):
+class AirplaneViewSet(SparseFieldsMixin, viewsets.ModelViewSet):
     queryset = Airplane.objects.select_related("airplane_type")
     serializer_class = AirplaneSerializer
     filter_backends = [filters.SearchFilter]
@@ -65,7 +127,7 @@ class AirplaneViewSet(viewsets.ModelViewSet):
         queryset = self.queryset
 
         if self.action in ("list", "retrieve"):
-            queryset = queryset.prefetch_related("flights")
+            queryset = self.select_requested(queryset)
 
             if self.action == "list":
                 queryset = MultipleOrdering.perform_ordering(
@@ -88,9 +150,14 @@ class AirplaneViewSet(viewsets.ModelViewSet):
         return serializer
 
     @airplane_list_schema()
+    @conditional_get(Airplane, AirplaneType, Flight)
     def list(self, request: Request, *args, **kwargs) -> Response:
         return super().list(request, *args, **kwargs)
 
+    @conditional_get(Airplane, AirplaneType, Flight)
+    def retrieve(self, request: Request, *args, **kwargs) -> Response:
+        return super().retrieve(request, *args, **kwargs)
+
     @action(
         methods=["POST"],
         detail=True,
@@ -116,19 +183,20 @@ class AirplaneViewSet(viewsets.ModelViewSet):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class AirportViewSet(viewsets.ModelViewSet):
+class AirportViewSet(SparseFieldsMixin, viewsets.ModelViewSet):
     queryset = Airport.objects.all()
     serializer_class = AirportSerializer
-    filter_backends = [filters.SearchFilter]
+    filter_backends = [AirportSearchFilter]
     search_fields = ["name", "closest_big_city", ]
+    field_prefetch_related = {
+        "depart_for": ("routes_from__destination",),
+        "accepts_from": ("routes_to__source",),
+    }
 
     def get_queryset(self) -> QuerySet[Airport]:
         queryset = self.queryset
         if self.action == "retrieve":
-            queryset = queryset.prefetch_related(
-                "routes_from__destination",
-                "routes_to__source",
-            )
+            queryset = self.select_requested(queryset)
 
         return queryset
 
@@ -140,23 +208,51 @@ class AirportViewSet(viewsets.ModelViewSet):
 
         return serializer
 
+    @conditional_get(Airport)
+    def list(self, request: Request, *args, **kwargs) -> Response:
+        return super().list(request, *args, **kwargs)
+
+    @conditional_get(Airport, Route)
+    def retrieve(self, request: Request, *args, **kwargs) -> Response:
+        return super().retrieve(request, *args, **kwargs)
+
+    @airport_autocomplete_schema()
+    @action(methods=["GET"], detail=False, url_path="autocomplete")
+    def autocomplete(self, request: Request) -> Response:
+        """Airports with name or city words starting with the query"""
+
+        query = AirportAutocompleteQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        suggestions = get_trie().search(
+            query.validated_data["q"],
+            limit=query.validated_data["limit"]
+        )
+        # suggestions are plain values already, skipping the serializer
+        # keeps every keystroke request cheap
+        return Response([suggestion.as_dict() for suggestion in suggestions])
+
 
-class RouteViewSet(viewsets.ModelViewSet):
+class RouteViewSet(SparseFieldsMixin, viewsets.ModelViewSet):
     queryset = Route.objects.all()
     serializer_class = RouteSerializer
-    filter_backends = [RouteFilterBackend, filters.SearchFilter]
+    filter_backends = [RouteFilterBackend, AirportSearchFilter]
     search_fields = [
         "source__name",
         "destination__name",
         "source__closest_big_city",
         "destination__closest_big_city",
     ]
+    field_select_related = {
+        "source": ("source",),
+        "destination": ("destination",),
+    }
 
     def get_queryset(self) -> QuerySet[Flight]:
         queryset = self.queryset
 
         if self.action in ("list", "retrieve"):
-            queryset = queryset.select_related("source", "destination")
+            queryset = self.select_requested(queryset)
 
         return queryset
 
@@ -171,54 +267,79 @@ class RouteViewSet(viewsets.ModelViewSet):
         return serializer
 
     @route_list_schema()
+    @conditional_get(Route, Airport)
     def list(self, request: Request, *args, **kwargs) -> Response:
         return super().list(request, *args, **kwargs)
 
+    @conditional_get(Route, Airport)
+    def retrieve(self, request: Request, *args, **kwargs) -> Response:
+        return super().retrieve(request, *args, **kwargs)
+
+    @route_calendar_schema()
+    @action(methods=["GET"], detail=True, url_path="calendar")
+    def calendar(self, request: Request, pk: int = None) -> Response:
+        """Flights and available seats per departure day of a month"""
+
+        query = FareCalendarQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        month = query.validated_data["month"]
+        route = self.get_object()
+
+        return Response(
+            FareCalendarSerializer({
+                "route": route.id,
+                "month": month,
+                "days": get_fare_calendar(route.id, month),
+            }).data
+        )
+
 
-class CrewViewSet(viewsets.ModelViewSet):
+class CrewViewSet(SparseFieldsMixin, viewsets.ModelViewSet):
     queryset = Crew.objects.all()
     serializer_class = CrewSerializer
     filter_backends = [filters.SearchFilter]
     search_fields = ["last_name", "first_name"]
 
 
-class FlightViewSet(viewsets.ModelViewSet):
+class FlightViewSet(SparseFieldsMixin, viewsets.ModelViewSet):
     queryset = Flight.objects.all()
     serializer_class = FlightSerializer
-    filter_backends = [filters.SearchFilter, FlightDateFilterBackend]
-    search_fields = [
-        "route__source__name",
-        "route__source__closest_big_city",
-        "route__destination__name",
-        "route__destination__closest_big_city",
-        "airplane__name",
-    ]
+    filter_backends = [DocumentSearchFilter, FlightDateFilterBackend]
+    pagination_class = KeysetPagination
+    # flights are the same for every user and counting them is the
+    # slowest part of a page
+    count_strategy = "cached"
+    count_cache_per_user = False
+    # built from airports of the route and the airplane name
+    search_fields = ["search_document"]
     ordering_fields = ["airplane__name", "departure_time", "arrival_time"]
+    # the list reads its columns with values(), see flight_list_values
+    field_select_related = {
+        "route": ("route",),
+        "route.source": ("route__source",),
+        "route.destination": ("route__destination",),
+        "airplane": ("airplane",),
+        "airplane.airplane_type": ("airplane__airplane_type",),
+        "taken_places": ("airplane",),
+        "seat_map": ("airplane",),
+    }
+    field_prefetch_related = {
+        "crew": (Prefetch("crew", queryset=Crew.objects.order_by("id")),),
+    }
 
     def get_queryset(self):
         queryset = self.queryset.filter(
             departure_time__gte=datetime.datetime.now(datetime.UTC)
         )
 
-        if self.action in ("list", "retrieve"):
-            queryset = queryset.select_related(
-                "airplane__airplane_type",
-                "route__source",
-                "route__destination",
-            ).prefetch_related("crew")
-            if self.action == "list":
-                queryset = queryset.annotate(
-                    tickets_available=(
-                            F("airplane__rows") *
-                            F("airplane__seats_in_row") - Count("tickets")
-                    )
-                ).order_by("id")
-
-                queryset = MultipleOrdering.perform_ordering(
-                    request=self.request,
-                    ordering_fields=self.ordering_fields,
-                    queryset=queryset,
-                )
+        if self.action == "retrieve":
+            queryset = self.select_requested(queryset)
+        elif self.action == "list":
+            queryset = MultipleOrdering.perform_ordering(
+                request=self.request,
+                ordering_fields=self.ordering_fields,
+                queryset=queryset.order_by("id"),
+            )
 
         return queryset
 
@@ -234,10 +355,54 @@ class FlightViewSet(viewsets.ModelViewSet):
 
     @flight_list_schema()
     def list(self, request: Request, *args, **kwargs) -> Response:
-        return super().list(request, *args, **kwargs)
+        # FlightListSerializer output without building model instances
+        fields = [
+            field for field in FLIGHT_LIST_FIELDS
+            if self.field_selection.includes(field)
+        ]
+        queryset = flight_list_values(
+            self.filter_queryset(self.get_queryset()),
+            fields
+        )
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(
+                flight_list_data(page, fields)
+            )
+
+        return Response(flight_list_data(queryset, fields))
+
+    @flight_detail_schema()
+    @conditional_get(Route, Airport, Airplane, AirplaneType, Crew, row=True)
+    def retrieve(self, request: Request, *args, **kwargs) -> Response:
+        return super().retrieve(request, *args, **kwargs)
+
+    @export_schema(FLIGHT_DATE_PARAMETERS)
+    @action(
+        methods=["GET"],
+        detail=False,
+        content_negotiation_class=ExportContentNegotiation
+    )
+    def export(self, request: Request) -> StreamingHttpResponse:
+        """All upcoming flights matching the filters, streamed"""
+
+        query = ExportQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        queryset = self.filter_queryset(self.get_queryset())
+
+        return stream_export(
+            request,
+            "flights",
+            query.validated_data["file_format"],
+            flight_export_items(queryset.order_by("departure_time", "id")),
+            FLIGHT_CSV_COLUMNS,
+            flight_csv_rows,
+        )
 
 
 class OrderViewSet(
+    SparseFieldsMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
@@ -246,6 +411,7 @@ class OrderViewSet(
     queryset = Order.objects.all()
     serializer_class = OrderSerializer
     permission_classes = (IsAuthenticated,)
+    pagination_class = KeysetPagination
     filter_backends = [filters.SearchFilter]
     search_fields = [
         "tickets__flight__route__source__name",
@@ -253,23 +419,91 @@ class OrderViewSet(
         "tickets__flight__route__destination__name",
         "tickets__flight__route__destination__closest_big_city",
     ]
+    # paths of OrderListSerializer and OrderDetailSerializer
+    field_prefetch_related = {
+        "tickets": ("tickets",),
+        "tickets.flight": ("tickets__flight",),
+        "tickets.flight.route": ("tickets__flight__route",),
+        "tickets.flight.route.source": ("tickets__flight__route__source",),
+        "tickets.flight.route.destination": (
+            "tickets__flight__route__destination",
+        ),
+        "tickets.flight.out_of": ("tickets__flight__route__source",),
+        "tickets.flight.to": ("tickets__flight__route__destination",),
+        "tickets.flight.airplane": ("tickets__flight__airplane",),
+        "tickets.flight.airplane.airplane_type": (
+            "tickets__flight__airplane__airplane_type",
+        ),
+        "tickets.flight.airplane_name": ("tickets__flight__airplane",),
+        "tickets.flight.airplane_type": (
+            "tickets__flight__airplane__airplane_type",
+        ),
+        "tickets.flight.taken_places": ("tickets__flight__airplane",),
+        "tickets.flight.crew": ("tickets__flight__crew",),
+    }
 
     def get_queryset(self) -> QuerySet[Order]:
+        if self.action == "export":
+            return self.queryset.order_by("id")
+
         queryset = self.queryset.filter(user=self.request.user)
 
         if self.action in ("retrieve", "list"):
-            queryset = queryset.prefetch_related(
-                "tickets__flight__route__source",
-                "tickets__flight__route__destination",
-                "tickets__flight__crew",
-                "tickets__flight__airplane__airplane_type",
-            )
+            queryset = self.select_requested(queryset)
 
         return queryset
 
     def perform_create(self, serializer) -> None:
         serializer.save(user=self.request.user)
 
+    @order_create_schema()
+    @idempotent
+    @retry_on_conflict()
+    def create(self, request: Request, *args, **kwargs) -> Response:
+        if "respond-async" in request.headers.get("Prefer", ""):
+            return self.enqueue(request)
+
+        return super().create(request, *args, **kwargs)
+
+    @export_schema()
+    @action(
+        methods=["GET"],
+        detail=False,
+        permission_classes=(IsAdminUser,),
+        content_negotiation_class=ExportContentNegotiation
+    )
+    def export(self, request: Request) -> StreamingHttpResponse:
+        """Orders of all users with their tickets, streamed, staff only"""
+
+        query = ExportQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        return stream_export(
+            request,
+            "orders",
+            query.validated_data["file_format"],
+            order_export_items(self.get_queryset()),
+            ORDER_CSV_COLUMNS,
+            order_csv_rows,
+        )
+
+    def enqueue(self, request: Request) -> Response:
+        """Validate the order and leave its creation to process_orders"""
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        order_request = enqueue_order(request.user, serializer.initial_data)
+
+        data = OrderRequestSerializer(
+            order_request,
+            context=self.get_serializer_context()
+        ).data
+        return Response(
+            data,
+            status=status.HTTP_202_ACCEPTED,
+            headers={"Location": data["status_url"]}
+        )
+
     def get_serializer_class(self) -> ModelSerializer:
         serializer = self.serializer_class
 
@@ -277,9 +511,220 @@ class OrderViewSet(
             serializer = OrderListSerializer
         elif self.action == "retrieve":
             serializer = OrderDetailSerializer
+        elif self.action == "auto_assign":
+            serializer = OrderAutoAssignSerializer
 
         return serializer
 
+    @cached_property
+    def normalized(self) -> bool:
+        query = OrderNormalizedQuerySerializer(data=self.request.query_params)
+        query.is_valid(raise_exception=True)
+        return query.validated_data["normalized"]
+
+    def get_normalized_data(self, orders: list[Order]) -> tuple:
+        """Orders with flight ids in tickets, and the flights once each.
+
+        Flights are rendered by the serializer nested in tickets otherwise,
+        ``fields`` / ``exclude`` paths under ``tickets.flight`` apply to
+        them. Tickets share the prefetched flight instances already.
+        """
+
+        context = self.get_serializer_context()
+        selection = self.field_selection
+        serializer = OrderSerializer(orders, many=True, context=context)
+        if selection:
+            selection.prune(serializer)
+
+        flight_path = ("tickets", "flight")
+        if not selection.includes(flight_path):
+            return serializer.data, None
+
+        flights = {
+            ticket.flight_id: ticket.flight
+            for order in orders
+            for ticket in order.tickets.all()
+        }
+        flight_ids = sorted(flights)
+        flight_serializer_class = FlightListSerializer
+        if self.action == "retrieve":
+            flight_serializer_class = FlightDetailSerializer
+
+        flight_serializer = flight_serializer_class(
+            [flights[flight_id] for flight_id in flight_ids],
+            many=True,
+            context=context
+        )
+        flight_selection = selection.nested(flight_path)
+        if flight_selection:
+            flight_selection.prune(flight_serializer)
+
+        return serializer.data, dict(
+            zip(map(str, flight_ids), flight_serializer.data)
+        )
+
     @order_list_schema()
+    def list(self, request: Request, *args, **kwargs) -> Response:
+        if not self.normalized:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        orders, flights = self.get_normalized_data(
+            list(queryset if page is None else page)
+        )
+
+        if page is None:
+            response = Response({"results": orders})
+        else:
+            response = self.get_paginated_response(orders)
+        if flights is not None:
+            response.data["flights"] = flights
+
+        return response
+
+    @order_detail_schema()
+    def retrieve(self, request: Request, *args, **kwargs) -> Response:
+        if not self.normalized:
+            return super().retrieve(request, *args, **kwargs)
+
+        [order], flights = self.get_normalized_data([self.get_object()])
+        if flights is not None:
+            order["flights"] = flights
+
+        return Response(order)
+
+    @order_auto_assign_schema()
+    @action(methods=["POST"], detail=False, url_path="auto_assign")
+    @idempotent
+    @retry_on_conflict()
+    def auto_assign(self, request: Request) -> Response:
+        """Order requested number of best available seats on a flight"""
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        order = serializer.save(user=request.user)
+        return Response(
+            OrderSerializer(order, context=self.get_serializer_context()).data,
+            status=status.HTTP_201_CREATED
+        )
+
+
+class SeatHoldViewSet(
+    mixins.ListModelMixin,
+    mixins.CreateModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet
+):
+    queryset = SeatHold.objects.all()
+    serializer_class = SeatHoldSerializer
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self) -> QuerySet[SeatHold]:
+        return self.queryset.filter(
+            user=self.request.user,
+            expires_at__gt=timezone.now()
+        ).order_by("expires_at")
+
+    def perform_create(self, serializer) -> None:
+        serializer.save(user=self.request.user)
+
+    def get_serializer_class(self) -> ModelSerializer:
+        serializer = self.serializer_class
+
+        if self.action == "create":
+            serializer = SeatHoldCreateSerializer
+
+        return serializer
+
+
+class OrderRequestViewSet(
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet
+):
+    queryset = OrderRequest.objects.all()
+    serializer_class = OrderRequestSerializer
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self) -> QuerySet[OrderRequest]:
+        return self.queryset.filter(user=self.request.user)
+
+
+class RouteWeeklyLoadViewSet(
+    mixins.ListModelMixin,
+    viewsets.GenericViewSet
+):
+    """Load factor of routes per week, read from the summary table only"""
+
+    queryset = RouteWeeklyLoad.objects.all()
+    serializer_class = RouteWeeklyLoadSerializer
+    permission_classes = (IsAdminUser,)
+
+    def get_queryset(self) -> QuerySet[RouteWeeklyLoad]:
+        query = RouteWeeklyLoadQuerySerializer(data=self.request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+
+        queryset = self.queryset
+        if "route" in params:
+            queryset = queryset.filter(route_id=params["route"])
+        if "week_from" in params:
+            queryset = queryset.filter(week__gte=params["week_from"])
+        if "week_to" in params:
+            queryset = queryset.filter(week__lte=params["week_to"])
+
+        return queryset
+
+    @route_load_list_schema()
     def list(self, request: Request, *args, **kwargs) -> Response:
         return super().list(request, *args, **kwargs)
+
+
+class ItineraryViewSet(viewsets.GenericViewSet):
+    serializer_class = ItinerarySerializer
+    pagination_class = None
+
+    @itinerary_list_schema()
+    def list(self, request: Request) -> Response:
+        """Direct and connecting flights from source to destination airport"""
+
+        search = ItinerarySearchSerializer(data=request.query_params)
+        search.is_valid(raise_exception=True)
+        params = search.validated_data
+
+        itineraries = find_itineraries(
+            params["source"],
+            params["destination"],
+            params["date"],
+            max_stops=params["max_stops"],
+            min_layover=datetime.timedelta(minutes=params["min_layover"]),
+            max_layover=datetime.timedelta(minutes=params["max_layover"]),
+            limit=params["limit"],
+        )
+        return Response(self.get_serializer(itineraries, many=True).data)
+
+
+class DistanceViewSet(viewsets.GenericViewSet):
+    serializer_class = DistanceSerializer
+    pagination_class = None
+
+    @distance_list_schema()
+    def list(self, request: Request) -> Response:
+        """Shortest distance between airports over the route network"""
+
+        search = DistanceSearchSerializer(data=request.query_params)
+        search.is_valid(raise_exception=True)
+        source = search.validated_data["source"]
+        destination = search.validated_data["destination"]
+
+        distance = get_distance_matrix().distance(source, destination)
+        return Response(
+            self.get_serializer(
+                {
+                    "source": source,
+                    "destination": destination,
+                    "distance": distance,
+                }
+            ).data
+        )
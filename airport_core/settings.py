@@ -185,6 +185,17 @@ REST_FRAMEWORK = {
         "user": "2000/day"
     },
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_RENDERER_CLASSES": [
+        "airport.json_renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+        "airport.msgpack_renderers.MessagePackRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "airport.json_renderers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+        "airport.msgpack_renderers.MessagePackParser",
+    ],
 }
 
 SIMPLE_JWT = {
@@ -194,3 +205,40 @@ SIMPLE_JWT = {
 
     "ALGORITHM": "HS512",
 }
+
+# Seat holds
+
+SEAT_HOLD_TTL = timedelta(minutes=10)
+
+# Idempotency keys
+
+IDEMPOTENCY_KEY_TTL = timedelta(hours=24)
+# a key left pending longer, by a crashed worker, can be claimed again
+IDEMPOTENCY_KEY_LOCK_TIMEOUT = timedelta(minutes=1)
+
+# Order queue
+
+ORDER_QUEUE_CLAIM_TIMEOUT = timedelta(minutes=5)
+
+# Itinerary search
+
+ITINERARY_INDEX_TTL = timedelta(minutes=15)
+ITINERARY_MIN_LAYOVER = timedelta(minutes=45)
+ITINERARY_MAX_LAYOVER = timedelta(hours=12)
+
+# Airport distances
+
+DISTANCE_MATRIX_PATH = BASE_DIR / "distance_matrix.npz"
+
+# Tests
+
+# writes files of the run, like the distance matrix, to a temporary directory
+TEST_RUNNER = "airport_core.test_runner.TestRunner"
+
+# Fare calendar
+
+FARE_CALENDAR_CACHE_TIMEOUT = timedelta(hours=1)
+
+# Pagination
+
+PAGINATION_COUNT_CACHE_TIMEOUT = timedelta(minutes=5)
@@ -0,0 +1,26 @@
+import tempfile
+from pathlib import Path
+
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """Runner which keeps files written by tests out of the project"""
+
+    def setup_test_environment(self, **kwargs) -> None:
+        super().setup_test_environment(**kwargs)
+
+        self.files_directory = tempfile.TemporaryDirectory()
+        self.files_settings = override_settings(
+            DISTANCE_MATRIX_PATH=(
+                Path(self.files_directory.name) / "distance_matrix.npz"
+            )
+        )
+        self.files_settings.enable()
+
+    def teardown_test_environment(self, **kwargs) -> None:
+        self.files_settings.disable()
+        self.files_directory.cleanup()
+
+        super().teardown_test_environment(**kwargs)
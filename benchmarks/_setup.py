@@ -0,0 +1,46 @@
+"""Django bootstrap shared by the benchmark scripts.
+
+Benchmarks run against a throwaway test database, so they can be started
+with ``python -m benchmarks.<name>`` from the project root without touching
+the development database.
+"""
+import os
+from contextlib import contextmanager
+from typing import Iterator
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "airport_core.settings")
+os.environ.setdefault("DJANGO_SECRET", "benchmark")
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+
+@contextmanager
+def benchmark_database() -> Iterator[None]:
+    """Create the test database for a benchmark and drop it afterwards.
+
+    SQLite gets a file instead of the default in-memory database, so that
+    threads of concurrent benchmarks see the same data.
+    """
+
+    database = settings.DATABASES["default"]
+    if database["ENGINE"] == "django.db.backends.sqlite3":
+        database["TEST"]["NAME"] = str(
+            settings.BASE_DIR / "benchmark.sqlite3"
+        )
+
+    setup_test_environment()
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity=0)
+        teardown_test_environment()
@@ -0,0 +1,105 @@
+"""Airport search latency: indexed search against ``icontains`` scans.
+
+Run from the project root::
+
+    python -m benchmarks.bench_airport_search --airports 100000
+"""
+import argparse
+import random
+import statistics
+import string
+import time
+from typing import Callable
+
+from benchmarks._setup import benchmark_database
+
+from django.db.models import Q, QuerySet  # noqa: E402
+
+from airport.models import Airport, Route  # noqa: E402
+from airport.search import airport_search_q  # noqa: E402
+
+
+def random_word() -> str:
+    return "".join(
+        random.choices(string.ascii_lowercase, k=random.randint(5, 10))
+    ).capitalize()
+
+
+def create_airports(airports: int) -> list[str]:
+    cities = [random_word() for _ in range(airports // 20)]
+    Airport.objects.bulk_create(
+        (
+            Airport(
+                name=f"{random_word()} {random_word()}",
+                closest_big_city=random.choice(cities),
+            )
+            for _ in range(airports)
+        ),
+        batch_size=2000,
+    )
+    airport_ids = list(Airport.objects.values_list("id", flat=True))
+    Route.objects.bulk_create(
+        (
+            Route(source_id=source, destination_id=destination, distance=100)
+            for source, destination in {
+                tuple(random.sample(airport_ids, 2)) for _ in range(airports)
+            }
+        ),
+        batch_size=2000,
+    )
+    return cities
+
+
+def measure(search: Callable[[str], QuerySet], terms: list[str]) -> list:
+    timings = []
+    for term in terms:
+        started = time.perf_counter()
+        list(search(term)[:20])
+        timings.append((time.perf_counter() - started) * 1000)
+
+    return sorted(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--airports", type=int, default=100_000)
+    parser.add_argument("--searches", type=int, default=100)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        cities = create_airports(args.airports)
+        terms = [
+            city[start:start + 4].lower()
+            for city in random.sample(cities, args.searches)
+            for start in [random.randint(0, len(city) - 4)]
+        ]
+
+        searches = {
+            "airports, icontains": lambda term: Airport.objects.filter(
+                Q(name__icontains=term) | Q(closest_big_city__icontains=term)
+            ).order_by("id"),
+            "airports, indexed": lambda term: Airport.objects.filter(
+                airport_search_q("name", term)
+                | airport_search_q("closest_big_city", term)
+            ).order_by("id"),
+            "routes s_city, icontains": lambda term: Route.objects.filter(
+                source__closest_big_city__icontains=term
+            ).order_by("id"),
+            "routes s_city, indexed": lambda term: Route.objects.filter(
+                airport_search_q("closest_big_city", term, "source__")
+            ).order_by("id"),
+        }
+        results = {
+            name: measure(search, terms) for name, search in searches.items()
+        }
+
+    print(f"airports: {args.airports}, searches: {args.searches}")
+    for name, timings in results.items():
+        print(
+            f"{name:<26} median {statistics.median(timings):7.2f}ms  "
+            f"p95 {timings[int(len(timings) * 0.95)]:7.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
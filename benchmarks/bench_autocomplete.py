@@ -0,0 +1,81 @@
+"""Airport autocomplete latency of the trie and of the whole request.
+
+Run from the project root::
+
+    DJANGO_DEBUG=False python -m benchmarks.bench_autocomplete --airports 20000
+
+Keep ``DJANGO_DEBUG=False`` for request timings, the debug toolbar alone
+takes tens of milliseconds per request.
+"""
+import argparse
+import random
+import statistics
+import time
+
+from benchmarks._setup import benchmark_database
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+from airport.autocomplete import AirportTrie  # noqa: E402
+from airport.models import Airport  # noqa: E402
+from benchmarks.bench_airport_search import create_airports  # noqa: E402
+
+
+def percentiles(timings: list[float]) -> str:
+    timings = sorted(timings)
+    return (
+        f"p50 {statistics.median(timings):6.3f}ms  "
+        f"p99 {timings[int(len(timings) * 0.99)]:6.3f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--airports", type=int, default=20_000)
+    parser.add_argument("--searches", type=int, default=2000)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        create_airports(args.airports)
+        names = list(Airport.objects.values_list("name", flat=True))
+        queries = [
+            name[:random.randint(1, 8)]
+            for name in random.choices(names, k=args.searches)
+        ]
+
+        started = time.perf_counter()
+        trie = AirportTrie.build()
+        build_time = time.perf_counter() - started
+
+        trie_timings = []
+        for query in queries:
+            started = time.perf_counter()
+            trie.search(query)
+            trie_timings.append((time.perf_counter() - started) * 1000)
+
+        client = APIClient(SERVER_NAME="localhost")
+        client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="bench@mail.co",
+                password="12R445%3df"
+            )
+        )
+        url = reverse("airport:airport-autocomplete")
+        client.get(url, {"q": "a"})
+
+        request_timings = []
+        for query in queries[:1000]:
+            started = time.perf_counter()
+            client.get(url, {"q": query})
+            request_timings.append((time.perf_counter() - started) * 1000)
+
+    print(f"airports:     {args.airports}")
+    print(f"trie build:   {build_time:.2f}s")
+    print(f"trie search:  {percentiles(trie_timings)}")
+    print(f"request:      {percentiles(request_timings)}")
+
+
+if __name__ == "__main__":
+    main()
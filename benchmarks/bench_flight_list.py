@@ -0,0 +1,147 @@
+"""Flight list serialization time: FlightListSerializer against values rows.
+
+Run from the project root::
+
+    python -m benchmarks.bench_flight_list --flights 5000
+
+Both ways read the same flights in pages of 1000, timings include the
+queries and are per page.
+"""
+import argparse
+import datetime
+import statistics
+import time
+from typing import Callable
+
+from benchmarks._setup import benchmark_database
+
+from django.db.models import Prefetch  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from airport.flight_list import (  # noqa: E402
+    flight_list_data,
+    flight_list_values,
+)
+from airport.models import (  # noqa: E402
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Flight,
+    Route,
+)
+from airport.serializers import FlightListSerializer  # noqa: E402
+
+
+PAGE_SIZE = 1000
+
+
+def create_flights(flights: int) -> None:
+    airports = Airport.objects.bulk_create(
+        Airport(name=f"Airport {number}", closest_big_city=f"City {number}")
+        for number in range(20)
+    )
+    routes = Route.objects.bulk_create(
+        Route(source=source, destination=destination, distance=100)
+        for source in airports
+        for destination in airports
+        if source != destination
+    )
+    airplane_type = AirplaneType.objects.create(name="Narrow body")
+    airplanes = Airplane.objects.bulk_create(
+        Airplane(
+            name=f"Airplane {number}",
+            rows=30,
+            seats_in_row=6,
+            airplane_type=airplane_type,
+        )
+        for number in range(50)
+    )
+    crew = Crew.objects.bulk_create(
+        Crew(first_name=f"First {number}", last_name=f"Last {number}")
+        for number in range(200)
+    )
+
+    start = timezone.now() + datetime.timedelta(days=1)
+    created = Flight.objects.bulk_create(
+        (
+            Flight(
+                route=routes[number % len(routes)],
+                airplane=airplanes[number % len(airplanes)],
+                departure_time=start + datetime.timedelta(hours=number),
+                arrival_time=start + datetime.timedelta(hours=number + 2),
+                seats_available=180,
+            )
+            for number in range(flights)
+        ),
+        batch_size=2000,
+    )
+    Flight.crew.through.objects.bulk_create(
+        (
+            Flight.crew.through(
+                flight_id=flight.id,
+                crew_id=crew[(number + member) % len(crew)].id
+            )
+            for number, flight in enumerate(created)
+            for member in range(4)
+        ),
+        batch_size=2000,
+    )
+
+
+def serializer_page(offset: int) -> list:
+    flights = Flight.objects.select_related(
+        "airplane__airplane_type",
+        "route__source",
+        "route__destination",
+    ).prefetch_related(
+        Prefetch("crew", queryset=Crew.objects.order_by("id"))
+    ).order_by("id")[offset:offset + PAGE_SIZE]
+    return FlightListSerializer(flights, many=True).data
+
+
+def values_page(offset: int) -> list:
+    rows = flight_list_values(
+        Flight.objects.order_by("id")
+    )[offset:offset + PAGE_SIZE]
+    return flight_list_data(rows)
+
+
+def measure(page: Callable[[int], list], flights: int) -> list[float]:
+    timings = []
+    for offset in range(0, flights, PAGE_SIZE):
+        started = time.perf_counter()
+        page(offset)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--flights", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        create_flights(args.flights)
+
+        if serializer_page(0) != values_page(0):
+            raise SystemExit("values rows differ from FlightListSerializer")
+
+        for name, page in (
+                ("FlightListSerializer", serializer_page),
+                ("values rows", values_page),
+        ):
+            timings = []
+            for _ in range(args.rounds):
+                timings += measure(page, args.flights)
+
+            print(
+                f"{name:22} median {statistics.median(timings):8.1f}ms"
+                f"  max {max(timings):8.1f}ms  per {PAGE_SIZE} rows"
+            )
+
+
+if __name__ == "__main__":
+    main()
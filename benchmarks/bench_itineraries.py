@@ -0,0 +1,107 @@
+"""Itinerary search latency on a generated route network.
+
+Run from the project root::
+
+    python -m benchmarks.bench_itineraries --airports 300 --flights 30
+"""
+import argparse
+import datetime
+import random
+import statistics
+import time
+from itertools import islice
+
+from benchmarks._setup import benchmark_database
+
+from django.utils import timezone  # noqa: E402
+
+from airport.itineraries import ItineraryIndex  # noqa: E402
+from airport.models import Airport, Flight, Route  # noqa: E402
+from airport.tests.test_airplane_api import sample_airplane  # noqa: E402
+
+
+def create_network(airports: int, routes: int, flights: int) -> None:
+    Airport.objects.bulk_create(
+        Airport(name=f"Airport {number}", closest_big_city="City")
+        for number in range(airports)
+    )
+    airport_ids = list(Airport.objects.values_list("id", flat=True))
+    pairs = {
+        tuple(random.sample(airport_ids, 2))
+        for _ in range(airports * routes)
+    }
+    Route.objects.bulk_create(
+        Route(source_id=source, destination_id=destination, distance=500)
+        for source, destination in pairs
+    )
+
+    airplane = sample_airplane()
+    start = timezone.make_aware(datetime.datetime(2026, 12, 5))
+    Flight.objects.bulk_create(
+        (
+            Flight(
+                route_id=route_id,
+                airplane=airplane,
+                departure_time=departure_time,
+                arrival_time=departure_time + datetime.timedelta(
+                    minutes=random.randint(60, 300)
+                ),
+                seats_available=airplane.capacity,
+            )
+            for route_id in Route.objects.values_list("id", flat=True)
+            for departure_time in (
+                start + datetime.timedelta(minutes=random.randint(0, 2880))
+                for _ in range(flights)
+            )
+        ),
+        batch_size=1000,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--airports", type=int, default=300)
+    parser.add_argument("--routes", type=int, default=8, help="per airport")
+    parser.add_argument("--flights", type=int, default=30, help="per route")
+    parser.add_argument("--searches", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        create_network(args.airports, args.routes, args.flights)
+
+        started = time.perf_counter()
+        index = ItineraryIndex.build()
+        build_time = time.perf_counter() - started
+
+        airport_ids = list(Airport.objects.values_list("id", flat=True))
+        start = timezone.make_aware(datetime.datetime(2026, 12, 5))
+        timings = []
+        found = 0
+        for _ in range(args.searches):
+            source, destination = random.sample(airport_ids, 2)
+            started = time.perf_counter()
+            found += len(list(islice(
+                index.search(
+                    source,
+                    destination,
+                    start,
+                    start + datetime.timedelta(days=1),
+                    min_layover=datetime.timedelta(minutes=45),
+                    max_layover=datetime.timedelta(hours=12),
+                ),
+                args.limit
+            )))
+            timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    print(f"routes:         {len(index.route_ends)}")
+    print(f"flights:        {len(index.flight_routes)}")
+    print(f"index build:    {build_time:.2f}s")
+    print(f"itineraries:    {found / args.searches:.1f} per search")
+    print(f"search median:  {statistics.median(timings):.2f}ms")
+    print(f"search p95:     {timings[int(len(timings) * 0.95)]:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
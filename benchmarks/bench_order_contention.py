@@ -0,0 +1,122 @@
+"""Concurrent order creation: throughput and conflict rate.
+
+Every worker thread places orders for random seats on a couple of random
+flights out of a small pool, so orders regularly race for the same flights
+and seats. Run from the project root::
+
+    python -m benchmarks.bench_order_contention --threads 8 --orders 50
+"""
+import argparse
+import logging
+import random
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks._setup import benchmark_database
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+from airport.tests.test_order_api import ORDER_URL, sample_flight  # noqa
+
+
+class RetryCounter(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.INFO)
+        self.retries = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # handle() already holds the handler lock here
+        self.retries += 1
+
+
+def place_orders(
+        worker: int,
+        flights: list,
+        orders: int,
+        tickets: int
+) -> Counter:
+    statuses = Counter()
+    client = APIClient(SERVER_NAME="localhost")
+    client.force_authenticate(
+        get_user_model().objects.create_user(
+            email=f"bench{worker}@mail.co",
+            password="12R445%3df"
+        )
+    )
+
+    try:
+        for _ in range(orders):
+            order_flights = random.sample(flights, 2)
+            payload = {
+                "tickets": [
+                    {
+                        "row": random.randint(1, flight.airplane.rows),
+                        "seat": random.randint(
+                            1, flight.airplane.seats_in_row
+                        ),
+                        "flight": flight.id,
+                    }
+                    for flight in random.choices(order_flights, k=tickets)
+                ]
+            }
+            response = client.post(ORDER_URL, payload, format="json")
+            statuses[response.status_code] += 1
+    finally:
+        connection.close()
+
+    return statuses
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--orders", type=int, default=50)
+    parser.add_argument("--flights", type=int, default=4)
+    parser.add_argument("--tickets", type=int, default=3)
+    args = parser.parse_args()
+
+    retry_counter = RetryCounter()
+    logger = logging.getLogger("airport.transactions")
+    logger.setLevel(logging.INFO)
+    logger.addHandler(retry_counter)
+    # rejected orders are expected here, do not log each of them
+    logging.getLogger("django.request").setLevel(logging.ERROR)
+
+    with benchmark_database():
+        flights = [sample_flight() for _ in range(args.flights)]
+        connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(args.threads) as executor:
+            results = executor.map(
+                place_orders,
+                range(args.threads),
+                [flights] * args.threads,
+                [args.orders] * args.threads,
+                [args.tickets] * args.threads,
+            )
+            statuses = sum(results, Counter())
+        elapsed = time.perf_counter() - started
+
+    total = sum(statuses.values())
+    conflicts = statuses[409]
+    print(f"orders:      {total} in {elapsed:.2f}s")
+    print(f"throughput:  {total / elapsed:.1f} orders/s")
+    print(f"created:     {statuses[201]}")
+    print(f"seat taken:  {statuses[400]}")
+    print(f"retries:     {retry_counter.retries}")
+    print(f"conflicts:   {conflicts} ({conflicts / total:.1%})")
+    other = {
+        code: count
+        for code, count in statuses.items()
+        if code not in (201, 400, 409)
+    }
+    if other:
+        print(f"other:       {other}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Render and parse time of JSON, orjson and MessagePack.
+
+Run from the project root::
+
+    python -m benchmarks.bench_renderers --orders 20 --tickets 10
+
+The payload is a page of ``OrderDetailSerializer`` data, every ticket with
+its nested flight, route, airplane, crew and taken places.
+"""
+import argparse
+import datetime
+import io
+import statistics
+import time
+
+from benchmarks._setup import benchmark_database
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from rest_framework.parsers import JSONParser  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from airport.json_renderers import ORJSONParser, ORJSONRenderer  # noqa: E402
+from airport.models import (  # noqa: E402
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Flight,
+    Order,
+    Route,
+    Ticket,
+)
+from airport.msgpack_renderers import (  # noqa: E402
+    MessagePackParser,
+    MessagePackRenderer,
+)
+from airport.seats import rebuild_seats  # noqa: E402
+from airport.serializers import OrderDetailSerializer  # noqa: E402
+
+
+def create_orders(orders: int, tickets: int) -> list[dict]:
+    source = Airport.objects.create(name="Boryspil", closest_big_city="Kyiv")
+    destination = Airport.objects.create(
+        name="Chopin",
+        closest_big_city="Warsaw"
+    )
+    route = Route.objects.create(
+        source=source,
+        destination=destination,
+        distance=800
+    )
+    airplane = Airplane.objects.create(
+        name="Airplane",
+        rows=30,
+        seats_in_row=6,
+        airplane_type=AirplaneType.objects.create(name="Narrow body"),
+    )
+    crew = Crew.objects.bulk_create(
+        Crew(first_name=f"First {number}", last_name=f"Last {number}")
+        for number in range(4)
+    )
+
+    departure = timezone.now() + datetime.timedelta(days=1)
+    user = get_user_model().objects.create_user(
+        email="bench@mail.co",
+        password="12R445%3df"
+    )
+    for number in range(orders):
+        flight = Flight.objects.create(
+            route=route,
+            airplane=airplane,
+            departure_time=departure + datetime.timedelta(hours=number),
+            arrival_time=departure + datetime.timedelta(hours=number + 2),
+        )
+        flight.crew.add(*crew)
+        order = Order.objects.create(user=user)
+        Ticket.objects.bulk_create(
+            Ticket(
+                row=seat // 6 + 1,
+                seat=seat % 6 + 1,
+                flight=flight,
+                order=order
+            )
+            for seat in range(tickets)
+        )
+
+    # bulk_create skips the ticket signals, seat maps and counters would
+    # be left empty and the payload smaller than real responses
+    rebuild_seats()
+
+    return OrderDetailSerializer(
+        Order.objects.prefetch_related("tickets__flight__crew"),
+        many=True
+    ).data
+
+
+def measure(function, rounds: int) -> float:
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=20)
+    parser.add_argument("--tickets", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        data = create_orders(args.orders, args.tickets)
+
+    for name, renderer, parser_class in (
+            ("DRF JSON", JSONRenderer(), JSONParser),
+            ("orjson", ORJSONRenderer(), ORJSONParser),
+            ("MessagePack", MessagePackRenderer(), MessagePackParser),
+    ):
+        body = renderer.render(data)
+        render_time = measure(lambda: renderer.render(data), args.rounds)
+        parse_time = measure(
+            lambda: parser_class().parse(io.BytesIO(body)),
+            args.rounds
+        )
+        print(
+            f"{name:12} {len(body):8} bytes  render {render_time:7.3f}ms"
+            f"  parse {parse_time:7.3f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()